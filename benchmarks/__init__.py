@@ -0,0 +1 @@
+# Benchmarks package for PDF cleaning tool
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Direction Detection Benchmark - Table-based RTL/LTR counting against the per-character loop
+Checks that TextExtractor._detect_text_direction gives the same answer as the
+original unicodedata.bidirectional() loop on the checked-in Arabic output
+"""
+
+import argparse
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The direction table is built when the module is imported
+_import_start = time.perf_counter()
+from services.text_extractor import TextExtractor
+IMPORT_SECONDS = time.perf_counter() - _import_start
+
+DEFAULT_TEXT = 'output/Shariaah-Standards-ARB_clean.txt'
+
+
+def reference_direction(text: str) -> str:
+    """The original per-character implementation"""
+    
+    rtl_count = 0
+    ltr_count = 0
+    
+    for char in text:
+        bidi_class = unicodedata.bidirectional(char)
+        
+        if bidi_class in ('R', 'AL'):
+            rtl_count += 1
+        elif bidi_class in ('L',):
+            ltr_count += 1
+    
+    return 'RTL' if rtl_count > ltr_count else 'LTR'
+
+
+def _time_directions(detect, units: list) -> tuple:
+    start = time.perf_counter()
+    directions = [detect(unit) for unit in units]
+    return directions, time.perf_counter() - start
+
+
+def main():
+    """Main entry point"""
+    
+    parser = argparse.ArgumentParser(description='Compare RTL/LTR detection implementations')
+    parser.add_argument('--text', default=DEFAULT_TEXT, help='UTF-8 text file to classify')
+    parser.add_argument('--page-lines', type=int, default=40,
+                        help='Lines per simulated page (default: 40)')
+    parser.add_argument('--sample-chars', type=int, default=2000,
+                        help='direction_sample_chars for the sampling mode')
+    args = parser.parse_args()
+    
+    with open(args.text, 'r', encoding='utf-8') as f:
+        text = f.read()
+    
+    lines = text.split('\n')
+    pages = ['\n'.join(lines[i:i + args.page_lines]) for i in range(0, len(lines), args.page_lines)]
+    
+    print(f"Module import incl. table build: {IMPORT_SECONDS:.3f}s (once, shared by forked workers)")
+    
+    exact = TextExtractor({'text': {}})
+    sampling = TextExtractor({'text': {'direction_sample_chars': args.sample_chars}})
+    
+    mismatches = 0
+    print(f"{'units':<10} {'count':>7} {'reference':>10} {'exact':>9} {'sampling':>9}  "
+          f"{'exact diff':>10} {'sampled diff':>12}")
+    
+    for name, units in (('lines', lines), ('pages', pages), ('document', [text])):
+        expected, reference_seconds = _time_directions(reference_direction, units)
+        exact_result, exact_seconds = _time_directions(exact._detect_text_direction, units)
+        sampled_result, sampled_seconds = _time_directions(sampling._detect_text_direction, units)
+        
+        exact_diff = sum(1 for a, b in zip(expected, exact_result) if a != b)
+        sampled_diff = sum(1 for a, b in zip(expected, sampled_result) if a != b)
+        mismatches += exact_diff
+        
+        print(f"{name:<10} {len(units):>7} {reference_seconds:>9.3f}s {exact_seconds:>8.3f}s "
+              f"{sampled_seconds:>8.3f}s  {exact_diff:>10} {sampled_diff:>12}")
+    
+    if mismatches:
+        print(f"\n{mismatches} mismatch(es) between exact mode and the reference")
+        return 1
+    
+    print("\nExact mode matches the reference on every unit")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Image Resolution Benchmark - Classification agreement of downsampled image OCR
+Runs ImageClassifier at full native resolution and at each target DPI on the
+synthetic corpus and reports how many image placements get the same class
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic_corpus import ensure_corpus
+from benchmarks.run_benchmarks import BENCH_CONFIG
+from services.image_classifier import ImageClassifier
+
+DEFAULT_DPIS = [300, 150, 100]
+
+
+def _classify(pdf_path: str, target_dpi, max_pixels) -> tuple:
+    """
+    Classify all image placements at one resolution policy
+    
+    Returns:
+        tuple: ({(page, xref): classification}, seconds)
+    """
+    config = dict(BENCH_CONFIG)
+    config['images'] = dict(BENCH_CONFIG['images'], ocr_target_dpi=target_dpi,
+                            ocr_max_pixels=max_pixels, ocr_workers=1)
+    
+    start = time.perf_counter()
+    result = ImageClassifier(config).analyze_images(pdf_path)
+    seconds = time.perf_counter() - start
+    
+    classes = {}
+    for key in ('decorative_images', 'important_images'):
+        for image_info in result[key]:
+            classes[(image_info['page'], image_info['xref'])] = image_info['classification']
+    
+    return classes, seconds
+
+
+def compare_resolutions(pdf_path: str, dpis: list, max_pixels: int) -> dict:
+    """
+    Agreement of each target DPI with full-resolution classification
+    
+    Returns:
+        dict: {'full_seconds', 'placements', 'dpi': {dpi: {'seconds', 'agreement',
+               'disagreements'}}}
+    """
+    full, full_seconds = _classify(pdf_path, None, None)
+    
+    results = {'full_seconds': round(full_seconds, 4), 'placements': len(full), 'dpi': {}}
+    
+    for dpi in dpis:
+        classes, seconds = _classify(pdf_path, dpi, max_pixels)
+        
+        disagreements = [
+            {'page': page, 'xref': xref, 'full': full[(page, xref)], 'downsampled': classes.get((page, xref))}
+            for page, xref in full if classes.get((page, xref)) != full[(page, xref)]
+        ]
+        agreement = 1 - len(disagreements) / len(full) if full else 1.0
+        
+        results['dpi'][str(dpi)] = {
+            'seconds': round(seconds, 4),
+            'agreement': round(agreement, 4),
+            'disagreements': disagreements[:20]
+        }
+    
+    return results
+
+
+def main():
+    """Main entry point"""
+    
+    parser = argparse.ArgumentParser(
+        description='Compare image classification at target DPIs against full resolution')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 200],
+                        help='Corpus sizes in pages (default: 10 200)')
+    parser.add_argument('--dpi', type=int, nargs='+', default=DEFAULT_DPIS,
+                        help='Target DPIs to compare (default: 300 150 100)')
+    parser.add_argument('--max-pixels', type=int, default=8000000,
+                        help='Pixel budget applied with each target DPI')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Where synthetic PDFs are generated and cached')
+    parser.add_argument('--output', default='benchmarks/results/image_resolution.json',
+                        help='JSON results file')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    
+    if shutil.which('tesseract') is None:
+        print("Warning: tesseract not found; every OCR call fails and agreement is trivial")
+    
+    corpus = ensure_corpus(args.corpus_dir, args.sizes)
+    
+    results = {}
+    for pages, pdf_path in corpus.items():
+        results[str(pages)] = compare_resolutions(pdf_path, args.dpi, args.max_pixels)
+        
+        size_results = results[str(pages)]
+        print(f"{pages:>5}p  full resolution {size_results['full_seconds']:8.3f}s  "
+              f"{size_results['placements']} placements")
+        for dpi, dpi_results in size_results['dpi'].items():
+            print(f"{'':>7}{dpi:>4} dpi {dpi_results['seconds']:14.3f}s  "
+                  f"agreement {dpi_results['agreement']:.2%}")
+    
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\nResults saved to {output_path}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
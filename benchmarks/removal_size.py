@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Removal Size Benchmark - Cleaned PDF size in cover and redact removal modes
+Applies header/footer and decorative image removal to the synthetic corpus
+and to a scanned-page variant of it, and reports the saved file sizes
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+
+from benchmarks.synthetic_corpus import ensure_corpus, generate_scanned_pdf
+from benchmarks.run_benchmarks import BENCH_CONFIG
+from services.header_footer_detector import HeaderFooterDetector
+from services.image_classifier import ImageClassifier
+
+REMOVAL_MODES = ['cover', 'redact']
+
+
+def _cleaned_size(pdf_path: str, hf_results: dict, img_results: dict, removal_mode: str) -> int:
+    """Apply both removals in one save (as clean_pdfs.py does) and return the file size"""
+    
+    config = dict(BENCH_CONFIG, safety={'removal_mode': removal_mode})
+    
+    doc = fitz.open(pdf_path)
+    HeaderFooterDetector(config).apply_header_footer_removal(
+        doc, hf_results['headers'], hf_results['footers'])
+    ImageClassifier(config).apply_image_removal(doc, img_results['decorative_images'])
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, 'cleaned.pdf')
+        doc.save(output_path, garbage=4, deflate=True)
+        doc.close()
+        return os.path.getsize(output_path)
+
+
+def measure(pdf_path: str) -> dict:
+    """
+    Returns:
+        dict: {'input_bytes', mode: output bytes for each removal mode}
+    """
+    hf_results = HeaderFooterDetector(BENCH_CONFIG).detect(pdf_path)
+    img_results = ImageClassifier(BENCH_CONFIG).analyze_images(pdf_path)
+    
+    results = {'input_bytes': os.path.getsize(pdf_path)}
+    for removal_mode in REMOVAL_MODES:
+        results[removal_mode] = _cleaned_size(pdf_path, hf_results, img_results, removal_mode)
+    return results
+
+
+def main():
+    """Main entry point"""
+    
+    parser = argparse.ArgumentParser(
+        description='Compare cleaned PDF sizes in cover and redact removal modes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 200],
+                        help='Corpus sizes in pages (default: 10 200)')
+    parser.add_argument('--scan-dpi', type=int, default=150,
+                        help='Resolution of the scanned-page variants (default: 150)')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Where synthetic PDFs are generated and cached')
+    parser.add_argument('--output', default='benchmarks/results/removal_size.json',
+                        help='JSON results file')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    
+    corpus = ensure_corpus(args.corpus_dir, args.sizes)
+    
+    results = {}
+    for pages, pdf_path in corpus.items():
+        scanned_path = str(Path(pdf_path).with_name(f"{Path(pdf_path).stem}_scanned{args.scan_dpi}.pdf"))
+        if not Path(scanned_path).exists():
+            print(f"Generating {Path(scanned_path).name}...")
+            generate_scanned_pdf(scanned_path, pdf_path, args.scan_dpi)
+        
+        for variant, path in (('born_digital', pdf_path), ('scanned', scanned_path)):
+            size_results = measure(path)
+            results[f"{pages}p_{variant}"] = size_results
+            
+            print(f"{pages:>5}p  {variant:<13} input {size_results['input_bytes']:>12,} B  "
+                  f"cover {size_results['cover']:>12,} B  redact {size_results['redact']:>12,} B  "
+                  f"({size_results['redact'] / size_results['cover']:.2f}x cover)")
+    
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\nResults saved to {output_path}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
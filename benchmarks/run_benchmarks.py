@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner - Times the services package against the synthetic corpus
+Writes JSON results that can be compared between runs (--compare)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+
+from benchmarks.synthetic_corpus import ensure_corpus, DEFAULT_SIZES, CORPUS_VERSION
+from services.header_footer_detector import HeaderFooterDetector
+from services.image_classifier import ImageClassifier
+from services.text_extractor import TextExtractor
+from services.enhanced_text_processor import EnhancedTextProcessor
+from scripts.deep_text_cleaner import DeepTextCleaner
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BENCHMARKS = ['header_footer', 'image_classifier', 'text_extractor',
+              'enhanced_text_processor', 'deep_text_cleaner']
+
+# Benchmark configuration (defaults from config.yaml.example)
+BENCH_CONFIG = {
+    'header_footer': {'detection_threshold': 0.85, 'sample_pages': 50, 'use_templates': False},
+    'images': {'area_threshold': 0.05, 'min_lines_for_table': 3, 'ocr_cache': False},
+    'text': {'normalization': 'NFC', 'enable_markdown': True,
+             'h1_font_size': 16, 'h2_font_size': 14},
+    'performance': {'stage_cache': False, 'profile': False}
+}
+
+
+def _bench_header_footer(pdf_path: str, state: dict) -> dict:
+    result = HeaderFooterDetector(BENCH_CONFIG).detect(pdf_path)
+    state['headers'] = result['headers']
+    state['footers'] = result['footers']
+    return {
+        'algorithm_used': result['algorithm_used'],
+        'consistency_score': round(result['consistency_score'], 4),
+        'headers': len(result['headers']),
+        'footers': len(result['footers'])
+    }
+
+
+def _bench_image_classifier(pdf_path: str, state: dict) -> dict:
+    result = ImageClassifier(BENCH_CONFIG).analyze_images(pdf_path)
+    return {
+        'total_images': result['total_images'],
+        'decorative': len(result['decorative_images']),
+        'tables': len(result['table_images']),
+        'important': len(result['important_images'])
+    }
+
+
+def _bench_text_extractor(pdf_path: str, state: dict) -> dict:
+    result = TextExtractor(BENCH_CONFIG).extract_text(
+        pdf_path, state.get('headers', []), state.get('footers', [])
+    )
+    state['text'] = result['text']
+    return {
+        'characters': len(result['text']),
+        'rtl_pages': len(result['rtl_pages']),
+        'ltr_pages': len(result['ltr_pages'])
+    }
+
+
+def _bench_enhanced_text_processor(pdf_path: str, state: dict) -> dict:
+    result = EnhancedTextProcessor(BENCH_CONFIG).extract_text_with_structure_batched(pdf_path)
+    return {
+        'characters': len(result['plain_text']),
+        'h1_count': result['structure_info']['h1_count'],
+        'body_count': result['structure_info']['body_count'],
+        'quranic_sequences_removed': result['cleaning_stats']['quranic_sequences_removed']
+    }
+
+
+def _bench_deep_text_cleaner(pdf_path: str, state: dict) -> dict:
+    text = state.get('text')
+    if text is None:
+        text = TextExtractor(BENCH_CONFIG).extract_text(pdf_path)['text']
+    
+    # DeepTextCleaner reports progress with print(); keep benchmark output clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaned = DeepTextCleaner().clean_text(text)
+    
+    return {'input_characters': len(text), 'output_characters': len(cleaned)}
+
+
+BENCHMARK_FUNCTIONS = {
+    'header_footer': _bench_header_footer,
+    'image_classifier': _bench_image_classifier,
+    'text_extractor': _bench_text_extractor,
+    'enhanced_text_processor': _bench_enhanced_text_processor,
+    'deep_text_cleaner': _bench_deep_text_cleaner,
+}
+
+
+def _environment() -> dict:
+    """Describe the machine and versions so results are comparable"""
+    
+    commit = ''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        pass
+    
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pymupdf': getattr(fitz, 'VersionBind', ''),
+        'tesseract_available': shutil.which('tesseract') is not None,
+        'corpus_version': CORPUS_VERSION,
+        'git_commit': commit
+    }
+
+
+def run_benchmarks(corpus: dict, benchmarks: list, repeat: int) -> dict:
+    """
+    Run each benchmark repeat times per corpus size
+    
+    Returns:
+        dict: {size: {benchmark: {'seconds', 'best_seconds', 'mean_seconds', 'metrics'}}}
+    """
+    results = {}
+    
+    for pages, pdf_path in corpus.items():
+        results[str(pages)] = {}
+        state = {}
+        
+        for name in benchmarks:
+            timings = []
+            metrics = {}
+            
+            for _ in range(repeat):
+                start = time.perf_counter()
+                metrics = BENCHMARK_FUNCTIONS[name](pdf_path, state)
+                timings.append(round(time.perf_counter() - start, 4))
+            
+            results[str(pages)][name] = {
+                'seconds': timings,
+                'best_seconds': min(timings),
+                'mean_seconds': round(sum(timings) / len(timings), 4),
+                'metrics': metrics
+            }
+            print(f"{pages:>5}p  {name:<25} best {min(timings):8.3f}s  {metrics}")
+    
+    return results
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    Compare best times against a baseline run
+    
+    Returns:
+        list: Regressions (slower than baseline by more than tolerance)
+    """
+    regressions = []
+    
+    print()
+    print(f"{'size':>6}  {'benchmark':<25} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, benches in current['results'].items():
+        for name, result in benches.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if not base:
+                continue
+            
+            ratio = result['best_seconds'] / base['best_seconds'] if base['best_seconds'] else 1.0
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = '  REGRESSION'
+                regressions.append({'size': size, 'benchmark': name, 'ratio': round(ratio, 3)})
+            if result['metrics'] != base['metrics']:
+                flag += '  OUTPUT CHANGED'
+            
+            print(f"{size:>6}  {name:<25} {base['best_seconds']:>9.3f}s {result['best_seconds']:>9.3f}s "
+                  f"{ratio:>6.2f}x{flag}")
+    
+    return regressions
+
+
+def main():
+    """Main entry point"""
+    
+    parser = argparse.ArgumentParser(description='Benchmark the PDF cleaning services')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Corpus sizes in pages (default: 10 200 2000)')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=BENCHMARKS,
+                        help='Benchmarks to run (default: all)')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Where synthetic PDFs are generated and cached')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per benchmark; the best time is compared')
+    parser.add_argument('--output', default='benchmarks/results/latest.json',
+                        help='JSON results file')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed slowdown before flagging a regression (default: 0.10)')
+    args = parser.parse_args()
+    
+    # Service logging is noisy at INFO and skews timings
+    logging.basicConfig(level=logging.WARNING)
+    
+    corpus = ensure_corpus(args.corpus_dir, args.sizes)
+    
+    current = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': _environment(),
+        'repeat': args.repeat,
+        'results': run_benchmarks(corpus, args.benchmarks, args.repeat)
+    }
+    if resource is not None:
+        current['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\nResults saved to {output_path}")
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, current, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Synthetic Benchmark Corpus - Deterministic PDFs for performance testing
+Generates AAOIFI-like documents: Arabic and English text, repeated headers
+and footers, decorative logos, table images and Quranic-font Latin noise
+"""
+
+import io
+import random
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+# Bump when the generated content changes so cached corpora are rebuilt
+CORPUS_VERSION = 1
+
+DEFAULT_SIZES = [10, 200, 2000]
+
+ARABIC_WORDS = [
+    'المعايير', 'الشرعية', 'المؤسسات', 'المالية', 'الإسلامية', 'المرابحة',
+    'الإجارة', 'المشاركة', 'المضاربة', 'الصكوك', 'السلم', 'الاستصناع',
+    'العقد', 'الضمان', 'الربح', 'الخسارة', 'الملكية', 'التمويل', 'الأصول',
+    'الشريك', 'البيع', 'الثمن', 'الأجل', 'الوعد', 'الهيئة', 'الرقابة',
+    'يجوز', 'لا', 'يجب', 'على', 'في', 'من', 'إلى', 'أن', 'هذا', 'المعيار'
+]
+
+ENGLISH_WORDS = [
+    'the', 'institution', 'shall', 'recognize', 'murabaha', 'ijarah', 'sukuk',
+    'contract', 'profit', 'loss', 'asset', 'ownership', 'financing', 'standard',
+    'customer', 'payment', 'deferred', 'price', 'partner', 'capital', 'investment',
+    'accounting', 'disclosure', 'measurement', 'of', 'and', 'to', 'in', 'for'
+]
+
+# Broken Quranic font glyphs extracted as Latin letters
+QURANIC_NOISE = ['U T S R Q P', 'Z Y X W V', 'k j i h g f', 'ﭐ N M L K ﭑ']
+
+ARABIC_HEADER = 'المعايير الشرعية'
+ENGLISH_HEADER = "Shari'ah Standards - AAOIFI"
+FOOTER_URL = 'www.aaoifi.com'
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+
+def _png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def make_logo_image(size: int = 120) -> bytes:
+    """Small ornamental logo (decorative, no text)"""
+    image = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((8, 8, size - 8, size - 8), outline=(20, 90, 60), width=6)
+    draw.ellipse((size // 3, size // 3, 2 * size // 3, 2 * size // 3), fill=(200, 160, 40))
+    return _png_bytes(image)
+
+
+def make_border_image(width: int = 800, height: int = 24) -> bytes:
+    """Thin decorative border strip"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for x in range(0, width, 24):
+        draw.polygon([(x, height // 2), (x + 12, 2), (x + 24, height // 2), (x + 12, height - 2)],
+                     fill=(120, 80, 30))
+    return _png_bytes(image)
+
+
+def make_table_image(rng: random.Random, rows: int = 6, cols: int = 4,
+                     cell_w: int = 140, cell_h: int = 44) -> bytes:
+    """Ruled table with numeric cells"""
+    width, height = cols * cell_w + 2, rows * cell_h + 2
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    
+    for r in range(rows + 1):
+        draw.line([(0, r * cell_h), (width, r * cell_h)], fill=0, width=2)
+    for c in range(cols + 1):
+        draw.line([(c * cell_w, 0), (c * cell_w, height)], fill=0, width=2)
+    
+    for r in range(rows):
+        for c in range(cols):
+            text = 'Item' if r == 0 else f"{rng.randint(100, 99999):,}"
+            draw.text((c * cell_w + 10, r * cell_h + 14), text, fill=0)
+    
+    return _png_bytes(image)
+
+
+def _sentence(rng: random.Random, words: list, length: int) -> str:
+    return ' '.join(rng.choice(words) for _ in range(length))
+
+
+def _arabic_paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(2, 4)):
+        sentence = _sentence(rng, ARABIC_WORDS, rng.randint(8, 18))
+        # Occasional English term and Quranic-font noise inside Arabic text
+        if rng.random() < 0.2:
+            sentence += ' ' + rng.choice(['SUKUK', 'AAOIFI', 'IFRS', 'murabaha'])
+        if rng.random() < 0.15:
+            sentence += ' ' + rng.choice(QURANIC_NOISE)
+        parts.append(sentence + '.')
+    return ' '.join(parts)
+
+
+def _english_paragraph(rng: random.Random) -> str:
+    return ' '.join(_sentence(rng, ENGLISH_WORDS, rng.randint(10, 20)).capitalize() + '.'
+                    for _ in range(rng.randint(2, 4)))
+
+
+def _html_escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def generate_pdf(output_path: str, pages: int, seed: int = 42) -> str:
+    """
+    Generate a deterministic synthetic standards PDF
+    
+    Layout per page: running header (Arabic, plus English on odd pages),
+    a decorative logo shared by all pages, body paragraphs (mostly Arabic),
+    a table image every 5th page, a border strip every 7th page and a
+    footer with the site URL and page number.
+    
+    Returns:
+        str: output_path
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    doc.set_metadata({'producer': 'synthetic-corpus', 'title': f'Synthetic {pages}p'})
+    
+    logo_xref = 0
+    border_xref = 0
+    table_images = [make_table_image(random.Random(seed + i)) for i in range(3)]
+    
+    for page_num in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        
+        # Running header (top 10%): Arabic on every page, English on odd pages
+        page.insert_htmlbox(fitz.Rect(300, 30, 535, 50),
+                            f'<p dir="rtl" style="text-align:right;font-size:10px">{ARABIC_HEADER}</p>')
+        if page_num % 2 == 1:
+            page.insert_text((80, 72), ENGLISH_HEADER, fontsize=9)
+        
+        # Decorative logo, same image object (xref) on every page
+        logo_rect = fitz.Rect(40, 25, 70, 55)
+        if logo_xref:
+            page.insert_image(logo_rect, xref=logo_xref)
+        else:
+            logo_xref = page.insert_image(logo_rect, stream=make_logo_image())
+        
+        # Body text
+        body = []
+        for _ in range(rng.randint(3, 5)):
+            if rng.random() < 0.8:
+                body.append(f'<p dir="rtl" style="text-align:right">{_html_escape(_arabic_paragraph(rng))}</p>')
+            else:
+                body.append(f'<p>{_html_escape(_english_paragraph(rng))}</p>')
+        
+        body_bottom = 740
+        if page_num % 5 == 4:
+            # Table image in the lower part of the page
+            page.insert_image(fitz.Rect(90, 500, 505, 720),
+                              stream=table_images[page_num % len(table_images)])
+            body_bottom = 490
+        
+        page.insert_htmlbox(fitz.Rect(60, 90, 535, body_bottom),
+                            ''.join(body), css='p {font-size: 11px; margin: 6px 0;}')
+        
+        if page_num % 7 == 3:
+            border_rect = fitz.Rect(60, 742, 535, 750)
+            if border_xref:
+                page.insert_image(border_rect, xref=border_xref)
+            else:
+                border_xref = page.insert_image(border_rect, stream=make_border_image())
+        
+        # Footer (bottom 10%)
+        page.insert_text((60, 800), FOOTER_URL, fontsize=8)
+        page.insert_text((500, 820), f"{page_num + 1} - {pages}", fontsize=8)
+    
+    doc.save(output_path, garbage=3, deflate=True)
+    doc.close()
+    return output_path
+
+
+def generate_scanned_pdf(output_path: str, source_path: str, dpi: int = 150) -> str:
+    """
+    Scanned-page variant of a corpus PDF, like OCR output: each page keeps
+    its text and gets a JPEG rendering of itself underneath
+    
+    Returns:
+        str: output_path
+    """
+    source = fitz.open(source_path)
+    doc = fitz.open()
+    doc.insert_pdf(source)
+    
+    for page_num in range(len(doc)):
+        pix = source[page_num].get_pixmap(dpi=dpi)
+        doc[page_num].insert_image(doc[page_num].rect, stream=pix.tobytes('jpeg', jpg_quality=85),
+                                   overlay=False)
+    
+    source.close()
+    doc.save(output_path, garbage=3, deflate=True)
+    doc.close()
+    return output_path
+
+
+def corpus_path(corpus_dir: str, pages: int, seed: int = 42) -> Path:
+    return Path(corpus_dir) / f"synthetic_v{CORPUS_VERSION}_{pages}p_seed{seed}.pdf"
+
+
+def ensure_corpus(corpus_dir: str, sizes: list = None, seed: int = 42) -> dict:
+    """
+    Generate missing corpus files (existing ones are reused; output is deterministic)
+    
+    Returns:
+        dict: {pages: path}
+    """
+    Path(corpus_dir).mkdir(parents=True, exist_ok=True)
+    paths = {}
+    
+    for pages in sizes or DEFAULT_SIZES:
+        path = corpus_path(corpus_dir, pages, seed)
+        if not path.exists():
+            print(f"Generating {path.name}...")
+            generate_pdf(str(path), pages, seed)
+        paths[pages] = str(path)
+    
+    return paths
+
+
+def main():
+    """Generate the corpus from the command line"""
+    
+    corpus_dir = sys.argv[1] if len(sys.argv) > 1 else 'benchmarks/corpus'
+    sizes = [int(s) for s in sys.argv[2:]] or DEFAULT_SIZES
+    
+    for pages, path in ensure_corpus(corpus_dir, sizes).items():
+        print(f"{pages:>5} pages: {path}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,8 +10,12 @@ import argparse
 import logging
 import time
 import json
+import signal
+import multiprocessing
+from multiprocessing.connection import wait
 from pathlib import Path
 import yaml
+import fitz  # PyMuPDF
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -22,19 +26,24 @@ from services.image_classifier import ImageClassifier
 from services.text_extractor import TextExtractor
 from services.preview_generator import PreviewGenerator
 from services.pdf_utils import PDFUtils
+from services.pdf_session import PDFSession
+from services.stage_cache import StageCache
+from services.profiler import Profiler
+from services.job_queue import JobQueue
 
 
-def setup_logging(verbose: bool = False):
-    """Setup logging configuration"""
+def setup_logging(verbose: bool = False, prefix: str = ''):
+    """Setup logging configuration (prefix tags every line, e.g. per worker)"""
     level = logging.DEBUG if verbose else logging.INFO
     
     logging.basicConfig(
         level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=f'%(asctime)s - {prefix}%(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(),
             logging.FileHandler('pdf_cleaning.log')
-        ]
+        ],
+        force=True
     )
     
     return logging.getLogger(__name__)
@@ -66,7 +75,29 @@ def load_config(config_path: str) -> dict:
         raise
 
 
-def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False) -> dict:
+def create_services(config: dict) -> dict:
+    """Construct the pipeline services once so callers can reuse them across files"""
+    
+    return {
+        'ocr_processor': OCRProcessor(config),
+        'hf_detector': HeaderFooterDetector(config),
+        'img_classifier': ImageClassifier(config),
+        'text_extractor': TextExtractor(config),
+        'preview_gen': PreviewGenerator(config)
+    }
+
+
+def close_services(services: dict):
+    """Release resources held by services (e.g. the image OCR pool)"""
+    
+    for service in services.values():
+        close = getattr(service, 'close', None)
+        if close is not None:
+            close()
+
+
+def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False,
+                     force_stages: list = None, services: dict = None) -> dict:
     """
     Process a single PDF file
     
@@ -74,6 +105,8 @@ def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False) ->
         pdf_path: Path to PDF file
         config: Configuration dictionary
         preview_only: If True, only generate preview without final processing
+        force_stages: Stage names to recompute even if cached ('all' for every stage)
+        services: Services from create_services() to reuse (built per call if None)
     
     Returns:
         dict: Processing report
@@ -100,11 +133,18 @@ def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False) ->
     report_dir.mkdir(parents=True, exist_ok=True)
     
     # Initialize services
-    ocr_processor = OCRProcessor(config)
-    hf_detector = HeaderFooterDetector(config)
-    img_classifier = ImageClassifier(config)
-    text_extractor = TextExtractor(config)
-    preview_gen = PreviewGenerator(config)
+    owns_services = services is None
+    services = services or create_services(config)
+    ocr_processor = services['ocr_processor']
+    hf_detector = services['hf_detector']
+    img_classifier = services['img_classifier']
+    text_extractor = services['text_extractor']
+    preview_gen = services['preview_gen']
+    stage_cache = StageCache.from_config(pdf_path, config, force_stages)
+    profiler = Profiler(
+        enabled=config.get('performance', {}).get('profile', True),
+        slowest_pages=config.get('performance', {}).get('slowest_pages', 10)
+    )
     
     # Create backup and version paths
     if config.get('safety', {}).get('create_backups', True):
@@ -127,207 +167,284 @@ def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False) ->
     
     # STEP 1: OCR Processing with chunking
     logger.info("STEP 1: OCR Processing")
-    try:
-        ocr_stats = ocr_processor.process_pdf(
-            pdf_path,
-            versions['ocr'],
-            language
-        )
-        report['steps']['ocr'] = {
-            'status': 'completed',
-            'stats': ocr_stats
-        }
-        logger.info(f"OCR completed: {ocr_stats['total_pages']} pages")
-    except Exception as e:
-        logger.error(f"OCR processing failed: {e}")
-        report['steps']['ocr'] = {
-            'status': 'failed',
-            'error': str(e)
-        }
-        # Use original file if OCR fails
-        versions['ocr'] = pdf_path
+    with profiler.stage('ocr'):
+        ocr_key = {'language': language}
+        cached_ocr = stage_cache.load('ocr', ocr_key)
+        if cached_ocr and stage_cache.restore_file('ocr', 'ocr.pdf', versions['ocr'], ocr_key):
+            report['steps']['ocr'] = {
+                'status': 'completed',
+                'cached': True,
+                'stats': cached_ocr['stats']
+            }
+            logger.info(f"OCR reused from cache: {cached_ocr['stats']['total_pages']} pages")
+        else:
+            try:
+                ocr_stats = ocr_processor.process_pdf(
+                    pdf_path,
+                    versions['ocr'],
+                    language
+                )
+                report['steps']['ocr'] = {
+                    'status': 'completed',
+                    'stats': ocr_stats
+                }
+                logger.info(f"OCR completed: {ocr_stats['total_pages']} pages")
+                stage_cache.save('ocr', {'stats': ocr_stats},
+                                 files={'ocr.pdf': versions['ocr']}, extra=ocr_key)
+            except Exception as e:
+                logger.error(f"OCR processing failed: {e}")
+                report['steps']['ocr'] = {
+                    'status': 'failed',
+                    'error': str(e)
+                }
+                # Use original file if OCR fails
+                versions['ocr'] = pdf_path
+    
+    # Detection results (page positions, image xrefs) belong to the exact
+    # file analyzed, so key them on its content too
+    ocr_applied = versions['ocr'] != pdf_path
+    analysis_key = {'language': language, 'ocr_applied': ocr_applied}
+    if stage_cache.enabled:
+        analysis_key['analyzed_hash'] = (StageCache.file_hash(versions['ocr']) if ocr_applied
+                                         else stage_cache.input_hash)
+    
+    # Open the OCR'd PDF once; every later step reads pages from this session
+    session = PDFSession.from_config(versions['ocr'], config)
     
     # STEP 2: Header/Footer Detection
     logger.info("STEP 2: Header/Footer Detection")
-    try:
-        hf_results = hf_detector.detect(versions['ocr'])
-        report['steps']['header_footer_detection'] = {
-            'status': 'completed',
-            'results': {
-                'algorithm_used': hf_results['algorithm_used'],
-                'consistency_score': hf_results['consistency_score'],
-                'headers_count': len(hf_results['headers']),
-                'footers_count': len(hf_results['footers']),
-                'headers': hf_results['headers'],
-                'footers': hf_results['footers']
+    with profiler.stage('header_footer_detection'):
+        try:
+            hf_results = stage_cache.load('header_footer', analysis_key)
+            if hf_results is None:
+                hf_results = hf_detector.detect(versions['ocr'], session=session,
+                                                profiler=profiler)
+                stage_cache.save('header_footer', hf_results, extra=analysis_key)
+            report['steps']['header_footer_detection'] = {
+                'status': 'completed',
+                'results': {
+                    'algorithm_used': hf_results['algorithm_used'],
+                    'consistency_score': hf_results['consistency_score'],
+                    'headers_count': len(hf_results['headers']),
+                    'footers_count': len(hf_results['footers']),
+                    'headers': hf_results['headers'],
+                    'footers': hf_results['footers'],
+                    'bands': hf_results.get('bands')
+                }
+            }
+            logger.info(f"Detected {len(hf_results['headers'])} headers, {len(hf_results['footers'])} footers")
+        except Exception as e:
+            logger.error(f"Header/footer detection failed: {e}")
+            hf_results = {'headers': [], 'footers': [], 'consistency_score': 0}
+            report['steps']['header_footer_detection'] = {
+                'status': 'failed',
+                'error': str(e)
             }
-        }
-        logger.info(f"Detected {len(hf_results['headers'])} headers, {len(hf_results['footers'])} footers")
-    except Exception as e:
-        logger.error(f"Header/footer detection failed: {e}")
-        hf_results = {'headers': [], 'footers': [], 'consistency_score': 0}
-        report['steps']['header_footer_detection'] = {
-            'status': 'failed',
-            'error': str(e)
-        }
     
     # STEP 3: Image Analysis
     logger.info("STEP 3: Image Analysis")
-    try:
-        img_results = img_classifier.analyze_images(versions['ocr'])
-        report['steps']['image_analysis'] = {
-            'status': 'completed',
-            'results': {
-                'total_images': img_results['total_images'],
-                'tables_protected': len(img_results['table_images']),
-                'important_kept': len(img_results['important_images']),
-                'decorative_to_remove': len(img_results['decorative_images'])
+    with profiler.stage('image_analysis'):
+        try:
+            img_results = stage_cache.load('images', analysis_key)
+            if img_results is None:
+                img_results = img_classifier.analyze_images(versions['ocr'], session=session,
+                                                             profiler=profiler)
+                stage_cache.save('images', img_results, extra=analysis_key)
+            else:
+                _restore_image_rects(img_results)
+            report['steps']['image_analysis'] = {
+                'status': 'completed',
+                'results': {
+                    'total_images': img_results['total_images'],
+                    'tables_protected': len(img_results['table_images']),
+                    'important_kept': len(img_results['important_images']),
+                    'decorative_to_remove': len(img_results['decorative_images'])
+                }
+            }
+            logger.info(f"Images: {img_results['total_images']} total, "
+                       f"{len(img_results['table_images'])} tables (protected)")
+        except Exception as e:
+            logger.error(f"Image analysis failed: {e}")
+            img_results = {'decorative_images': [], 'table_images': [], 'important_images': []}
+            report['steps']['image_analysis'] = {
+                'status': 'failed',
+                'error': str(e)
             }
-        }
-        logger.info(f"Images: {img_results['total_images']} total, "
-                   f"{len(img_results['table_images'])} tables (protected)")
-    except Exception as e:
-        logger.error(f"Image analysis failed: {e}")
-        img_results = {'decorative_images': [], 'table_images': [], 'important_images': []}
-        report['steps']['image_analysis'] = {
-            'status': 'failed',
-            'error': str(e)
-        }
     
     # STEP 4: Generate Preview
     logger.info("STEP 4: Generating Preview")
-    try:
-        detection_results = {
-            'headers_footers': hf_results,
-            'images': img_results
-        }
-        
-        preview_report = preview_gen.generate_preview_report(
-            pdf_path,
-            versions['ocr'],
-            detection_results,
-            str(report_dir)
-        )
-        
-        # Save preview report
-        preview_path = report_dir / f"{base_name}_preview.json"
-        preview_gen.save_preview_report(preview_report, str(preview_path))
-        
-        # Print preview to console
-        preview_gen.print_preview_summary(preview_report)
-        
-        report['steps']['preview'] = {
-            'status': 'completed',
-            'report_path': str(preview_path)
-        }
-        
-    except Exception as e:
-        logger.error(f"Preview generation failed: {e}")
-        report['steps']['preview'] = {
-            'status': 'failed',
-            'error': str(e)
-        }
-    
-    # STEP 5: Final Cleaning (skip if preview_only)
-    if preview_only:
-        logger.info("PREVIEW MODE: Skipping final cleaning")
-        report['mode'] = 'preview_only'
-        report['steps']['final_cleaning'] = {'status': 'skipped', 'reason': 'preview_only mode'}
-    else:
-        logger.info("STEP 5: Final Cleaning")
-        
-        # Remove headers/footers
-        temp_cleaned = str(output_dir / f"{base_name}_temp_cleaned.pdf")
+    with profiler.stage('preview'):
         try:
-            hf_detector.remove_headers_footers(
+            detection_results = {
+                'headers_footers': hf_results,
+                'images': img_results
+            }
+            
+            preview_report = preview_gen.generate_preview_report(
+                pdf_path,
                 versions['ocr'],
-                temp_cleaned,
-                hf_results['headers'],
-                hf_results['footers']
-            )
-        except Exception as e:
-            logger.error(f"Header/footer removal failed: {e}")
-            # Use OCR version if this fails
-            import shutil
-            shutil.copy(versions['ocr'], temp_cleaned)
-        
-        # Remove decorative images
-        try:
-            removed_count = img_classifier.remove_decorative_images(
-                temp_cleaned,
-                versions['cleaned'],
-                img_results['decorative_images']
+                detection_results,
+                str(report_dir),
+                session=session
             )
-            report['steps']['final_cleaning'] = {
+            
+            # Save preview report
+            preview_path = report_dir / f"{base_name}_preview.json"
+            preview_gen.save_preview_report(preview_report, str(preview_path))
+            
+            # Print preview to console
+            preview_gen.print_preview_summary(preview_report)
+            
+            report['steps']['preview'] = {
                 'status': 'completed',
-                'headers_footers_removed': len(hf_results['headers']) + len(hf_results['footers']),
-                'images_removed': removed_count
+                'report_path': str(preview_path)
             }
+        
         except Exception as e:
-            logger.error(f"Image removal failed: {e}")
-            import shutil
-            shutil.copy(temp_cleaned, versions['cleaned'])
-            report['steps']['final_cleaning'] = {
-                'status': 'partial',
+            logger.error(f"Preview generation failed: {e}")
+            report['steps']['preview'] = {
+                'status': 'failed',
                 'error': str(e)
             }
-        
-        # Cleanup temp file
-        try:
-            Path(temp_cleaned).unlink()
-        except:
-            pass
+    
+    # STEP 5: Final Cleaning (skip if preview_only)
+    with profiler.stage('final_cleaning'):
+        if preview_only:
+            logger.info("PREVIEW MODE: Skipping final cleaning")
+            report['mode'] = 'preview_only'
+            report['steps']['final_cleaning'] = {'status': 'skipped', 'reason': 'preview_only mode'}
+        else:
+            logger.info("STEP 5: Final Cleaning")
+            removal_mode = config.get('safety', {}).get('removal_mode', 'cover')
+            
+            # Apply header/footer and decorative image edits to one open
+            # document and save once (no intermediate temp PDF)
+            errors = []
+            headers_removed = 0
+            removed_count = 0
+            
+            try:
+                cleaned_doc = fitz.open(versions['ocr'])
+            except Exception as e:
+                logger.error(f"Could not open {versions['ocr']} for cleaning: {e}")
+                cleaned_doc = None
+                errors.append(str(e))
+            
+            if cleaned_doc is not None:
+                try:
+                    headers_removed = hf_detector.apply_header_footer_removal(
+                        cleaned_doc,
+                        hf_results['headers'],
+                        hf_results['footers'],
+                        session=session
+                    )
+                except Exception as e:
+                    logger.error(f"Header/footer removal failed: {e}")
+                    errors.append(str(e))
+                
+                try:
+                    removed_count = img_classifier.apply_image_removal(
+                        cleaned_doc,
+                        img_results['decorative_images']
+                    )
+                except Exception as e:
+                    logger.error(f"Image removal failed: {e}")
+                    errors.append(str(e))
+                
+                try:
+                    cleaned_doc.save(versions['cleaned'], garbage=4, deflate=True)
+                except Exception as e:
+                    logger.error(f"Saving cleaned PDF failed: {e}")
+                    errors.append(str(e))
+                    # Use OCR version if the cleaned file cannot be written
+                    import shutil
+                    shutil.copy(versions['ocr'], versions['cleaned'])
+                finally:
+                    cleaned_doc.close()
+            else:
+                import shutil
+                shutil.copy(versions['ocr'], versions['cleaned'])
+            
+            # Redact mode drops content, so the cleaned file should shrink
+            input_bytes = Path(versions['ocr']).stat().st_size
+            output_bytes = Path(versions['cleaned']).stat().st_size if Path(versions['cleaned']).exists() else 0
+            logger.info(f"Cleaned PDF: {input_bytes:,} -> {output_bytes:,} bytes "
+                        f"({removal_mode} mode)")
+            
+            if errors:
+                report['steps']['final_cleaning'] = {
+                    'status': 'partial',
+                    'error': '; '.join(errors)
+                }
+            else:
+                report['steps']['final_cleaning'] = {
+                    'status': 'completed',
+                    'removal_mode': removal_mode,
+                    'headers_footers_removed': len(hf_results['headers']) + len(hf_results['footers']),
+                    'header_footer_spans_removed': headers_removed,
+                    'images_removed': removed_count
+                }
+            report['steps']['final_cleaning'].update({
+                'input_bytes': input_bytes,
+                'output_bytes': output_bytes,
+                'bytes_saved': input_bytes - output_bytes
+            })
+    
+    # Text extraction streams through its own reader, so release the shared
+    # session's cached pages before it starts
+    report['page_cache'] = dict(session.stats)
+    session.close()
     
     # STEP 6: Text Extraction
     logger.info("STEP 6: Text Extraction")
-    try:
-        # Extract from cleaned version (or OCR if preview_only)
-        source_pdf = versions['cleaned'] if not preview_only else versions['ocr']
-        
-        if not Path(source_pdf).exists():
-            source_pdf = versions['ocr']
-        
-        text_result = text_extractor.extract_text(
-            source_pdf,
-            hf_results.get('headers', []),
-            hf_results.get('footers', [])
-        )
-        
-        # Save text file
-        text_output_path = output_dir / f"{base_name}_cleaned.txt"
-        text_extractor.save_text(text_result['text'], str(text_output_path))
-        
-        # Generate chunk simulation
-        if config.get('output', {}).get('generate_chunk_simulation', True):
-            chunk_size = config.get('output', {}).get('simulation_chunk_size', 2000)
-            chunks = text_extractor.generate_chunk_simulation(text_result['text'], chunk_size)
+    with profiler.stage('text_extraction'):
+        try:
+            # Extract from cleaned version (or OCR if preview_only)
+            source_pdf = versions['cleaned'] if not preview_only else versions['ocr']
+            
+            if not Path(source_pdf).exists():
+                source_pdf = versions['ocr']
+            
+            text_output_path = output_dir / f"{base_name}_cleaned.txt"
+            chunk_path = None
+            if config.get('output', {}).get('generate_chunk_simulation', True):
+                chunk_path = output_dir / f"{base_name}_chunk_simulation.txt"
             
-            # Save chunk simulation
-            chunk_path = output_dir / f"{base_name}_chunk_simulation.txt"
-            with open(chunk_path, 'w', encoding='utf-8') as f:
-                for i, chunk in enumerate(chunks):
-                    f.write(f"=== CHUNK {i+1}/{len(chunks)} ===\n")
-                    f.write(chunk)
-                    f.write("\n\n")
+            # Pages are read one at a time and streamed to the text and chunk
+            # files, so memory stays flat regardless of document size
+            text_result = text_extractor.extract_text_to_file(
+                source_pdf,
+                str(text_output_path),
+                hf_results.get('headers', []),
+                hf_results.get('footers', []),
+                profiler=profiler,
+                chunk_path=str(chunk_path) if chunk_path else None,
+                chunk_size=config.get('output', {}).get('simulation_chunk_size', 2000),
+                bands=hf_results.get('bands')
+            )
+            
+            if chunk_path:
+                report['steps']['text_extraction'] = {
+                    'status': 'completed',
+                    'text_file': str(text_output_path),
+                    'chunk_simulation': str(chunk_path),
+                    'total_characters': text_result['total_characters'],
+                    'total_chunks': text_result['total_chunks'],
+                    'rtl_pages': len(text_result['rtl_pages']),
+                    'ltr_pages': len(text_result['ltr_pages'])
+                }
             
+            logger.info(f"Text extracted: {text_result['total_characters']} characters")
+        
+        except Exception as e:
+            logger.error(f"Text extraction failed: {e}")
             report['steps']['text_extraction'] = {
-                'status': 'completed',
-                'text_file': str(text_output_path),
-                'chunk_simulation': str(chunk_path),
-                'total_characters': len(text_result['text']),
-                'total_chunks': len(chunks),
-                'rtl_pages': len(text_result['rtl_pages']),
-                'ltr_pages': len(text_result['ltr_pages'])
+                'status': 'failed',
+                'error': str(e)
             }
-        
-        logger.info(f"Text extracted: {len(text_result['text'])} characters")
-        
-    except Exception as e:
-        logger.error(f"Text extraction failed: {e}")
-        report['steps']['text_extraction'] = {
-            'status': 'failed',
-            'error': str(e)
-        }
+    
+    if owns_services:
+        close_services(services)
     
     # Finalize report
     end_time = time.time()
@@ -335,9 +452,313 @@ def process_pdf_file(pdf_path: str, config: dict, preview_only: bool = False) ->
     report['duration_seconds'] = round(end_time - start_time, 2)
     report['status'] = 'completed'
     
+    if profiler.enabled:
+        report['profile'] = profiler.summary()
+        
+        if config.get('performance', {}).get('trace_events', False):
+            trace_path = report_dir / f"{base_name}_trace.json"
+            profiler.save_trace(str(trace_path))
+            report['profile']['trace_file'] = str(trace_path)
+    
     return report
 
 
+def _ocr_jobs_per_worker(config: dict, workers: int) -> int:
+    """Split the OCR thread budget evenly across worker processes"""
+    
+    budget = config.get('performance', {}).get('ocr_thread_budget') or os.cpu_count() or 1
+    return max(1, budget // max(1, workers))
+
+
+def _worker_main(index: int, pdf_path: str, config: dict, preview_only: bool,
+                 force_stages: list, verbose: bool, ocr_jobs: int, conn):
+    """Process one PDF in a child process and send the report back to the parent"""
+    
+    setup_logging(verbose, prefix=f"[worker {index + 1} {Path(pdf_path).name}] ")
+    logger = logging.getLogger(__name__)
+    
+    # Keep tesseract single-threaded; parallelism comes from the worker pool
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    config = dict(config)
+    config['ocr'] = dict(config.get('ocr') or {}, jobs=ocr_jobs)
+    
+    try:
+        report = process_pdf_file(pdf_path, config, preview_only, force_stages)
+        conn.send(('ok', report))
+    except Exception as e:
+        logger.error(f"Failed to process {pdf_path}: {e}")
+        import traceback
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def process_files_parallel(pdf_files: list, config: dict, preview_only: bool,
+                           workers: int, force_stages: list = None,
+                           verbose: bool = False) -> tuple:
+    """
+    Process PDFs in a pool of worker processes
+    
+    Each file runs in its own child process, so a crash (segfault, OOM kill)
+    only fails that file. OCR threads are split across workers.
+    
+    Returns:
+        tuple: (reports in input order, list of failures)
+    """
+    logger = logging.getLogger(__name__)
+    
+    ocr_jobs = _ocr_jobs_per_worker(config, workers)
+    logger.info(f"Running {len(pdf_files)} file(s) on {workers} worker(s), "
+                f"{ocr_jobs} OCR job(s) each")
+    
+    results = {}
+    failures = {}
+    pending = list(enumerate(pdf_files))
+    running = {}  # {sentinel: (index, pdf_file, process, conn)}
+    
+    while pending or running:
+        # Fill free worker slots
+        while pending and len(running) < workers:
+            index, pdf_file = pending.pop(0)
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, str(pdf_file), config, preview_only, force_stages,
+                      verbose, ocr_jobs, child_conn),
+                name=f"clean-worker-{index + 1}"
+            )
+            process.start()
+            child_conn.close()
+            running[process.sentinel] = (index, pdf_file, process, parent_conn)
+            logger.info(f"Started worker {index + 1} for {pdf_file}")
+        
+        # Wait for a result or a worker exit; drain pipes before joining
+        conns = {entry[3]: sentinel for sentinel, entry in running.items()}
+        for ready in wait(list(conns) + list(running)):
+            sentinel = conns.get(ready, ready)
+            if sentinel not in running:
+                continue
+            
+            index, pdf_file, process, conn = running[sentinel]
+            message = None
+            closed = False
+            try:
+                if conn.poll():
+                    message = conn.recv()
+            except (EOFError, OSError):
+                # Pipe closed without a report: the worker is dying
+                closed = True
+            
+            if message is None and not closed and process.is_alive():
+                continue
+            
+            process.join()
+            conn.close()
+            del running[sentinel]
+            
+            if message is None:
+                failures[index] = {
+                    'file_name': Path(pdf_file).name,
+                    'error': f"Worker exited with code {process.exitcode}"
+                }
+                logger.error(f"Worker for {pdf_file} crashed (exit code {process.exitcode})")
+            elif message[0] == 'ok':
+                results[index] = message[1]
+                logger.info(f"Finished {pdf_file}")
+            else:
+                failures[index] = {'file_name': Path(pdf_file).name, 'error': message[1]}
+                logger.error(f"Failed to process {pdf_file}")
+    
+    reports = [results[i] for i in sorted(results)]
+    failed = [failures[i] for i in sorted(failures)]
+    return reports, failed
+
+
+def _queue_path(config: dict) -> Path:
+    """Job queue database (daemon.queue_path, default <output_dir>/.job_queue.sqlite)"""
+    
+    queue_path = config.get('daemon', {}).get('queue_path')
+    if queue_path:
+        return Path(queue_path)
+    return Path(config.get('output_dir', 'output')) / '.job_queue.sqlite'
+
+
+def _daemon_worker(index: int, config: dict, preview_only: bool, verbose: bool,
+                   ocr_jobs: int, stop_event):
+    """Long-lived worker: build services once, then process queued jobs until stopped"""
+    
+    setup_logging(verbose, prefix=f"[daemon worker {index + 1}] ")
+    logger = logging.getLogger(__name__)
+    
+    # The parent handles Ctrl-C and tells workers to stop after their current file
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    config = dict(config)
+    config['ocr'] = dict(config.get('ocr') or {}, jobs=ocr_jobs)
+    
+    daemon_config = config.get('daemon', {})
+    poll_interval = daemon_config.get('poll_interval', 5)
+    max_attempts = daemon_config.get('max_attempts', 3)
+    report_dir = Path(config.get('report_dir', 'report'))
+    
+    queue = JobQueue(_queue_path(config))
+    services = create_services(config)
+    pid = os.getpid()
+    
+    while not stop_event.is_set():
+        job = queue.claim(pid)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        
+        pdf_path = job['path']
+        if not Path(pdf_path).exists():
+            logger.warning(f"Skipping {pdf_path}: file no longer exists")
+            queue.fail(job['id'], 'File no longer exists', max_attempts=0,
+                       content_hash=job['content_hash'])
+            continue
+        
+        logger.info(f"Processing {pdf_path} (job {job['id']}, attempt {job['attempts'] + 1})")
+        try:
+            report = process_pdf_file(pdf_path, config, preview_only, services=services)
+            report_dir.mkdir(parents=True, exist_ok=True)
+            report_path = report_dir / f"{Path(pdf_path).stem}_report.json"
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            queue.finish(job['id'], job['content_hash'], str(report_path))
+            logger.info(f"Finished {pdf_path} in {report['duration_seconds']}s")
+        except Exception as e:
+            logger.error(f"Failed to process {pdf_path}: {e}")
+            import traceback
+            queue.fail(job['id'], traceback.format_exc(), max_attempts, job['content_hash'])
+    
+    close_services(services)
+    queue.close()
+
+
+def _scan_input_dir(queue: JobQueue, input_dir: Path, settle_seconds: float) -> int:
+    """
+    Enqueue new or changed PDFs in input_dir
+    
+    Files whose size and mtime match the last scan are skipped without
+    hashing; files modified within settle_seconds are left for the next
+    scan so half-copied files are not picked up.
+    
+    Returns:
+        int: Number of jobs enqueued
+    """
+    logger = logging.getLogger(__name__)
+    enqueued = 0
+    now = time.time()
+    
+    for pdf_file in sorted(input_dir.glob('*.pdf')):
+        try:
+            stat = pdf_file.stat()
+        except FileNotFoundError:
+            continue
+        
+        path = str(pdf_file.resolve())
+        seen = queue.seen_file(path)
+        if seen and seen['size'] == stat.st_size and seen['mtime'] == stat.st_mtime:
+            continue
+        
+        if now - stat.st_mtime < settle_seconds:
+            continue
+        
+        # A touched but unchanged file hashes the same and is not re-enqueued;
+        # a changed one is queued again, even if it went back to an older version
+        if queue.enqueue(path, StageCache.file_hash(path), stat.st_size, stat.st_mtime):
+            enqueued += 1
+            logger.info(f"Queued {pdf_file.name}")
+    
+    return enqueued
+
+
+def run_daemon(config: dict, preview_only: bool, workers: int, verbose: bool = False) -> int:
+    """
+    Watch input_dir and process new or changed PDFs until interrupted
+    
+    Jobs live in an SQLite queue, so files queued or interrupted before a
+    restart are picked up again. Workers stay alive between files and
+    reuse their services; a crashed worker is replaced and its job retried
+    up to daemon.max_attempts times.
+    """
+    logger = logging.getLogger(__name__)
+    
+    daemon_config = config.get('daemon', {})
+    poll_interval = daemon_config.get('poll_interval', 5)
+    settle_seconds = daemon_config.get('settle_seconds', 2)
+    max_attempts = daemon_config.get('max_attempts', 3)
+    input_dir = Path(config.get('input_dir', 'context'))
+    
+    queue = JobQueue(_queue_path(config))
+    
+    # No worker is alive yet, so anything still marked running was interrupted
+    requeued = queue.requeue_orphans([], max_attempts)
+    if requeued:
+        logger.info(f"Requeued {requeued} job(s) interrupted by the last shutdown")
+    
+    stop_event = multiprocessing.Event()
+    stopping = []
+    
+    # Only flag the stop here: setting the Event from a signal handler can
+    # deadlock on its lock, so the main loop sets it once it wakes up
+    def request_stop(signum, frame):
+        stopping.append(signum)
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    ocr_jobs = _ocr_jobs_per_worker(config, workers)
+    logger.info(f"Watching {input_dir} every {poll_interval}s with {workers} worker(s), "
+                f"queue {queue.db_path}")
+    
+    processes = [None] * workers
+    
+    while not stopping:
+        # Start workers, replacing any that crashed
+        for index, process in enumerate(processes):
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                process.join()
+                logger.error(f"Daemon worker {index + 1} exited with code {process.exitcode}; restarting")
+            
+            process = multiprocessing.Process(
+                target=_daemon_worker,
+                args=(index, config, preview_only, verbose, ocr_jobs, stop_event),
+                name=f"clean-daemon-{index + 1}"
+            )
+            process.start()
+            processes[index] = process
+        
+        queue.requeue_orphans([p.pid for p in processes if p.is_alive()], max_attempts)
+        _scan_input_dir(queue, input_dir, settle_seconds)
+        
+        time.sleep(poll_interval)
+    
+    logger.info("Stopping after current files...")
+    stop_event.set()
+    for process in processes:
+        if process is not None:
+            process.join()
+    
+    logger.info(f"Daemon stopped; jobs: {queue.counts()}")
+    queue.close()
+    return 0
+
+
+def _restore_image_rects(img_results: dict):
+    """Turn cached rect lists back into fitz.Rect objects"""
+    
+    for key in ('decorative_images', 'important_images', 'table_images'):
+        for image_info in img_results.get(key, []):
+            if image_info.get('rect') is not None:
+                image_info['rect'] = fitz.Rect(image_info['rect'])
+
+
 def main():
     """Main entry point"""
     
@@ -363,6 +784,29 @@ def main():
         action='store_true',
         help='Enable verbose logging'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of PDF files to process in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='Export a Chrome trace-event JSON per file to report_dir'
+    )
+    parser.add_argument(
+        '--force-stage',
+        action='append',
+        choices=sorted(StageCache.STAGE_SECTIONS) + ['all'],
+        help='Recompute a cached stage (repeatable): ocr, header_footer, images or all '
+             '(final cleaning and text extraction always run)'
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Watch input_dir and process new or changed PDFs until interrupted'
+    )
     
     args = parser.parse_args()
     
@@ -389,12 +833,18 @@ def main():
     if args.preview:
         logger.warning("PREVIEW MODE: No files will be modified")
     
+    if args.trace:
+        config.setdefault('performance', {})['trace_events'] = True
+    
+    if args.daemon:
+        return run_daemon(config, args.preview, max(1, args.workers), args.verbose)
+    
     # Determine which files to process
     if args.file:
         pdf_files = [args.file]
     else:
         input_dir = Path(config.get('input_dir', 'context'))
-        pdf_files = list(input_dir.glob('*.pdf'))
+        pdf_files = sorted(input_dir.glob('*.pdf'))
     
     if not pdf_files:
         logger.error("No PDF files found to process")
@@ -404,20 +854,34 @@ def main():
     
     # Process each file
     all_reports = []
+    failed_files = []
     
-    for pdf_file in pdf_files:
-        logger.info("")
-        logger.info("="*60)
-        logger.info(f"Processing: {pdf_file}")
-        logger.info("="*60)
-        
+    if args.workers > 1 and len(pdf_files) > 1:
+        all_reports, failed_files = process_files_parallel(
+            pdf_files, config, args.preview, min(args.workers, len(pdf_files)),
+            args.force_stage, args.verbose
+        )
+    else:
+        # Built once so pools (image OCR) stay warm across files
+        services = create_services(config)
         try:
-            report = process_pdf_file(str(pdf_file), config, args.preview)
-            all_reports.append(report)
-        except Exception as e:
-            logger.error(f"Failed to process {pdf_file}: {e}")
-            import traceback
-            traceback.print_exc()
+            for pdf_file in pdf_files:
+                logger.info("")
+                logger.info("="*60)
+                logger.info(f"Processing: {pdf_file}")
+                logger.info("="*60)
+                
+                try:
+                    report = process_pdf_file(str(pdf_file), config, args.preview, args.force_stage,
+                                              services=services)
+                    all_reports.append(report)
+                except Exception as e:
+                    logger.error(f"Failed to process {pdf_file}: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    failed_files.append({'file_name': Path(pdf_file).name, 'error': str(e)})
+        finally:
+            close_services(services)
     
     # Save combined report
     report_dir = Path(config.get('report_dir', 'report'))
@@ -428,7 +892,8 @@ def main():
         'processed': len(all_reports),
         'preview_mode': args.preview,
         'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'files': all_reports
+        'files': all_reports,
+        'failed_files': failed_files
     }
     
     report_path = report_dir / 'cleaning_report.json'
@@ -5,17 +5,26 @@ Deep Text Cleaner - تنظيف عميق للنصوص العربية
 يحل مشاكل: التكرار، أرقام الصفحات المكررة، الفهارس، الحواشي المدمجة، الترويسات والتذييلات
 """
 
+import argparse
 import re
 import sys
 from pathlib import Path
 from difflib import SequenceMatcher
 from collections import Counter
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+import yaml
+
+from services.template_store import TemplateStore
+
 
 class DeepTextCleaner:
     """منظف متقدم للنصوص العربية"""
     
-    def __init__(self):
+    def __init__(self, template_patterns: list = None):
         self.similarity_threshold = 0.90  # نسبة التشابه لاعتبار السطر مكرر
         self.min_line_length = 10  # زيادة الحد الأدنى لطول السطر
         self.common_headers_footers = [
@@ -28,6 +37,13 @@ class DeepTextCleaner:
             r'رقم\s*الصفحة',
         ]
         
+        # أنماط الترويسات والتذييلات المكتشفة لعائلة المستند المصدر (TemplateStore)
+        # '#' تمثل رقماً، ويجب أن يطابق النمط السطر كاملاً وبنفس حالة الأحرف
+        self.template_regexes = [
+            re.compile(re.escape(pattern).replace(r'\#', r'\d+'))
+            for pattern in dict.fromkeys(template_patterns or [])
+        ]
+        
     def clean_text(self, text: str) -> str:
         """تنظيف شامل للنص"""
         
@@ -93,6 +109,9 @@ class DeepTextCleaner:
                     is_header_footer = True
                     break
             
+            if not is_header_footer:
+                is_header_footer = any(regex.fullmatch(line_stripped) for regex in self.template_regexes)
+            
             # احتفظ بالسطر فقط إذا لم يكن ترويسة أو تذييل
             if not is_header_footer:
                 cleaned.append(line)
@@ -264,15 +283,39 @@ class DeepTextCleaner:
         return cleaned
 
 
+def load_template_patterns(pdf_path: str, config_path: str) -> list:
+    """أنماط القالب المحفوظ لعائلة المستند المصدر (من مخزن القوالب في output_dir)"""
+    
+    config = {}
+    if Path(config_path).exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    
+    store = TemplateStore.from_config(config)
+    with fitz.open(pdf_path) as doc:
+        return store.patterns_for(doc)
+
+
 def main():
     """نقطة الدخول الرئيسية"""
     
-    if len(sys.argv) < 2:
-        print("الاستخدام: python3 scripts/deep_text_cleaner.py <input_file.txt>")
-        print("مثال: python3 scripts/deep_text_cleaner.py output/Shariaah-Standards-ARB_cleaned.txt")
-        return 1
+    parser = argparse.ArgumentParser(
+        description='Deep Text Cleaner - تنظيف عميق للنصوص العربية',
+        epilog='مثال: python3 scripts/deep_text_cleaner.py output/Shariaah-Standards-ARB_cleaned.txt'
+    )
+    parser.add_argument('input_file', help='ملف النص المراد تنظيفه')
+    parser.add_argument(
+        '--template-pdf',
+        help='PDF المصدر: تُزال أيضاً أنماط قالب الترويسة/التذييل المحفوظ لعائلة هذا المستند'
+    )
+    parser.add_argument(
+        '--config',
+        default='config.yaml',
+        help='ملف الإعدادات (لتحديد مسار مخزن القوالب)'
+    )
+    args = parser.parse_args()
     
-    input_path = Path(sys.argv[1])
+    input_path = Path(args.input_file)
     
     if not input_path.exists():
         print(f"❌ الملف غير موجود: {input_path}")
@@ -291,8 +334,13 @@ def main():
     print(f"📊 حجم النص الأصلي: {len(original_text):,} حرف")
     print()
     
-    # التنظيف
-    cleaner = DeepTextCleaner()
+    # التنظيف (مع أنماط قالب عائلة المستند المصدر عند الطلب)
+    template_patterns = []
+    if args.template_pdf:
+        template_patterns = load_template_patterns(args.template_pdf, args.config)
+        print(f"📋 أنماط القالب: {len(template_patterns)}")
+    
+    cleaner = DeepTextCleaner(template_patterns)
     cleaned_text = cleaner.clean_text(original_text)
     
     print()
@@ -16,6 +16,8 @@ import pdfplumber
 from arabic_reshaper import ArabicReshaper
 from bidi.algorithm import get_display
 
+from services.text_normalization import normalize, has_presentation_forms, has_arabic
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,17 +79,13 @@ class EnhancedTextProcessor:
         """
         # Step 1: Normalize to convert presentation forms to base characters
         # NFKC normalization converts ﺔﺤﻔﺼﻟﺍ (presentation forms) to ةحفصلا (base characters)
-        normalized = unicodedata.normalize('NFKC', text)
+        # (skipped when the text is already NFKC)
+        normalized = normalize('NFKC', text)
         
         # Step 2: Check if text is in presentation forms (visual order)
         # Presentation forms are in range U+FB50–U+FDFF and U+FE70–U+FEFF
-        has_presentation_forms = any(
-            ('\uFB50' <= c <= '\uFDFF') or ('\uFE70' <= c <= '\uFEFF') 
-            for c in text
-        )
-        
         # Step 3: Reverse ONLY if text contains presentation forms (visual order)
-        if has_presentation_forms:
+        if has_presentation_forms(text):
             # Text is in visual order, need DOUBLE REVERSAL
             words = normalized.split()
             result_words = []
@@ -95,9 +93,7 @@ class EnhancedTextProcessor:
             # First: Reverse each word's characters
             for word in words:
                 # Check if word contains Arabic characters
-                has_arabic = any('\u0600' <= c <= '\u06FF' for c in word)
-                
-                if has_arabic:
+                if has_arabic(word):
                     # Reverse the character order within the word
                     # ﺔﻤﻠﻛ → كلمة
                     reversed_word = word[::-1]
@@ -116,6 +112,16 @@ class EnhancedTextProcessor:
             # Just normalize and return
             return normalized
     
+    def _page_needs_logical_order(self, lines: List[Dict]) -> bool:
+        """
+        Whether any line of a page would be changed by _to_logical_order()
+        
+        One check over the whole page: text that is already NFKC and has no
+        presentation forms comes back unchanged, so its lines can skip it.
+        """
+        page_text = '\n'.join(line['text'] for line in lines)
+        return has_presentation_forms(page_text) or not unicodedata.is_normalized('NFKC', page_text)
+    
     def extract_text_with_structure_batched(self, pdf_path: str, batch_size: int = 50, max_pages: int = None) -> Dict:
         """
         استخراج النص مع الهيكلة - نسخة محسّنة للملفات الضخمة
@@ -184,6 +190,9 @@ class EnhancedTextProcessor:
                         # Group words into lines
                         lines = self._group_words_into_lines(words)
                         
+                        # Pages in logical order and NFKC form need no per-line work
+                        needs_logical_order = self._page_needs_logical_order(lines)
+                        
                         # Process each line
                         for line_data in lines:
                             text = line_data['text'].strip()
@@ -194,7 +203,8 @@ class EnhancedTextProcessor:
                             
                             # Convert from visual/presentation order to logical order (if needed)
                             # The function auto-detects presentation forms and only reverses when necessary
-                            text = self._to_logical_order(text)
+                            if needs_logical_order:
+                                text = self._to_logical_order(text)
                             
                             # Clean Quranic noise
                             cleaned_text, quranic_removed, english_preserved = self._clean_quranic_noise(text)
@@ -289,6 +299,9 @@ class EnhancedTextProcessor:
                 # Group words into lines
                 lines = self._group_words_into_lines(words)
                 
+                # Pages in logical order and NFKC form need no per-line work
+                needs_logical_order = self._page_needs_logical_order(lines)
+                
                 # Process each line
                 for line_data in lines:
                     text = line_data['text'].strip()
@@ -299,7 +312,8 @@ class EnhancedTextProcessor:
                     
                     # Convert from visual/presentation order to logical order (if needed)
                     # The function auto-detects presentation forms and only reverses when necessary
-                    text = self._to_logical_order(text)
+                    if needs_logical_order:
+                        text = self._to_logical_order(text)
                     
                     # Clean Quranic noise
                     cleaned_text, quranic_removed, english_preserved = self._clean_quranic_noise(text)
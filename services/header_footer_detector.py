@@ -4,15 +4,32 @@ Uses 3 different approaches and selects the best based on consistency score
 """
 
 import logging
+import math
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Tuple, Set
 from collections import Counter
 import fitz  # PyMuPDF
 from difflib import SequenceMatcher
 
+from services.pdf_session import PDFSession
+from services.header_footer_matcher import HeaderFooterMatcher
+from services.template_store import TemplateStore
+from services.profiler import Profiler
+
 logger = logging.getLogger(__name__)
 
 
+def _scan_shard(pdf_path: str, page_nums: List[int], config: dict) -> Dict:
+    """Process pool entry point: tally one shard of pages"""
+    
+    detector = HeaderFooterDetector(config)
+    with PDFSession(pdf_path, cache_size=1) as session:
+        return detector._scan(session, page_nums)
+
+
 class HeaderFooterDetector:
     """Detects repeated headers and footers using multiple algorithms"""
     
@@ -21,20 +38,40 @@ class HeaderFooterDetector:
         self.threshold = config.get('header_footer', {}).get('detection_threshold', 0.85)
         self.sample_pages = config.get('header_footer', {}).get('sample_pages', 50)
         self.use_multi_algorithm = config.get('header_footer', {}).get('use_multi_algorithm', True)
+        # 'cover' paints white boxes; 'redact' removes the text itself
+        self.removal_mode = config.get('safety', {}).get('removal_mode', 'cover')
         self.algorithms = config.get('header_footer', {}).get('algorithms', [
             'text_repetition',
             'bbox_matching',
             'fuzzy_matching'
         ])
+        # Scan every page instead of the first/last sample_pages
+        self.full_document = config.get('header_footer', {}).get('full_document', False)
+        # Full-document scans: pages per shard and pool size (None = CPU count)
+        self.shard_pages = config.get('header_footer', {}).get('shard_pages', 200)
+        self.detection_workers = config.get('header_footer', {}).get('detection_workers')
+        # Full-document scans: also keep text repeated on this many pages
+        # (running headers of a single section)
+        self.section_min_pages = config.get('header_footer', {}).get('section_min_pages', 10)
+        # Reuse templates learned from earlier files of the same document family
+        self.use_templates = config.get('header_footer', {}).get('use_templates', False)
+        self.template_verify_pages = config.get('header_footer', {}).get('template_verify_pages', 10)
     
-    def detect(self, pdf_path: str) -> Dict:
+    def detect(self, pdf_path: str, session: PDFSession = None,
+               profiler: Profiler = None) -> Dict:
         """
         Detect headers and footers using configured algorithms
         
+        Args:
+            pdf_path: Path to PDF file
+            session: Optional shared PDFSession for pdf_path (avoids re-parsing pages)
+            profiler: Optional Profiler; each algorithm is timed as a sub-stage
+        
         Returns:
             dict: {
                 'headers': List of header text patterns to remove,
                 'footers': List of footer text patterns to remove,
+                'bands': Header/footer bands per page parity (None without bbox_matching),
                 'algorithm_used': Name of algorithm with best consistency,
                 'consistency_score': Score of selected algorithm,
                 'preview': Sample detections for user review
@@ -42,30 +79,87 @@ class HeaderFooterDetector:
         """
         logger.info(f"Starting header/footer detection for {pdf_path}")
         
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
+        owns_session = session is None
+        if owns_session:
+            session = PDFSession.from_config(pdf_path, self.config)
+        total_pages = len(session)
         
         # Determine pages to sample
-        pages_to_check = min(self.sample_pages, total_pages)
-        start_pages = list(range(min(pages_to_check, total_pages)))
-        end_pages = list(range(max(0, total_pages - pages_to_check), total_pages))
-        sample_pages = sorted(set(start_pages + end_pages))
+        if self.full_document:
+            sample_pages = list(range(total_pages))
+        else:
+            pages_to_check = min(self.sample_pages, total_pages)
+            start_pages = list(range(min(pages_to_check, total_pages)))
+            end_pages = list(range(max(0, total_pages - pages_to_check), total_pages))
+            sample_pages = sorted(set(start_pages + end_pages))
         
         logger.info(f"Sampling {len(sample_pages)} pages from total {total_pages}")
         
+        profiler = profiler or Profiler.disabled()
         results = {}
         
+        # Shortcut: a template from the same document family that still
+        # matches a few pages replaces detection
+        template_store = None
+        if self.use_templates and total_pages:
+            template_store = TemplateStore.from_config(self.config)
+            family, fingerprint = template_store.describe(session.doc)
+            template = template_store.lookup(family, fingerprint)
+            
+            if template:
+                with profiler.stage('header_footer.template'):
+                    hit_rate = self._verify_template(session, template, sample_pages)
+                
+                if hit_rate >= self.threshold:
+                    logger.info(f"Using header/footer template from {template['source']} "
+                                f"({hit_rate:.0%} of checked pages match)")
+                    if owns_session:
+                        session.close()
+                    return {
+                        'headers': template['headers'],
+                        'footers': template['footers'],
+                        'bands': template.get('bands'),
+                        'algorithm_used': 'template',
+                        'consistency_score': hit_rate,
+                        'preview': {
+                            'template_source': template['source'],
+                            'template_similarity': template['similarity']
+                        }
+                    }
+                
+                logger.info(f"Template from {template['source']} matches only "
+                            f"{hit_rate:.0%} of checked pages; running detection")
+        
+        # Single pass over the sample: each page's blocks are fetched once and
+        # tallied for every enabled algorithm. Tallies of page shards merge
+        # into the same result as a serial scan
+        with profiler.stage('header_footer.scan'):
+            shards = self._shard(sample_pages)
+            counts = None
+            if len(shards) > 1:
+                counts = self._scan_parallel(pdf_path, shards)
+            if counts is None:
+                counts = self._scan(session, sample_pages)
+        total_sampled = len(sample_pages)
+        
+        if owns_session:
+            session.close()
+        
         # Run all configured algorithms
         if 'text_repetition' in self.algorithms:
-            results['text_repetition'] = self._algorithm_text_repetition(doc, sample_pages)
+            with profiler.stage('header_footer.text_repetition'):
+                results['text_repetition'] = self._algorithm_text_repetition(
+                    counts['text_repetition'], total_sampled)
         
         if 'bbox_matching' in self.algorithms:
-            results['bbox_matching'] = self._algorithm_bbox_matching(doc, sample_pages)
+            with profiler.stage('header_footer.bbox_matching'):
+                results['bbox_matching'] = self._algorithm_bbox_matching(
+                    counts['bbox_matching'], total_sampled)
         
         if 'fuzzy_matching' in self.algorithms:
-            results['fuzzy_matching'] = self._algorithm_fuzzy_matching(doc, sample_pages)
-        
-        doc.close()
+            with profiler.stage('header_footer.fuzzy_matching'):
+                results['fuzzy_matching'] = self._algorithm_fuzzy_matching(
+                    counts['fuzzy_matching'], total_sampled)
         
         # Select best algorithm based on consistency score
         best_algorithm = max(results.items(), key=lambda x: x[1]['consistency_score'])
@@ -75,46 +169,237 @@ class HeaderFooterDetector:
         result = best_algorithm[1]
         result['algorithm_used'] = best_algorithm[0]
         
+        # Bands come from bbox matching whichever algorithm won
+        bbox_result = results.get('bbox_matching', {})
+        result['bands'] = bbox_result.pop('bands', None)
+        
+        if template_store is not None and (result['headers'] or result['footers']):
+            template_store.save(family, fingerprint, result, Path(pdf_path).name)
+        
         return result
     
-    def _algorithm_text_repetition(self, doc, sample_pages: List[int]) -> Dict:
+    def _verify_template(self, session: PDFSession, template: Dict,
+                         sample_pages: List[int]) -> float:
         """
-        Algorithm 1: Simple text repetition analysis
-        Looks for exact text matches in top/bottom of pages
+        Check a stored template against a few evenly spread sample pages
+        
+        Headers are checked in the top region and footers in the bottom
+        region, and every template pattern has to match on at least one
+        checked page. A text repeated at the top/bottom of the checked pages
+        that no template pattern covers (e.g. a different running header in
+        a document of the same family) rejects the template.
+        
+        Returns:
+            float: Share of checked pages matching in every region the
+                   template has patterns for (0.0 if rejected)
         """
-        logger.info("Running algorithm: text_repetition")
+        regions = {'header': list(dict.fromkeys(template['headers'])),
+                   'footer': list(dict.fromkeys(template['footers']))}
+        regions = {region: patterns for region, patterns in regions.items() if patterns}
+        if not regions or not sample_pages:
+            return 0.0
+        
+        matchers = {region: HeaderFooterMatcher(patterns) for region, patterns in regions.items()}
+        # One matcher per pattern to tell which patterns were seen
+        pattern_matchers = {(region, pattern): HeaderFooterMatcher([pattern])
+                            for region, patterns in regions.items() for pattern in patterns}
+        combined = HeaderFooterMatcher([p for patterns in regions.values() for p in patterns])
+        
+        step = max(1, len(sample_pages) // max(1, self.template_verify_pages))
+        pages = sample_pages[::step][:self.template_verify_pages]
+        
+        checked = 0
+        region_hits = Counter()
+        seen_patterns = set()
+        repetition = {'header': Counter(), 'footer': Counter()}
+        for sample in self._iter_samples(session, pages):
+            checked += 1
+            page_height = sample['page_height']
+            region_texts = {
+                'header': [b[4].strip() for b in sample['blocks'] if b[1] < page_height * 0.10],
+                'footer': [b[4].strip() for b in sample['blocks'] if b[1] > page_height * 0.90]
+            }
+            
+            for region, matcher in matchers.items():
+                if any(matcher.matches(text) for text in region_texts[region]):
+                    region_hits[region] += 1
+            
+            for (region, pattern), pattern_matcher in pattern_matchers.items():
+                if (region, pattern) not in seen_patterns and \
+                        any(pattern_matcher.matches(text) for text in region_texts[region]):
+                    seen_patterns.add((region, pattern))
+            
+            self._tally_text_repetition(repetition, sample)
         
-        header_candidates = Counter()
-        footer_candidates = Counter()
-        total_sampled = len(sample_pages)
+        if not checked:
+            return 0.0
+        
+        missing = [pattern for region, pattern in pattern_matchers if (region, pattern) not in seen_patterns]
+        if missing:
+            logger.info(f"Template patterns not found on checked pages: {missing[:3]}")
+            return 0.0
+        
+        # Cheap repetition tally over the same pages: repeated top/bottom
+        # text the template does not know about means it is incomplete
+        for region, candidates in repetition.items():
+            for text, count in candidates.items():
+                if self._is_repeated(count, checked) and not combined.matches(text):
+                    logger.info(f"Repeated {region} text not in template: {text[:60]!r}")
+                    return 0.0
+        
+        return min(region_hits[region] for region in regions) / checked
+    
+    def _shard(self, sample_pages: List[int]) -> List[List[int]]:
+        """Split a full-document scan into contiguous page shards"""
+        
+        if not self.full_document or self.detection_workers == 1:
+            return [sample_pages]
         
+        size = max(1, self.shard_pages)
+        return [sample_pages[i:i + size] for i in range(0, len(sample_pages), size)]
+    
+    def _scan_parallel(self, pdf_path: str, shards: List[List[int]]) -> Dict:
+        """
+        Tally shards in a process pool and merge them in page order
+        
+        Returns:
+            dict: Merged counts, or None if the pool failed (caller scans serially)
+        """
+        workers = min(len(shards), self.detection_workers or os.cpu_count() or 1)
+        logger.info(f"Scanning {len(shards)} shards on {workers} processes")
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_scan_shard, str(pdf_path), shard, self.config)
+                           for shard in shards]
+                parts = [future.result() for future in futures]
+        except Exception as e:
+            logger.warning(f"Parallel scan failed ({e}); scanning serially")
+            return None
+        
+        return self._merge_counts(parts)
+    
+    def _iter_samples(self, session: PDFSession, sample_pages: List[int]):
+        """
+        Fetch blocks for each sample page once
+        
+        Pages without text blocks are skipped (every algorithm ignores them),
+        but still count towards the sampled total.
+        
+        Yields:
+            dict: {'page_num', 'blocks', 'sorted_blocks' (by y0), 'page_height'}
+        """
         for page_num in sample_pages:
-            page = doc[page_num]
-            blocks = page.get_text("blocks")
+            blocks = session.get_blocks(page_num)
             
             if not blocks:
                 continue
             
-            # Sort blocks by vertical position
-            blocks = sorted(blocks, key=lambda b: b[1])  # b[1] is y0
-            
-            # Top 2 blocks as potential headers
-            for block in blocks[:2]:
-                text = block[4].strip()
-                if text and len(text) > 3:  # Ignore very short text
-                    header_candidates[text] += 1
+            yield {
+                'page_num': page_num,
+                'blocks': blocks,
+                'sorted_blocks': sorted(blocks, key=lambda b: b[1]),  # b[1] is y0
+                'page_height': session.get_page_rect(page_num).height
+            }
+    
+    def _scan(self, session: PDFSession, sample_pages: List[int]) -> Dict:
+        """
+        Tally candidate counts and positions for every enabled algorithm
+        
+        Returns:
+            dict: {algorithm: partial counts}, mergeable with _merge_counts()
+        """
+        counts = {
+            'text_repetition': {'header': Counter(), 'footer': Counter()},
+            'bbox_matching': {
+                'header': {},  # {(x0, y0): [texts]}
+                'footer': {},
+                # Per page parity: {(region, pos_key, digit-normalized text): [band edge / page height]}
+                'band_edges': {'odd': {}, 'even': {}},
+                'parity_pages': Counter()
+            },
+            'fuzzy_matching': {'header': {}, 'footer': {}}  # {normalized: [texts]}
+        }
+        
+        for sample in self._iter_samples(session, sample_pages):
+            if 'text_repetition' in self.algorithms:
+                self._tally_text_repetition(counts['text_repetition'], sample)
+            if 'bbox_matching' in self.algorithms:
+                self._tally_bbox_matching(counts['bbox_matching'], sample)
+            if 'fuzzy_matching' in self.algorithms:
+                self._tally_fuzzy_matching(counts['fuzzy_matching'], sample)
+        
+        return counts
+    
+    @staticmethod
+    def _merge_counts(parts: List[Dict]) -> Dict:
+        """
+        Merge shard tallies in page order
+        
+        Counters add up and lists concatenate, so candidates keep the
+        first-seen order a serial scan would give them.
+        """
+        merged = parts[0]
+        
+        for part in parts[1:]:
+            for region in ('header', 'footer'):
+                merged['text_repetition'][region].update(part['text_repetition'][region])
+                
+                for pos_key, texts in part['bbox_matching'][region].items():
+                    merged['bbox_matching'][region].setdefault(pos_key, []).extend(texts)
+                
+                for pattern, examples in part['fuzzy_matching'][region].items():
+                    merged['fuzzy_matching'][region].setdefault(pattern, []).extend(examples)
             
-            # Bottom 2 blocks as potential footers
-            for block in blocks[-2:]:
-                text = block[4].strip()
-                if text and len(text) > 3:
-                    footer_candidates[text] += 1
+            for parity, edges in part['bbox_matching']['band_edges'].items():
+                for band_key, values in edges.items():
+                    merged['bbox_matching']['band_edges'][parity].setdefault(band_key, []).extend(values)
+            merged['bbox_matching']['parity_pages'].update(part['bbox_matching']['parity_pages'])
+        
+        return merged
+    
+    def _is_repeated(self, count: int, total_sampled: int) -> bool:
+        """Whether a candidate repeats often enough to be a header/footer"""
+        
+        if total_sampled and count / total_sampled >= self.threshold:
+            return True
+        
+        # Full-document scans also keep section-specific running headers
+        return self.full_document and count >= self.section_min_pages
+    
+    def _tally_text_repetition(self, counts: Dict, sample: Dict):
+        """Count the top/bottom 2 blocks of one page"""
+        
+        # Blocks sorted by vertical position
+        blocks = sample['sorted_blocks']
+        
+        # Top 2 blocks as potential headers
+        for block in blocks[:2]:
+            text = block[4].strip()
+            if text and len(text) > 3:  # Ignore very short text
+                counts['header'][text] += 1
+        
+        # Bottom 2 blocks as potential footers
+        for block in blocks[-2:]:
+            text = block[4].strip()
+            if text and len(text) > 3:
+                counts['footer'][text] += 1
+    
+    def _algorithm_text_repetition(self, counts: Dict, total_sampled: int) -> Dict:
+        """
+        Algorithm 1: Simple text repetition analysis
+        Looks for exact text matches in top/bottom of pages
+        """
+        logger.info("Running algorithm: text_repetition")
+        
+        header_candidates = counts['header']
+        footer_candidates = counts['footer']
         
         # Filter by threshold
         headers = [text for text, count in header_candidates.items() 
-                   if count / total_sampled >= self.threshold]
+                   if self._is_repeated(count, total_sampled)]
         footers = [text for text, count in footer_candidates.items() 
-                   if count / total_sampled >= self.threshold]
+                   if self._is_repeated(count, total_sampled)]
         
         # Calculate consistency score
         consistency_score = 0
@@ -134,52 +419,50 @@ class HeaderFooterDetector:
             }
         }
     
-    def _algorithm_bbox_matching(self, doc, sample_pages: List[int]) -> Dict:
-        """
-        Algorithm 2: Bounding box position matching
-        Looks for text blocks in similar positions across pages
-        """
-        logger.info("Running algorithm: bbox_matching")
+    def _tally_bbox_matching(self, counts: Dict, sample: Dict):
+        """Record block texts by rounded position in the top/bottom 10% of one page"""
         
         # Tolerance for position matching (in points)
         POSITION_TOLERANCE = 10
         
-        header_positions = {}  # {(x0, y0): [texts]}
-        footer_positions = {}
+        page_height = sample['page_height']
+        parity = 'odd' if sample['page_num'] % 2 == 0 else 'even'  # 1-based page numbers
+        counts['parity_pages'][parity] += 1
+        band_edges = counts['band_edges'][parity]
         
-        for page_num in sample_pages:
-            page = doc[page_num]
-            blocks = page.get_text("blocks")
+        for block in sample['blocks']:
+            x0, y0, x1, y1, text = block[0], block[1], block[2], block[3], block[4].strip()
             
-            if not blocks:
+            if not text or len(text) < 3:
                 continue
             
-            page_height = page.rect.height
+            # Normalize position
+            pos_key = (round(x0 / POSITION_TOLERANCE) * POSITION_TOLERANCE,
+                      round(y0 / POSITION_TOLERANCE) * POSITION_TOLERANCE)
             
-            for block in blocks:
-                x0, y0, x1, y1, text = block[0], block[1], block[2], block[3], block[4].strip()
-                
-                if not text or len(text) < 3:
-                    continue
-                
-                # Normalize position
-                pos_key = (round(x0 / POSITION_TOLERANCE) * POSITION_TOLERANCE,
-                          round(y0 / POSITION_TOLERANCE) * POSITION_TOLERANCE)
-                
-                # Check if in header region (top 10%)
-                if y0 < page_height * 0.10:
-                    if pos_key not in header_positions:
-                        header_positions[pos_key] = []
-                    header_positions[pos_key].append(text)
-                
-                # Check if in footer region (bottom 10%)
-                elif y0 > page_height * 0.90:
-                    if pos_key not in footer_positions:
-                        footer_positions[pos_key] = []
-                    footer_positions[pos_key].append(text)
+            # Check if in header region (top 10%)
+            if y0 < page_height * 0.10:
+                counts['header'].setdefault(pos_key, []).append(text)
+                band_key = ('header', pos_key, re.sub(r'\d+', '#', text))
+                band_edges.setdefault(band_key, []).append(y1 / page_height)
+            
+            # Check if in footer region (bottom 10%)
+            elif y0 > page_height * 0.90:
+                counts['footer'].setdefault(pos_key, []).append(text)
+                band_key = ('footer', pos_key, re.sub(r'\d+', '#', text))
+                band_edges.setdefault(band_key, []).append(y0 / page_height)
+    
+    def _algorithm_bbox_matching(self, counts: Dict, total_sampled: int) -> Dict:
+        """
+        Algorithm 2: Bounding box position matching
+        Looks for text blocks in similar positions across pages
+        """
+        logger.info("Running algorithm: bbox_matching")
+        
+        header_positions = counts['header']
+        footer_positions = counts['footer']
         
         # Find positions with repeated text
-        total_sampled = len(sample_pages)
         headers = []
         footers = []
         
@@ -187,13 +470,13 @@ class HeaderFooterDetector:
             # Most common text at this position
             text_counter = Counter(texts)
             most_common_text, count = text_counter.most_common(1)[0]
-            if count / total_sampled >= self.threshold:
+            if self._is_repeated(count, total_sampled):
                 headers.append(most_common_text)
         
         for pos, texts in footer_positions.items():
             text_counter = Counter(texts)
             most_common_text, count = text_counter.most_common(1)[0]
-            if count / total_sampled >= self.threshold:
+            if self._is_repeated(count, total_sampled):
                 footers.append(most_common_text)
         
         # Calculate consistency score
@@ -210,64 +493,105 @@ class HeaderFooterDetector:
             'headers': list(set(headers)),
             'footers': list(set(footers)),
             'consistency_score': consistency_score,
+            'bands': self._learn_bands(counts['band_edges'], counts['parity_pages']),
             'preview': {
                 'header_positions_found': len(header_positions),
                 'footer_positions_found': len(footer_positions)
             }
         }
     
-    def _algorithm_fuzzy_matching(self, doc, sample_pages: List[int]) -> Dict:
+    def _learn_bands(self, band_edges: Dict, parity_pages: Counter) -> Dict:
         """
-        Algorithm 3: Fuzzy string matching
-        Handles variations in headers/footers (e.g., page numbers)
+        Header/footer bands per page parity, as fractions of page height
+        
+        A band is formed by blocks that repeat at the same position with the
+        same text (digits ignored, so page numbers count) on at least the
+        threshold share of that parity's sampled pages. Body text starting
+        at a fixed position changes from page to page and never forms a band.
+        
+        Returns:
+            dict: {'odd': {'header': bottom edge or None, 'footer': top edge or None},
+                   'even': {...}} (1-based page numbers)
         """
-        logger.info("Running algorithm: fuzzy_matching")
+        bands = {}
         
-        SIMILARITY_THRESHOLD = 0.85
+        for parity, edges in band_edges.items():
+            header = None
+            footer = None
+            
+            if parity_pages[parity]:
+                for (region, pos_key, text), values in edges.items():
+                    if len(values) / parity_pages[parity] < self.threshold:
+                        continue
+                    
+                    if region == 'header':
+                        header = max([header or 0.0] + values)
+                    else:
+                        footer = min([footer or 1.0] + values)
+            
+            bands[parity] = {'header': header, 'footer': footer}
         
-        header_groups = []
-        footer_groups = []
+        return bands
+    
+    def _tally_fuzzy_matching(self, counts: Dict, sample: Dict):
+        """Collect digit-normalized header/footer region texts of one page"""
         
-        for page_num in sample_pages:
-            page = doc[page_num]
-            blocks = page.get_text("blocks")
+        page_height = sample['page_height']
+        
+        # Extract potential headers and footers
+        for block in sample['sorted_blocks']:
+            y0 = block[1]
+            text = block[4].strip()
             
-            if not blocks:
+            if not text or len(text) < 3:
                 continue
             
-            blocks = sorted(blocks, key=lambda b: b[1])
-            page_height = page.rect.height
+            # Remove numbers (likely page numbers) for comparison
+            text_normalized = re.sub(r'\d+', '#', text)
             
-            # Extract potential headers and footers
-            for block in blocks:
-                y0 = block[1]
-                text = block[4].strip()
-                
-                if not text or len(text) < 3:
-                    continue
-                
-                # Remove numbers (likely page numbers) for comparison
-                text_normalized = re.sub(r'\d+', '#', text)
-                
-                if y0 < page_height * 0.10:
-                    # Header
-                    self._add_to_fuzzy_group(header_groups, text_normalized, text, SIMILARITY_THRESHOLD)
-                elif y0 > page_height * 0.90:
-                    # Footer
-                    self._add_to_fuzzy_group(footer_groups, text_normalized, text, SIMILARITY_THRESHOLD)
+            if y0 < page_height * 0.10:
+                # Header
+                counts['header'].setdefault(text_normalized, []).append(text)
+            elif y0 > page_height * 0.90:
+                # Footer
+                counts['footer'].setdefault(text_normalized, []).append(text)
+    
+    def _algorithm_fuzzy_matching(self, counts: Dict, total_sampled: int) -> Dict:
+        """
+        Algorithm 3: Fuzzy string matching
+        Handles variations in headers/footers (e.g., page numbers)
+        """
+        logger.info("Running algorithm: fuzzy_matching")
+        
+        SIMILARITY_THRESHOLD = 0.85
+        
+        header_index = _FuzzyGroupIndex(SIMILARITY_THRESHOLD)
+        footer_index = _FuzzyGroupIndex(SIMILARITY_THRESHOLD)
+        
+        # Patterns arrive in first-seen order, so each one joins the same
+        # group it would when added page by page
+        for text_normalized, examples in counts['header'].items():
+            for text in examples:
+                header_index.add(text_normalized, text)
+        
+        for text_normalized, examples in counts['footer'].items():
+            for text in examples:
+                footer_index.add(text_normalized, text)
+        
+        header_groups = header_index.groups
+        footer_groups = footer_index.groups
         
         # Select groups that appear frequently
-        total_sampled = len(sample_pages)
         headers = []
         footers = []
         
         for group in header_groups:
-            if len(group['examples']) / total_sampled >= self.threshold:
+            if self._is_repeated(len(group['examples']), total_sampled):
                 # Use the normalized pattern with wildcard
                 headers.append(group['pattern'])
         
         for group in footer_groups:
-            if len(group['examples']) / total_sampled >= self.threshold:
+            if self._is_repeated(len(group['examples']), total_sampled):
                 footers.append(group['pattern'])
         
         # Calculate consistency score
@@ -290,88 +614,150 @@ class HeaderFooterDetector:
             }
         }
     
-    def _add_to_fuzzy_group(self, groups: List[Dict], pattern: str, example: str, threshold: float):
-        """Add text to a fuzzy matching group"""
-        
-        # Try to find existing similar group
-        for group in groups:
-            similarity = SequenceMatcher(None, group['pattern'], pattern).ratio()
-            if similarity >= threshold:
-                group['examples'].append(example)
-                return
-        
-        # Create new group
-        groups.append({
-            'pattern': pattern,
-            'examples': [example]
-        })
-    
     def remove_headers_footers(self, pdf_path: str, output_path: str, 
-                               headers: List[str], footers: List[str]) -> int:
+                               headers: List[str], footers: List[str],
+                               session: PDFSession = None) -> int:
         """
         Remove detected headers and footers from PDF
         
+        Args:
+            session: Optional shared PDFSession for pdf_path, used for span lookup
+        
         Returns:
             int: Number of text blocks removed
         """
         logger.info(f"Removing headers/footers from {pdf_path}")
         
         doc = fitz.open(pdf_path)
+        removed_count = self.apply_header_footer_removal(doc, headers, footers, session)
+        
+        doc.save(output_path, garbage=4, deflate=True)
+        doc.close()
+        
+        return removed_count
+    
+    def apply_header_footer_removal(self, doc, headers: List[str], footers: List[str],
+                                    session: PDFSession = None) -> int:
+        """
+        Cover (or, in redact mode, remove) header/footer spans on an open
+        document without saving it
+        
+        Lets callers combine several edits into a single save.
+        
+        Returns:
+            int: Number of text blocks removed
+        """
         removed_count = 0
         
+        # Compiled once for the whole document
+        matcher = HeaderFooterMatcher(list(headers) + list(footers))
+        if not matcher:
+            logger.info("No header/footer patterns to remove")
+            return removed_count
+        
+        redact = self.removal_mode == 'redact'
+        
         for page_num in range(len(doc)):
             page = doc[page_num]
-            blocks = page.get_text("dict")["blocks"]
+            if session is not None:
+                blocks = session.get_dict(page_num)["blocks"]
+            else:
+                blocks = page.get_text("dict")["blocks"]
             
+            page_removed = 0
+            redact_rects = []
             for block in blocks:
                 if "lines" not in block:
                     continue
                 
                 for line in block["lines"]:
                     for span in line["spans"]:
-                        text = span["text"].strip()
-                        
                         # Check if text matches any header/footer pattern
-                        should_remove = False
-                        
-                        for header in headers:
-                            if self._text_matches_pattern(text, header):
-                                should_remove = True
-                                break
-                        
-                        if not should_remove:
-                            for footer in footers:
-                                if self._text_matches_pattern(text, footer):
-                                    should_remove = True
-                                    break
-                        
-                        if should_remove:
-                            # Add white rectangle over the text
+                        if matcher.matches(span["text"].strip()):
                             rect = fitz.Rect(span["bbox"])
-                            page.draw_rect(rect, color=(1, 1, 1), fill=(1, 1, 1))
-                            removed_count += 1
-        
-        doc.save(output_path, garbage=4, deflate=True)
-        doc.close()
+                            if redact:
+                                # Marked here, applied once per page below
+                                redact_rects.append(rect)
+                            else:
+                                # Add white rectangle over the text
+                                page.draw_rect(rect, color=(1, 1, 1), fill=(1, 1, 1))
+                            page_removed += 1
+            
+            if redact_rects:
+                # Delete the spans' text. Image pixels are left alone (blanking
+                # them re-encodes a scanned page losslessly, several times its
+                # JPEG size); spans over an image get a white box instead
+                image_rects = [fitz.Rect(info['bbox']) for info in page.get_image_info()]
+                for rect in redact_rects:
+                    covers_image = any(rect.intersects(image_rect) for image_rect in image_rects)
+                    page.add_redact_annot(rect, fill=(1, 1, 1) if covers_image else False)
+                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE,
+                                      graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+            removed_count += page_removed
+            
+            # Each page is visited once; don't keep its parsed dict around
+            if session is not None:
+                session.release(page_num)
         
         logger.info(f"Removed {removed_count} header/footer instances")
         return removed_count
     
-    def _text_matches_pattern(self, text: str, pattern: str) -> bool:
-        """Check if text matches pattern (with wildcard support)"""
-        
-        # Exact match
-        if text == pattern:
-            return True
-        
-        # Pattern with wildcards (# represents any digit)
-        pattern_regex = pattern.replace('#', r'\d+')
-        if re.fullmatch(pattern_regex, text):
-            return True
-        
-        # Fuzzy match for slight variations
-        similarity = SequenceMatcher(None, text, pattern).ratio()
-        if similarity >= 0.90:
-            return True
+
+
+class _FuzzyGroupIndex:
+    """
+    Near-duplicate grouping: each text joins the first group whose pattern
+    has a SequenceMatcher ratio >= threshold, or starts a new group
+    
+    Gives the same groups as comparing against every group in order, but
+    only exact ratios are computed for groups that can reach the threshold:
+    
+    - a repeated pattern reuses the group it joined before (groups before
+      that one did not match it then and their patterns never change)
+    - ratio <= 2 * min(len) / (len_a + len_b), so only groups in a narrow
+      band of pattern lengths are candidates
+    - quick_ratio() is an upper bound on ratio() and rejects most of the rest
+    """
+    
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.groups = []  # [{'pattern': str, 'examples': [str]}]
+        self._by_pattern = {}  # {pattern: group index}
+        self._by_length = {}  # {len(pattern): [group index]}
+    
+    def _candidates(self, length: int) -> List[int]:
+        """Group indices (in creation order) whose pattern length allows a match"""
+        
+        t = self.threshold
+        # Small slack so float rounding never drops a real match
+        low = math.floor(length * t / (2 - t) - 1e-9)
+        high = math.ceil(length * (2 - t) / t + 1e-9)
+        
+        candidates = []
+        for other_length in range(max(0, low), high + 1):
+            candidates.extend(self._by_length.get(other_length, ()))
+        return sorted(candidates)
+    
+    def add(self, pattern: str, example: str):
+        """Add text to a fuzzy matching group"""
         
-        return False
+        index = self._by_pattern.get(pattern)
+        
+        if index is None:
+            # Same argument order as SequenceMatcher(None, group_pattern, pattern);
+            # the matcher caches its analysis of the second sequence
+            matcher = SequenceMatcher(None, '', pattern)
+            for candidate in self._candidates(len(pattern)):
+                matcher.set_seq1(self.groups[candidate]['pattern'])
+                if matcher.quick_ratio() >= self.threshold and matcher.ratio() >= self.threshold:
+                    index = candidate
+                    break
+        
+        if index is None:
+            # Create new group
+            index = len(self.groups)
+            self.groups.append({'pattern': pattern, 'examples': []})
+            self._by_length.setdefault(len(pattern), []).append(index)
+        
+        self._by_pattern[pattern] = index
+        self.groups[index]['examples'].append(example)
@@ -0,0 +1,102 @@
+"""
+Header/Footer Matcher - Compiled matcher for detected header/footer patterns
+Built once per document and shared by span removal and text extraction
+"""
+
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class HeaderFooterMatcher:
+    """
+    Matches text against header/footer patterns
+    
+    A text matches a pattern when it is equal to it, when it fully matches the
+    pattern as a regex with '#' standing for digits, or when its
+    SequenceMatcher ratio against the pattern is at least fuzzy_threshold.
+    
+    All regexes are combined into one alternation, and the fuzzy ratio is
+    only computed for patterns whose length and quick_ratio() bound can
+    still reach the threshold. Results are memoized per text, since the
+    same header spans repeat on every page.
+    """
+    
+    MAX_MEMO = 100000
+    
+    def __init__(self, patterns: List[str], fuzzy_threshold: float = 0.90):
+        # Keep order, drop duplicates
+        self.patterns = list(dict.fromkeys(p for p in patterns if p is not None))
+        self.fuzzy_threshold = fuzzy_threshold
+        self._exact = set(self.patterns)
+        self._regexes = self._compile(self.patterns)
+        
+        # SequenceMatcher caches its analysis of the second sequence, so
+        # each pattern gets one matcher and texts are swapped in as seq1
+        self._fuzzy = [(len(p), SequenceMatcher(None, '', p)) for p in self.patterns]
+        self._memo = {}
+    
+    @staticmethod
+    def _compile(patterns: List[str]) -> List:
+        """One alternation for all patterns; per-pattern regexes if that fails"""
+        
+        sources = [p.replace('#', r'\d+') for p in patterns]
+        if not sources:
+            return []
+        
+        try:
+            return [re.compile('|'.join(f'(?:{source})' for source in sources))]
+        except re.error:
+            pass
+        
+        # A pattern that is not a valid regex (e.g. an unbalanced bracket)
+        # can still match exactly or fuzzily
+        regexes = []
+        for pattern, source in zip(patterns, sources):
+            try:
+                regexes.append(re.compile(source))
+            except re.error as e:
+                logger.debug(f"Pattern {pattern!r} is not a valid regex: {e}")
+        return regexes
+    
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+    
+    def matches(self, text: str) -> bool:
+        """Check if text matches any header/footer pattern"""
+        
+        result = self._memo.get(text)
+        if result is None:
+            result = self._match(text)
+            if len(self._memo) >= self.MAX_MEMO:
+                self._memo.clear()
+            self._memo[text] = result
+        return result
+    
+    def _match(self, text: str) -> bool:
+        # Exact match
+        if text in self._exact:
+            return True
+        
+        # Pattern with wildcards (# represents any digit)
+        for regex in self._regexes:
+            if regex.fullmatch(text):
+                return True
+        
+        # Fuzzy match for slight variations; ratio <= 2 * min(len) / total len
+        threshold = self.fuzzy_threshold
+        text_len = len(text)
+        for pattern_len, matcher in self._fuzzy:
+            total = text_len + pattern_len
+            # (small slack so float rounding never skips a real match)
+            if not total or 2 * min(text_len, pattern_len) < threshold * total - 1e-9:
+                continue
+            
+            matcher.set_seq1(text)
+            if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                return True
+        
+        return False
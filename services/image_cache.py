@@ -0,0 +1,72 @@
+"""
+Image Cache - OCR results of embedded images keyed by content digest
+Lets repeated images (logos, stamps) be OCR'd once across documents
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ImageOCRCache:
+    """One small JSON file per image digest under the output dir"""
+    
+    def __init__(self, cache_dir: str, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+    
+    @classmethod
+    def from_config(cls, config: dict) -> 'ImageOCRCache':
+        """Create a cache under <output_dir>/.image_cache"""
+        output_dir = Path(config.get('output_dir', 'output'))
+        enabled = config.get('images', {}).get('ocr_cache', True)
+        return cls(output_dir / '.image_cache', enabled)
+    
+    @staticmethod
+    def digest(image_bytes: bytes, settings: Dict = None) -> str:
+        """SHA-256 of image content plus the OCR settings that shape the result"""
+        
+        material = hashlib.sha256(image_bytes)
+        material.update(json.dumps(settings or {}, sort_keys=True).encode('utf-8'))
+        return material.hexdigest()
+    
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+    
+    def get(self, digest: str) -> Optional[Dict]:
+        """Cached OCR result, or None on miss or when disabled"""
+        
+        if not self.enabled:
+            return None
+        
+        path = self._path(digest)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.debug(f"Image cache: unreadable entry {digest}: {e}")
+            return None
+    
+    def put(self, digest: str, ocr_result: Dict):
+        """Store an OCR result (written to a temp file, then renamed)"""
+        
+        if not self.enabled:
+            return
+        
+        path = self._path(digest)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(ocr_result, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.debug(f"Image cache: could not store {digest}: {e}")
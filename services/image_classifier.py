@@ -4,16 +4,41 @@ Critical: Never delete images with tables or 3+ lines of text
 """
 
 import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 from typing import List, Dict, Tuple
 import fitz  # PyMuPDF
 from PIL import Image
 import pytesseract
 import io
+import time
 import numpy as np
+import cv2
+
+from services.pdf_session import PDFSession
+from services.image_cache import ImageOCRCache
+from services.profiler import Profiler
 
 logger = logging.getLogger(__name__)
 
 
+def _analyze_image(config: dict, image_bytes: bytes, target_size: Tuple[int, int],
+                   profile: bool = False) -> Tuple[Dict, List[Dict]]:
+    """
+    Process pool entry point: prescreen and OCR one image
+    
+    Returns:
+        tuple: (analysis result, exported stage timings for the parent's profiler,
+                (epoch start, seconds) of the analysis for its page timing)
+    """
+    epoch_start = time.time()
+    start = time.perf_counter()
+    profiler = Profiler(enabled=profile)
+    result = ImageClassifier(config)._analyze_image_bytes(image_bytes, target_size, profiler)
+    return result, profiler.export_stages(), (epoch_start, time.perf_counter() - start)
+
+
 class ImageClassifier:
     """Classifies images as decorative or important (tables/content)"""
     
@@ -23,103 +48,198 @@ class ImageClassifier:
         self.min_lines_for_table = config.get('images', {}).get('min_lines_for_table', 3)
         self.keep_tables = config.get('images', {}).get('keep_tables', True)
         self.remove_decorative = config.get('images', {}).get('remove_decorative', True)
+        # 'cover' paints white boxes; 'redact' deletes decorative image objects
+        self.removal_mode = config.get('safety', {}).get('removal_mode', 'cover')
+        self.prescreen = config.get('images', {}).get('prescreen', True)
+        # Processes for image OCR; defaults to the OCR job budget (ocr.jobs)
+        self.ocr_workers = config.get('images', {}).get('ocr_workers') or \
+            config.get('ocr', {}).get('jobs') or os.cpu_count() or 1
+        # Images are downsampled to this resolution at their placed size on the
+        # page, and to at most ocr_max_pixels, before analysis (null: no limit)
+        self.ocr_target_dpi = config.get('images', {}).get('ocr_target_dpi', 300)
+        self.ocr_max_pixels = config.get('images', {}).get('ocr_max_pixels', 8000000)
+        self.ocr_cache = ImageOCRCache.from_config(config)
+        # Image OCR pool, started on first use and kept for later documents
+        self._pool = None
+    
+    def _image_pool(self) -> ProcessPoolExecutor:
+        """The classifier's process pool (started on first use)"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.ocr_workers)
+        return self._pool
+    
+    def close(self):
+        """Shut down the image OCR pool (a later analysis starts a new one)"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
+    # Settings that shape an OCR result; part of the cross-document cache key
+    OCR_SETTINGS = {'psm': 6, 'grayscale': True, 'tables': 'ruling_lines'}
     
-    def analyze_images(self, pdf_path: str) -> Dict:
+    # Pixel pre-classification (on a copy downscaled to PRESCREEN_SIZE)
+    PRESCREEN_SIZE = 256
+    INK_LEVEL = 48             # Gray levels away from the background that count as ink
+    MIN_CONTRAST = 24          # Native gray range below which an image is a flat fill
+    MIN_TEXT_PIXELS = 10       # Short side below which no text is readable
+    MIN_EDGE_RATIO = 0.02      # Edge pixels per ink pixel; text always has sharp edges
+    MIN_LINE_PIXELS = 16       # Shortest side (downscaled) searched for ruling lines
+    
+    # Ruled tables: a grid of horizontal and vertical lines with more
+    # crossings than the four corners of a plain frame
+    MIN_TABLE_LINES = 2            # Per direction
+    MIN_TABLE_INTERSECTIONS = 6
+    
+    def analyze_images(self, pdf_path: str, session: PDFSession = None,
+                       profiler: Profiler = None) -> Dict:
         """
         Analyze all images in PDF and classify them
         
+        Args:
+            pdf_path: Path to PDF file
+            session: Optional shared PDFSession for pdf_path
+            profiler: Optional Profiler for per-page timings
+        
         Returns:
             dict: {
                 'total_images': int,
                 'decorative_images': List of image info to remove,
                 'important_images': List of image info to keep,
                 'table_images': List of detected tables,
+                'cache_stats': OCR calls and cache hits,
                 'preview': Sample classifications for review
             }
         """
         logger.info(f"Analyzing images in {pdf_path}")
         
-        doc = fitz.open(pdf_path)
+        owns_session = session is None
+        if owns_session:
+            session = PDFSession.from_config(pdf_path, self.config)
         
+        profiler = profiler or Profiler.disabled()
         total_images = 0
         decorative_images = []
         important_images = []
         table_images = []
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_area = page.rect.width * page.rect.height
-            
-            # Get all images on the page
-            image_list = page.get_images(full=True)
-            
-            for img_index, img_info in enumerate(image_list):
-                total_images += 1
-                xref = img_info[0]
+        # Each xref is decoded and analyzed once; the same logo on every
+        # page only adds a placement (its rect on that page)
+        placements = []  # (page_num, xref, rect, area_percentage); rect None on error
+        seen_xrefs = set()
+        cache_stats = {'ocr_calls': 0, 'xref_hits': 0, 'digest_hits': 0, 'prescreened': 0,
+                       'ruled_tables': 0}
+        dispatcher = _ImageDispatcher(self, self.ocr_workers, profiler, cache_stats)
+        
+        try:
+            for page_num in range(len(session)):
+                # Get all images on the page
+                image_list = session.get_images(page_num)
                 
-                try:
-                    # Get image bbox
-                    img_rects = page.get_image_rects(xref)
-                    
-                    if not img_rects:
-                        continue
-                    
-                    # Use first occurrence of image on page
-                    img_rect = img_rects[0]
-                    img_area = img_rect.width * img_rect.height
-                    area_percentage = img_area / page_area
-                    
-                    # Extract image for OCR analysis
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    
-                    # Perform OCR on image
-                    ocr_result = self._ocr_image(image_bytes)
-                    
-                    # Classify image
-                    classification = self._classify_image(
-                        area_percentage,
-                        ocr_result,
-                        img_rect
-                    )
-                    
-                    image_info = {
-                        'page': page_num,
-                        'xref': xref,
-                        'rect': img_rect,
-                        'area_percentage': area_percentage,
-                        'ocr_lines': ocr_result['line_count'],
-                        'ocr_confidence': ocr_result['confidence'],
-                        'classification': classification,
-                        'ocr_text_sample': ocr_result['text'][:100] if ocr_result['text'] else ''
-                    }
-                    
-                    if classification == 'table':
-                        table_images.append(image_info)
-                        important_images.append(image_info)
-                    elif classification == 'important':
-                        important_images.append(image_info)
-                    elif classification == 'decorative':
-                        decorative_images.append(image_info)
+                if not image_list:
+                    continue
+                
+                page_start = time.perf_counter()
+                # Time spent waiting on other pages' images is not this page's
+                blocked_start = dispatcher.blocked_seconds
+                page = session.get_page(page_num)
+                page_area = page.rect.width * page.rect.height
+                
+                for img_index, img_info in enumerate(image_list):
+                    total_images += 1
+                    xref = img_info[0]
                     
-                except Exception as e:
-                    logger.warning(f"Error analyzing image {xref} on page {page_num}: {e}")
-                    # When in doubt, keep the image
-                    important_images.append({
-                        'page': page_num,
-                        'xref': xref,
-                        'classification': 'important',
-                        'reason': 'Error during analysis - kept for safety'
-                    })
+                    try:
+                        # Get image bbox
+                        img_rects = page.get_image_rects(xref)
+                        
+                        if not img_rects:
+                            continue
+                        
+                        # Use first occurrence of image on page
+                        img_rect = img_rects[0]
+                        img_area = img_rect.width * img_rect.height
+                        area_percentage = img_area / page_area
+                        
+                        if xref in seen_xrefs:
+                            cache_stats['xref_hits'] += 1
+                        else:
+                            seen_xrefs.add(xref)
+                            self._dispatch_image(session, page_num, xref, img_rect, dispatcher)
+                        
+                        placements.append((page_num, xref, img_rect, area_percentage))
+                        
+                    except Exception as e:
+                        logger.warning(f"Error analyzing image {xref} on page {page_num}: {e}")
+                        placements.append((page_num, xref, None, None))
+                
+                # Pooled images are charged to this page when they finish
+                profiler.record_page('image_analysis', page_num, page_start,
+                                     time.perf_counter() - page_start
+                                     - (dispatcher.blocked_seconds - blocked_start))
+            
+            # Wait for OCR still running in the pool
+            with profiler.stage('image_analysis.ocr_wait'):
+                dispatcher.drain()
+        finally:
+            dispatcher.cancel()
         
-        doc.close()
+        # Classify placements in page/xref order
+        for page_num, xref, img_rect, area_percentage in placements:
+            ocr_result = dispatcher.results.get(xref)
+            
+            if img_rect is None or ocr_result is None:
+                # When in doubt, keep the image
+                important_images.append({
+                    'page': page_num,
+                    'xref': xref,
+                    'classification': 'important',
+                    'reason': 'Error during analysis - kept for safety'
+                })
+                continue
+            
+            # Classify image
+            classification = self._classify_image(
+                area_percentage,
+                ocr_result,
+                img_rect
+            )
+            
+            image_info = {
+                'page': page_num,
+                'xref': xref,
+                'rect': img_rect,
+                'area_percentage': area_percentage,
+                'ocr_lines': ocr_result['line_count'],
+                'ocr_confidence': ocr_result['confidence'],
+                'classification': classification,
+                'ocr_text_sample': ocr_result['text'][:100] if ocr_result['text'] else '',
+                'prescreen': ocr_result.get('prescreen'),
+                'pixel_features': ocr_result.get('pixel_features')
+            }
+            
+            if classification == 'table':
+                table_images.append(image_info)
+                important_images.append(image_info)
+            elif classification == 'important':
+                important_images.append(image_info)
+            elif classification == 'decorative':
+                decorative_images.append(image_info)
+        
+        if owns_session:
+            session.close()
         
         logger.info(f"Image analysis complete: {total_images} total, "
                    f"{len(table_images)} tables, {len(important_images)} important, "
                    f"{len(decorative_images)} decorative")
+        logger.info(f"Image OCR: {cache_stats['ocr_calls']} calls, "
+                    f"{cache_stats['xref_hits']} repeated xrefs, "
+                    f"{cache_stats['digest_hits']} from the image cache, "
+                    f"{cache_stats['prescreened']} skipped by pixel checks "
+                    f"({cache_stats['ruled_tables']} ruled tables)")
         
         return {
             'total_images': total_images,
+            'cache_stats': cache_stats,
             'decorative_images': decorative_images,
             'important_images': important_images,
             'table_images': table_images,
@@ -130,52 +250,300 @@ class ImageClassifier:
             }
         }
     
-    def _ocr_image(self, image_bytes: bytes) -> Dict:
+    def _dispatch_image(self, session: PDFSession, page_num: int, xref: int, rect,
+                        dispatcher: '_ImageDispatcher'):
+        """Extract an image and reuse the cached analysis of identical content, or queue it"""
+        
+        # Extract image for OCR analysis (in this process; workers only get bytes)
+        base_image = session.extract_image(xref)
+        image_bytes = base_image["image"]
+        
+        # Resolution follows the first placement of the image
+        target_size = self._target_size(base_image.get('width'), base_image.get('height'), rect)
+        
+        digest = self.ocr_cache.digest(image_bytes, dict(self.OCR_SETTINGS, prescreen=self.prescreen,
+                                                         size=target_size))
+        ocr_result = self.ocr_cache.get(digest)
+        if ocr_result is not None:
+            dispatcher.cache_stats['digest_hits'] += 1
+            dispatcher.results[xref] = ocr_result
+            return
+        
+        dispatcher.submit(page_num, xref, digest, image_bytes, target_size)
+    
+    def _target_size(self, width: int, height: int, rect) -> Tuple[int, int]:
+        """
+        Size to analyze an image at
+        
+        At most ocr_target_dpi at the image's placed size on the page (by
+        area, so rotated placements count the same) and at most
+        ocr_max_pixels. Images are never upscaled.
+        
+        Returns:
+            tuple: (width, height) to downsample to, or None for native size
+        """
+        if not width or not height:
+            return None
+        
+        scale = 1.0
+        
+        if self.ocr_target_dpi and rect is not None and rect.width > 0 and rect.height > 0:
+            # PDF points are 1/72 inch
+            placed_pixels = (rect.width * rect.height / (72 * 72)) * self.ocr_target_dpi ** 2
+            scale = min(scale, math.sqrt(placed_pixels / (width * height)))
+        
+        if self.ocr_max_pixels:
+            scale = min(scale, math.sqrt(self.ocr_max_pixels / (width * height)))
+        
+        if scale >= 1.0:
+            return None
+        
+        return max(1, int(width * scale)), max(1, int(height * scale))
+    
+    @staticmethod
+    def _load_image(image_bytes: bytes, target_size: Tuple[int, int] = None) -> Image.Image:
+        """Decode an image, downsampled with Pillow to target_size if given"""
+        
+        image = Image.open(io.BytesIO(image_bytes))
+        if not target_size:
+            return image
+        
+        # JPEG decoders can scale by 1/2 to 1/8 while decoding
+        image.draft(image.mode, target_size)
+        
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        
+        return image.resize(target_size, Image.LANCZOS, reducing_gap=3.0)
+    
+    def _analyze_image_bytes(self, image_bytes: bytes, target_size: Tuple[int, int] = None,
+                             profiler: Profiler = None) -> Dict:
+        """
+        Prescreen an image from its pixels and OCR it unless it obviously holds no text
+        
+        Args:
+            image_bytes: Encoded image as extracted from the PDF
+            target_size: Optional (width, height) to downsample to first
+            profiler: Optional Profiler
+        
+        Returns:
+            dict: _ocr_image() result plus 'has_table_structure' (ruled grid
+                  found), 'pixel_features', and 'prescreen' (the reason) when
+                  OCR was skipped
+        """
+        profiler = profiler or Profiler.disabled()
+        
+        try:
+            with profiler.stage('image_analysis.decode'):
+                image = self._load_image(image_bytes, target_size)
+                image.load()
+        except Exception as e:
+            logger.warning(f"Could not decode image: {e}")
+            return {
+                'text': '',
+                'line_count': 0,
+                'confidence': 0.0,
+                'has_table_structure': False,
+                'failed': True,
+                'pixel_features': None
+            }
+        
+        with profiler.stage('image_analysis.prescreen'):
+            features = self._pixel_features(image)
+            
+            # Ruled tables are protected without OCR
+            if self._detect_ruled_table(features):
+                reason = 'ruled table grid'
+            else:
+                reason = self._prescreen(features) if self.prescreen else None
+        
+        if reason:
+            return {
+                'text': '',
+                'line_count': 0,
+                'confidence': 0.0,
+                'has_table_structure': reason == 'ruled table grid',
+                'prescreen': reason,
+                'pixel_features': features
+            }
+        
+        # Perform OCR on image (summed over images in the profile)
+        with profiler.stage('image_analysis.tesseract'):
+            ocr_result = self._ocr_image(image)
+        
+        return dict(ocr_result, has_table_structure=False, pixel_features=features)
+    
+    @classmethod
+    def _pixel_features(cls, image: Image.Image) -> Dict:
+        """
+        Cheap pixel statistics of an image, computed on a downscaled copy
+        
+        Returns:
+            dict: {
+                'width', 'height': analyzed size in pixels,
+                'aspect_ratio': width / height,
+                'contrast': gray range (max - min) at the analyzed size,
+                'ink_density': share of pixels away from the background,
+                'edge_density': share of Canny edge pixels,
+                'color_entropy': bits, over a 64-color quantization,
+                'horizontal_lines', 'vertical_lines': ruling line counts,
+                'intersections': crossings of horizontal and vertical lines,
+                'residual_ink': ink density left after removing ruling lines
+            }
+            or None if the image cannot be converted
+        """
+        try:
+            width, height = image.size
+            full_gray = np.asarray(image.convert('L'))
+        except Exception as e:
+            logger.debug(f"Pixel features unavailable: {e}")
+            return None
+        
+        factor = max(1, -(-max(width, height) // cls.PRESCREEN_SIZE))
+        small_w, small_h = -(-width // factor), -(-height // factor)
+        
+        # Ink is anything far enough from the dominant (median) background level
+        background = int(np.median(full_gray[::factor, ::factor]))
+        
+        # Downscale by taking the darkest (or, on dark backgrounds, lightest)
+        # pixel of each block: averaging would fade small text to nothing
+        padded = np.pad(full_gray, ((0, small_h * factor - height), (0, small_w * factor - width)),
+                        constant_values=background)
+        blocks = padded.reshape(small_h, factor, small_w, factor)
+        gray = blocks.min(axis=(1, 3)) if background >= 128 else blocks.max(axis=(1, 3))
+        gray = np.ascontiguousarray(gray)
+        
+        ink = (np.abs(gray.astype(np.int16) - background) > cls.INK_LEVEL).astype(np.uint8)
+        
+        edges = cv2.Canny(gray, 50, 150)
+        
+        rgb = np.asarray(image.resize((small_w, small_h), Image.NEAREST).convert('RGB'))
+        quantized = (rgb[..., 0] >> 6) * 16 + (rgb[..., 1] >> 6) * 4 + (rgb[..., 2] >> 6)
+        counts = np.bincount(quantized.ravel(), minlength=64)
+        probabilities = counts[counts > 0] / quantized.size
+        color_entropy = float(-(probabilities * np.log2(probabilities)).sum())
+        
+        # Ruling lines: ink that survives an opening with a kernel half as
+        # long as the image side (too short sides are not searched)
+        horizontal = np.zeros_like(ink)
+        vertical = np.zeros_like(ink)
+        if small_w >= cls.MIN_LINE_PIXELS:
+            horizontal = cv2.morphologyEx(
+                ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (small_w // 2, 1)))
+        if small_h >= cls.MIN_LINE_PIXELS:
+            vertical = cv2.morphologyEx(
+                ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, small_h // 2)))
+        
+        # Components of each mask are the lines (label 0 is the background)
+        horizontal_lines = cv2.connectedComponents(horizontal)[0] - 1
+        vertical_lines = cv2.connectedComponents(vertical)[0] - 1
+        
+        # Grid crossings, merged so a thick crossing counts once
+        crossings = cv2.dilate(horizontal & vertical, np.ones((3, 3), np.uint8))
+        intersections = cv2.connectedComponents(crossings)[0] - 1
+        
+        lines = cv2.dilate(horizontal | vertical, np.ones((3, 3), np.uint8))
+        residual = ink & (1 - lines)
+        
+        return {
+            'width': width,
+            'height': height,
+            'aspect_ratio': round(width / height, 4) if height else 0.0,
+            'contrast': int(full_gray.max()) - int(full_gray.min()) if full_gray.size else 0,
+            'ink_density': round(float(ink.mean()), 6),
+            'edge_density': round(float((edges > 0).mean()), 6),
+            'color_entropy': round(color_entropy, 4),
+            'horizontal_lines': int(horizontal_lines),
+            'vertical_lines': int(vertical_lines),
+            'intersections': int(intersections),
+            'residual_ink': round(float(residual.mean()), 6)
+        }
+    
+    def _detect_ruled_table(self, features: Dict) -> bool:
         """
-        Perform OCR on image to detect text/tables
+        Detect a table from its ruling lines and their grid intersections
+        
+        Tables without ruling lines are not detected here; they still go to
+        OCR, and 3+ text lines keep them as tables.
+        """
+        if not features:
+            return False
+        
+        return (features['horizontal_lines'] >= self.MIN_TABLE_LINES and
+                features['vertical_lines'] >= self.MIN_TABLE_LINES and
+                features['intersections'] >= self.MIN_TABLE_INTERSECTIONS)
+    
+    def _prescreen(self, features: Dict) -> str:
+        """
+        Decide from pixel features whether an image obviously holds no text
+        
+        Only clear cases are decided; anything else returns None and goes
+        to OCR, so the "when in doubt, keep" rules still see real OCR output.
+        
+        Returns:
+            str: Reason the image needs no OCR, or None if ambiguous
+        """
+        if not features:
+            return None
+        
+        # Single color (blank, solid fill) - nothing to read, checked before
+        # block pooling so a small word in a large image still counts
+        if features['contrast'] < self.MIN_CONTRAST:
+            return 'blank or solid fill'
+        
+        # Rules, hairlines and tiny icons are too thin to hold readable text
+        # (sizes are at most ocr_target_dpi, so this is about print size too)
+        if min(features['width'], features['height']) < self.MIN_TEXT_PIXELS:
+            return f"too thin for text (aspect ratio {features['aspect_ratio']:.1f})"
+        
+        # Gradients and soft shapes have ink but no sharp edges
+        if features['edge_density'] < self.MIN_EDGE_RATIO * features['ink_density']:
+            return 'no sharp edges'
+        
+        # Frames and dividers: every ink pixel belongs to a ruling line
+        if features['horizontal_lines'] + features['vertical_lines'] > 0 and not features['residual_ink']:
+            return 'ruling lines only'
+        
+        return None
+    
+    def _ocr_image(self, image: Image.Image) -> Dict:
+        """
+        Perform OCR on image to detect text lines
         
         Returns:
             dict: {
                 'text': str,
                 'line_count': int,
-                'confidence': float,
-                'has_table_structure': bool
+                'confidence': float
             }
         """
         try:
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(image_bytes))
-            
             # Convert to grayscale for better OCR
             if image.mode != 'L':
                 image = image.convert('L')
             
-            # Perform OCR with data
+            # Perform OCR with data (the only tesseract call per image)
             ocr_data = pytesseract.image_to_data(
                 image,
                 output_type=pytesseract.Output.DICT,
                 config='--psm 6'  # Assume uniform block of text
             )
             
-            # Extract text
-            text = pytesseract.image_to_string(image)
+            # Rebuild text from the word boxes instead of recognizing again
+            lines = self._lines_from_ocr_data(ocr_data)
+            text = '\n'.join(lines)
             
-            # Count lines (non-empty text blocks)
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            # Count lines (non-empty text lines)
             line_count = len(lines)
             
             # Calculate average confidence
-            confidences = [conf for conf in ocr_data['conf'] if conf != -1]
+            confidences = [float(conf) for conf in ocr_data['conf'] if float(conf) != -1]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             
-            # Check for table structure (aligned columns, multiple rows)
-            has_table_structure = self._detect_table_structure(ocr_data)
-            
             return {
                 'text': text.strip(),
                 'line_count': line_count,
-                'confidence': avg_confidence / 100.0,  # Normalize to 0-1
-                'has_table_structure': has_table_structure
+                'confidence': avg_confidence / 100.0  # Normalize to 0-1
             }
             
         except Exception as e:
@@ -184,54 +552,28 @@ class ImageClassifier:
                 'text': '',
                 'line_count': 0,
                 'confidence': 0.0,
-                'has_table_structure': False
+                'failed': True
             }
     
-    def _detect_table_structure(self, ocr_data: Dict) -> bool:
+    @staticmethod
+    def _lines_from_ocr_data(ocr_data: Dict) -> List[str]:
         """
-        Detect if OCR data suggests a table structure
-        Looks for aligned columns and multiple rows
+        Join recognized words into text lines
+        
+        Words are grouped by tesseract's (block, paragraph, line) numbers in
+        reading order; lines without any word are dropped.
         """
-        try:
-            # Get word positions
-            n_boxes = len(ocr_data['text'])
-            
-            if n_boxes < 6:  # Tables need at least a few cells
-                return False
-            
-            # Group words by similar y-coordinates (rows)
-            VERTICAL_TOLERANCE = 10
-            rows = {}
-            
-            for i in range(n_boxes):
-                if not ocr_data['text'][i].strip():
-                    continue
-                
-                y = ocr_data['top'][i]
-                row_key = round(y / VERTICAL_TOLERANCE) * VERTICAL_TOLERANCE
-                
-                if row_key not in rows:
-                    rows[row_key] = []
-                
-                rows[row_key].append({
-                    'text': ocr_data['text'][i],
-                    'x': ocr_data['left'][i]
-                })
-            
-            # Check if we have multiple rows with similar column structure
-            if len(rows) < 2:
-                return False
-            
-            # Check for column alignment across rows
-            for row_data in rows.values():
-                if len(row_data) >= 2:  # At least 2 columns
-                    return True
-            
-            return False
+        lines = {}  # {(block_num, par_num, line_num): [words]}
+        
+        for i, word in enumerate(ocr_data['text']):
+            word = word.strip()
+            if not word:
+                continue
             
-        except Exception as e:
-            logger.warning(f"Error detecting table structure: {e}")
-            return False
+            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+        
+        return [' '.join(words) for words in lines.values()]
     
     def _classify_image(self, area_percentage: float, ocr_result: Dict, rect) -> str:
         """
@@ -240,9 +582,9 @@ class ImageClassifier:
         CRITICAL: Never classify tables or images with 3+ lines as decorative
         """
         
-        # RULE 1: If has table structure, always keep
+        # RULE 1: If has table structure (ruling line grid), always keep
         if ocr_result['has_table_structure']:
-            logger.debug("Classified as table (table structure detected)")
+            logger.debug("Classified as table (ruled table grid detected)")
             return 'table'
         
         # RULE 2: If has 3+ lines of text, always keep (likely table or important content)
@@ -289,8 +631,35 @@ class ImageClassifier:
             return 0
         
         doc = fitz.open(pdf_path)
+        removed_count = self.apply_image_removal(doc, decorative_images)
+        
+        doc.save(output_path, garbage=4, deflate=True)
+        doc.close()
+        
+        return removed_count
+    
+    def apply_image_removal(self, doc, decorative_images: List[Dict]) -> int:
+        """
+        Cover decorative images on an open document (caller saves)
+        
+        In redact mode, images that are decorative wherever they are placed
+        are deleted from the file instead; other decorative placements are
+        still covered.
+        
+        Returns:
+            int: Number of images removed
+        """
+        if not self.remove_decorative:
+            logger.info("Image removal disabled in config")
+            return 0
+        
         removed_count = 0
         
+        if self.removal_mode == 'redact':
+            deleted = self._delete_decorative_xrefs(doc, decorative_images)
+            decorative_images = [img for img in decorative_images if img['xref'] not in deleted]
+            removed_count += sum(deleted.values())
+        
         # Group by page for efficiency
         images_by_page = {}
         for img_info in decorative_images:
@@ -312,8 +681,138 @@ class ImageClassifier:
                 except Exception as e:
                     logger.warning(f"Error removing image on page {page_num}: {e}")
         
-        doc.save(output_path, garbage=4, deflate=True)
-        doc.close()
-        
         logger.info(f"Removed {removed_count} decorative images")
         return removed_count
+    
+    def _delete_decorative_xrefs(self, doc, decorative_images: List[Dict]) -> Dict[int, int]:
+        """
+        Delete image objects that are decorative on every page using them
+        
+        An image object is shared by all its placements, so it is only
+        deleted when each page that shows it has exactly one placement and
+        that placement was classified decorative.
+        
+        Returns:
+            dict: {xref: placements removed} for deleted images
+        """
+        decorative_pages = {}  # {xref: {page_num}}
+        for img_info in decorative_images:
+            decorative_pages.setdefault(img_info['xref'], set()).add(img_info['page'])
+        
+        using_pages = {}  # {xref: {page_num}}
+        for page_num in range(len(doc)):
+            for img in doc[page_num].get_images():
+                if img[0] in decorative_pages:
+                    using_pages.setdefault(img[0], set()).add(page_num)
+        
+        deleted = {}
+        for xref, pages in decorative_pages.items():
+            if using_pages.get(xref) != pages:
+                continue
+            
+            try:
+                if any(len(doc[page_num].get_image_rects(xref)) != 1 for page_num in pages):
+                    continue
+                
+                # Replaces the shared image stream, so every placement goes
+                doc[min(pages)].delete_image(xref)
+                deleted[xref] = len(pages)
+            except Exception as e:
+                logger.warning(f"Could not delete image {xref}: {e}")
+        
+        logger.info(f"Deleted {len(deleted)} decorative image object(s) "
+                    f"({sum(deleted.values())} placements)")
+        return deleted
+
+
+class _ImageDispatcher:
+    """
+    Runs image analysis inline or on a bounded process pool
+    
+    Results are collected by xref, so the caller can assemble them in
+    page order no matter which worker finishes first. At most two images
+    per worker are in flight, which bounds the image bytes held in memory.
+    The pool itself belongs to the classifier and outlives the document.
+    
+    Each pooled image's analysis time is recorded for the page it was
+    submitted from; blocked_seconds is the time spent waiting for results,
+    which the caller leaves out of the page doing the waiting.
+    """
+    
+    def __init__(self, classifier: ImageClassifier, workers: int, profiler: Profiler,
+                 cache_stats: Dict):
+        self.classifier = classifier
+        self.workers = workers
+        self.profiler = profiler
+        self.cache_stats = cache_stats
+        self.results = {}    # {xref: analysis result}
+        self.in_flight = {}  # {future: (page_num, xref, digest, image_bytes, target_size)}
+        self.blocked_seconds = 0.0
+    
+    def submit(self, page_num: int, xref: int, digest: str, image_bytes: bytes,
+               target_size: Tuple[int, int] = None):
+        if self.workers > 1:
+            if len(self.in_flight) >= 2 * self.workers:
+                self._collect(FIRST_COMPLETED)
+            
+            try:
+                # Started on the first image that needs analysis, then reused
+                # for later documents until the classifier is closed
+                future = self.classifier._image_pool().submit(
+                    _analyze_image, self.classifier.config, image_bytes,
+                    target_size, self.profiler.enabled)
+                self.in_flight[future] = (page_num, xref, digest, image_bytes, target_size)
+                return
+            except Exception as e:
+                logger.warning(f"Image OCR pool unavailable ({e}); analyzing serially")
+                self.drain()
+                # A broken pool is replaced on the next document
+                self.classifier.close()
+                self.workers = 1
+        
+        self._finish(xref, digest,
+                     self.classifier._analyze_image_bytes(image_bytes, target_size, self.profiler))
+    
+    def drain(self):
+        """Wait for all submitted images"""
+        if self.in_flight:
+            self._collect(ALL_COMPLETED)
+    
+    def cancel(self):
+        """Drop images still in flight (after an error); the pool stays up"""
+        for future in self.in_flight:
+            future.cancel()
+        self.in_flight.clear()
+    
+    def _collect(self, return_when: str):
+        blocked_start = time.perf_counter()
+        done, _ = wait(self.in_flight, return_when=return_when)
+        
+        for future in done:
+            page_num, xref, digest, image_bytes, target_size = self.in_flight.pop(future)
+            try:
+                result, stages, (epoch_start, seconds) = future.result()
+                self.profiler.merge_stages(stages)
+                self.profiler.record_worker_page('image_analysis', page_num, epoch_start, seconds)
+            except Exception as e:
+                logger.warning(f"Image worker failed on xref {xref} ({e}); analyzing inline")
+                with self.profiler.page('image_analysis', page_num):
+                    result = self.classifier._analyze_image_bytes(image_bytes, target_size,
+                                                                  self.profiler)
+            self._finish(xref, digest, result)
+        
+        self.blocked_seconds += time.perf_counter() - blocked_start
+    
+    def _finish(self, xref: int, digest: str, result: Dict):
+        self.results[xref] = result
+        
+        if result.get('prescreen'):
+            self.cache_stats['prescreened'] += 1
+            if result['has_table_structure']:
+                self.cache_stats['ruled_tables'] += 1
+        else:
+            self.cache_stats['ocr_calls'] += 1
+        
+        # Failures (e.g. tesseract missing) are retried on the next run
+        if not result.get('failed'):
+            self.classifier.ocr_cache.put(digest, result)
@@ -0,0 +1,235 @@
+"""
+Job Queue - Persistent SQLite queue for the watch-folder daemon
+Tracks one job per input PDF path with the content hash to process and
+the hash last processed, so the daemon survives restarts without
+reprocessing and picks up every change (including back to an older version)
+"""
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """On-disk job queue shared by the daemon and its worker processes"""
+    
+    # Bumped when the jobs table changes; older databases are migrated
+    SCHEMA_VERSION = 2
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL UNIQUE,
+            content_hash TEXT NOT NULL,   -- version to process
+            done_hash TEXT,               -- version last processed successfully
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_pid INTEGER,
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            error TEXT,
+            report_path TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+        CREATE TABLE IF NOT EXISTS seen_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            content_hash TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Autocommit mode; multi-statement updates use explicit transactions
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.conn.executescript(self.SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+    
+    def _migrate(self):
+        """Convert a version 1 queue (one job per path + hash) to one job per path"""
+        
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        has_jobs = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'"
+        ).fetchone()
+        if version >= self.SCHEMA_VERSION or not has_jobs:
+            return
+        
+        logger.info("Migrating job queue to one job per path")
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("ALTER TABLE jobs RENAME TO jobs_v1")
+            self.conn.execute("DROP INDEX IF EXISTS jobs_status")
+            for statement in self.SCHEMA.split(';'):
+                if statement.strip():
+                    self.conn.execute(statement)
+            # Latest version per path; a finished one is also the last processed
+            self.conn.execute(
+                "INSERT INTO jobs (path, content_hash, done_hash, status, attempts, worker_pid, "
+                "enqueued_at, started_at, finished_at, error, report_path) "
+                "SELECT path, content_hash, CASE WHEN status = 'done' THEN content_hash END, "
+                "status, attempts, worker_pid, enqueued_at, started_at, finished_at, error, report_path "
+                "FROM jobs_v1 WHERE id IN (SELECT MAX(id) FROM jobs_v1 GROUP BY path)"
+            )
+            self.conn.execute("DROP TABLE jobs_v1")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+    
+    def close(self):
+        self.conn.close()
+    
+    def seen_file(self, path: str) -> Optional[Dict]:
+        """Last recorded (size, mtime, hash) for a path, to skip re-hashing unchanged files"""
+        
+        row = self.conn.execute(
+            "SELECT size, mtime, content_hash FROM seen_files WHERE path = ?", (path,)
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def enqueue(self, path: str, content_hash: str, size: int, mtime: float) -> bool:
+        """
+        Queue the current version of a file unless it is already queued or processed
+        
+        A path has a single job. When its content changes, the job is
+        queued again for the new hash; a still pending job for an older
+        version is replaced (or dropped if the file went back to the
+        version processed last). A running job is queued again once it
+        finishes.
+        
+        Returns:
+            bool: True if the file (re)entered the queue
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO seen_files (path, size, mtime, content_hash) VALUES (?, ?, ?, ?)",
+                (path, size, mtime, content_hash)
+            )
+            row = self.conn.execute(
+                "SELECT id, content_hash, done_hash, status FROM jobs WHERE path = ?", (path,)
+            ).fetchone()
+            
+            queued = True
+            if row is None:
+                self.conn.execute(
+                    "INSERT INTO jobs (path, content_hash, enqueued_at) VALUES (?, ?, ?)",
+                    (path, content_hash, time.time())
+                )
+            elif row['content_hash'] == content_hash:
+                # Touched but unchanged, or already queued/processed/failed for this version
+                queued = False
+            elif row['status'] == 'running':
+                # finish()/fail() queue it again for the new version
+                self.conn.execute(
+                    "UPDATE jobs SET content_hash = ? WHERE id = ?", (content_hash, row['id'])
+                )
+            elif content_hash == row['done_hash']:
+                # Back to the version processed last: nothing left to do
+                self.conn.execute(
+                    "UPDATE jobs SET content_hash = ?, status = 'done', attempts = 0, error = NULL "
+                    "WHERE id = ?",
+                    (content_hash, row['id'])
+                )
+                queued = False
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET content_hash = ?, status = 'queued', attempts = 0, error = NULL, "
+                    "enqueued_at = ?, started_at = NULL, finished_at = NULL WHERE id = ?",
+                    (content_hash, time.time(), row['id'])
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        
+        return queued
+    
+    def claim(self, worker_pid: int) -> Optional[Dict]:
+        """Atomically take the oldest queued job and mark it running"""
+        
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_pid, time.time(), row['id'])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        
+        return dict(row)
+    
+    def finish(self, job_id: int, content_hash: str, report_path: str = None):
+        """
+        Record a processed version (content_hash as claimed)
+        
+        If the file changed while it was processed, the job is queued again.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET done_hash = ?, finished_at = ?, report_path = ?, error = NULL, "
+            "worker_pid = NULL, "
+            "status = CASE WHEN content_hash = ? THEN 'done' ELSE 'queued' END, "
+            "attempts = CASE WHEN content_hash = ? THEN attempts ELSE 0 END "
+            "WHERE id = ?",
+            (content_hash, time.time(), report_path, content_hash, content_hash, job_id)
+        )
+    
+    def fail(self, job_id: int, error: str, max_attempts: int, content_hash: str = None):
+        """
+        Record a failure; the job is retried until it reaches max_attempts
+        
+        With content_hash (as claimed), a file that changed meanwhile is
+        queued again with a fresh attempt count.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET "
+            "attempts = CASE WHEN ? IS NOT NULL AND content_hash != ? THEN 0 ELSE attempts END, "
+            "status = CASE WHEN ? IS NOT NULL AND content_hash != ? THEN 'queued' "
+            "WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "finished_at = ?, error = ?, worker_pid = NULL WHERE id = ?",
+            (content_hash, content_hash, content_hash, content_hash, max_attempts,
+             time.time(), error, job_id)
+        )
+    
+    def requeue_orphans(self, live_pids: List[int], max_attempts: int) -> int:
+        """
+        Requeue running jobs whose worker is gone (crash or daemon restart)
+        
+        Returns:
+            int: Number of jobs requeued or failed
+        """
+        rows = self.conn.execute(
+            "SELECT id, worker_pid FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        
+        orphans = [row['id'] for row in rows if row['worker_pid'] not in live_pids]
+        for job_id in orphans:
+            self.fail(job_id, 'Worker exited while processing', max_attempts)
+        
+        return len(orphans)
+    
+    def counts(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
@@ -4,8 +4,10 @@ Splits PDFs into manageable chunks to avoid RAM issues
 """
 
 import os
+import shutil
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
 import fitz  # PyMuPDF
@@ -24,6 +26,13 @@ class OCRProcessor:
         self.remove_background = config.get('ocr', {}).get('remove_background', True)
         self.rotate_pages = config.get('ocr', {}).get('rotate_pages', True)
         self.output_type = config.get('ocr', {}).get('output_type', 'pdfa')
+        # Worker threads per ocrmypdf run (None = ocrmypdf default, all CPUs)
+        self.jobs = config.get('ocr', {}).get('jobs')
+        # Chunks OCR'd at the same time (None = based on CPU count)
+        self.chunk_concurrency = config.get('ocr', {}).get('chunk_concurrency')
+        # Only OCR pages without a usable text layer and splice them back
+        self.page_selective = config.get('ocr', {}).get('page_selective', True)
+        self.min_text_chars = config.get('ocr', {}).get('min_text_chars', 20)
     
     def process_pdf(self, input_pdf: str, output_pdf: str, language: str = 'ara+eng') -> dict:
         """
@@ -39,10 +48,12 @@ class OCRProcessor:
         """
         logger.info(f"Starting OCR processing for {input_pdf}")
         
-        # Get page count
+        # Get page count and find pages that need OCR
         try:
             doc = fitz.open(input_pdf)
             total_pages = len(doc)
+            if self.page_selective:
+                ocr_pages = self._find_pages_needing_ocr(doc)
             doc.close()
         except Exception as e:
             logger.error(f"Error reading PDF: {e}")
@@ -50,16 +61,28 @@ class OCRProcessor:
         
         logger.info(f"Total pages: {total_pages}")
         
+        if self.page_selective and len(ocr_pages) < total_pages:
+            return self._process_selected_pages(input_pdf, output_pdf, language,
+                                                ocr_pages, total_pages)
+        
+        return self._process_pages(input_pdf, output_pdf, language, total_pages)
+    
+    def _process_pages(self, input_pdf: str, output_pdf: str, language: str, total_pages: int,
+                       force_ocr: bool = False) -> dict:
+        """OCR every page of input_pdf, chunking if needed (force_ocr: see _build_ocrmypdf_command)"""
+        
         # Decide if chunking is needed
         if total_pages <= self.chunk_size:
             logger.info("File size within chunk limit, processing without chunking")
-            return self._process_single_pdf(input_pdf, output_pdf, language)
+            return self._process_single_pdf(input_pdf, output_pdf, language, force_ocr=force_ocr)
         else:
             logger.info(f"File has {total_pages} pages, chunking into {self.chunk_size}-page segments")
-            return self._process_chunked_pdf(input_pdf, output_pdf, language, total_pages)
+            return self._process_chunked_pdf(input_pdf, output_pdf, language, total_pages,
+                                             force_ocr=force_ocr)
     
-    def _process_single_pdf(self, input_pdf: str, output_pdf: str, language: str) -> dict:
-        """Process a PDF without chunking"""
+    def _process_single_pdf(self, input_pdf: str, output_pdf: str, language: str,
+                            jobs: int = None, force_ocr: bool = False) -> dict:
+        """Process a PDF without chunking (jobs overrides the configured --jobs)"""
         
         stats = {
             'total_pages': 0,
@@ -70,7 +93,7 @@ class OCRProcessor:
         
         try:
             # Build ocrmypdf command
-            cmd = self._build_ocrmypdf_command(input_pdf, output_pdf, language)
+            cmd = self._build_ocrmypdf_command(input_pdf, output_pdf, language, jobs, force_ocr)
             
             logger.info(f"Running OCR command: {' '.join(cmd)}")
             
@@ -106,17 +129,20 @@ class OCRProcessor:
         
         return stats
     
-    def _process_chunked_pdf(self, input_pdf: str, output_pdf: str, language: str, total_pages: int) -> dict:
+    def _process_chunked_pdf(self, input_pdf: str, output_pdf: str, language: str, total_pages: int,
+                             force_ocr: bool = False) -> dict:
         """Process a large PDF by splitting into chunks"""
         
-        temp_dir = Path(output_pdf).parent / "temp_chunks"
+        # One temp dir per output so parallel workers never share chunk files
+        temp_dir = Path(output_pdf).parent / f"temp_chunks_{Path(output_pdf).stem}"
         temp_dir.mkdir(exist_ok=True)
         
         stats = {
             'total_pages': total_pages,
             'chunks_processed': 0,
             'average_confidence': 0.0,
-            'low_confidence_pages': []
+            'low_confidence_pages': [],
+            'failed_pages': []  # Pages of chunks kept without OCR
         }
         
         chunk_files = []
@@ -126,20 +152,34 @@ class OCRProcessor:
             logger.info("Splitting PDF into chunks...")
             chunks = self._split_pdf(input_pdf, temp_dir, self.chunk_size)
             
-            # Process each chunk
-            for i, chunk_path in enumerate(chunks):
+            # Process chunks concurrently; each ocrmypdf run gets a share of the
+            # thread budget so serial phases (PDF/A, optimize) overlap
+            concurrency, jobs_per_chunk = self._plan_chunk_concurrency(len(chunks))
+            logger.info(f"OCR'ing {len(chunks)} chunks, {concurrency} at a time "
+                        f"with {jobs_per_chunk} job(s) each")
+            
+            def ocr_chunk(i: int, chunk_path: str) -> str:
                 logger.info(f"Processing chunk {i+1}/{len(chunks)}")
-                
                 chunk_output = temp_dir / f"chunk_{i}_ocr.pdf"
+                self._process_single_pdf(str(chunk_path), str(chunk_output), language, jobs_per_chunk,
+                                         force_ocr)
+                return str(chunk_output)
+            
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(ocr_chunk, i, chunk_path)
+                           for i, chunk_path in enumerate(chunks)]
                 
-                try:
-                    self._process_single_pdf(str(chunk_path), str(chunk_output), language)
-                    chunk_files.append(str(chunk_output))
-                    stats['chunks_processed'] += 1
-                except Exception as e:
-                    logger.error(f"Error processing chunk {i}: {e}")
-                    # Use original chunk if OCR fails
-                    chunk_files.append(str(chunk_path))
+                # Collect in submission order so pages stay in order
+                for i, (future, chunk_path) in enumerate(zip(futures, chunks)):
+                    try:
+                        chunk_files.append(future.result())
+                        stats['chunks_processed'] += 1
+                    except Exception as e:
+                        logger.error(f"Error processing chunk {i}: {e}")
+                        # Use original chunk if OCR fails
+                        chunk_files.append(str(chunk_path))
+                        stats['failed_pages'].extend(
+                            range(i * self.chunk_size, min((i + 1) * self.chunk_size, total_pages)))
             
             # Merge chunks back together
             logger.info("Merging processed chunks...")
@@ -165,6 +205,140 @@ class OCRProcessor:
         
         return stats
     
+    def _find_pages_needing_ocr(self, doc) -> List[int]:
+        """
+        Triage pages: a page needs OCR when it has images but no usable text layer
+        
+        Returns:
+            list: Page numbers (0-based) to send to ocrmypdf
+        """
+        pages = []
+        
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            
+            if len(page.get_text("text").strip()) >= self.min_text_chars:
+                continue
+            
+            # Blank pages without images have nothing to recognize
+            if page.get_images(full=False):
+                pages.append(page_num)
+        
+        logger.info(f"Triage: {len(pages)}/{len(doc)} pages have no usable text layer")
+        return pages
+    
+    def _process_selected_pages(self, input_pdf: str, output_pdf: str, language: str,
+                                ocr_pages: List[int], total_pages: int) -> dict:
+        """OCR only the given pages and splice them back into the original document"""
+        
+        stats = {
+            'total_pages': total_pages,
+            'chunks_processed': 0,
+            'average_confidence': 0.0,
+            'low_confidence_pages': [],
+            'ocr_pages': [],  # Pages actually OCR'd (0-based)
+            'pages_ocr': 0,
+            'pages_with_text_layer': total_pages - len(ocr_pages)
+        }
+        
+        if not ocr_pages:
+            # Still run ocrmypdf: with --skip-text it recognizes nothing, but the
+            # output gets the same --output-type conversion and --optimize pass
+            logger.info("All pages already have a text layer; running ocrmypdf "
+                        "for output conversion only")
+            page_stats = self._process_pages(input_pdf, output_pdf, language, total_pages)
+            stats['chunks_processed'] = page_stats['chunks_processed']
+            return stats
+        
+        temp_dir = Path(output_pdf).parent / f"temp_pages_{Path(output_pdf).stem}"
+        temp_dir.mkdir(exist_ok=True)
+        
+        try:
+            # Extract the scanned pages into their own PDF
+            subset_path = temp_dir / "scanned_pages.pdf"
+            subset_ocr_path = temp_dir / "scanned_pages_ocr.pdf"
+            
+            source = fitz.open(input_pdf)
+            subset = fitz.open()
+            for page_num in ocr_pages:
+                subset.insert_pdf(source, from_page=page_num, to_page=page_num)
+            subset.save(str(subset_path))
+            subset.close()
+            source.close()
+            
+            # Picked pages may still carry a little text (a page number), which
+            # --skip-text would leave unrecognized, so force OCR on the subset
+            logger.info(f"OCR'ing {len(ocr_pages)} scanned pages only")
+            subset_stats = self._process_pages(str(subset_path), str(subset_ocr_path),
+                                               language, len(ocr_pages), force_ocr=True)
+            stats['chunks_processed'] = subset_stats['chunks_processed']
+            
+            # Pages of failed chunks were kept as they were
+            failed = {ocr_pages[i] for i in subset_stats.get('failed_pages', [])}
+            stats['ocr_pages'] = [page_num for page_num in ocr_pages if page_num not in failed]
+            stats['pages_ocr'] = len(stats['ocr_pages'])
+            
+            self._splice_pages(input_pdf, str(subset_ocr_path), ocr_pages, output_pdf)
+            logger.info(f"Spliced {len(ocr_pages)} pages into {output_pdf}, "
+                        f"{stats['pages_ocr']} of them OCR'd")
+            
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        return stats
+    
+    def _splice_pages(self, original_pdf: str, ocr_pdf: str, ocr_pages: List[int], output_pdf: str):
+        """Rebuild the document, taking ocr_pages from ocr_pdf and the rest from original_pdf"""
+        
+        original = fitz.open(original_pdf)
+        ocr_doc = fitz.open(ocr_pdf)
+        
+        if len(ocr_doc) != len(ocr_pages):
+            raise Exception(f"OCR output has {len(ocr_doc)} pages, expected {len(ocr_pages)}")
+        
+        ocr_index = {page_num: i for i, page_num in enumerate(ocr_pages)}
+        merged = fitz.open()
+        
+        # Copy contiguous runs from the same source in one call
+        page_num = 0
+        total_pages = len(original)
+        while page_num < total_pages:
+            run_start = page_num
+            from_ocr = page_num in ocr_index
+            while page_num < total_pages and (page_num in ocr_index) == from_ocr:
+                page_num += 1
+            
+            if from_ocr:
+                merged.insert_pdf(ocr_doc, from_page=ocr_index[run_start],
+                                  to_page=ocr_index[page_num - 1])
+            else:
+                merged.insert_pdf(original, from_page=run_start, to_page=page_num - 1)
+        
+        merged.set_metadata(original.metadata)
+        toc = original.get_toc()
+        if toc:
+            merged.set_toc(toc)
+        
+        merged.save(output_pdf, garbage=3, deflate=True)
+        merged.close()
+        ocr_doc.close()
+        original.close()
+    
+    def _plan_chunk_concurrency(self, chunk_count: int) -> Tuple[int, int]:
+        """
+        Decide how many chunks to OCR at once and the --jobs for each
+        
+        Returns:
+            tuple: (concurrent chunks, jobs per chunk)
+        """
+        budget = self.jobs or os.cpu_count() or 1
+        
+        concurrency = self.chunk_concurrency or max(1, budget // 2)
+        concurrency = max(1, min(concurrency, chunk_count))
+        jobs_per_chunk = max(1, budget // concurrency)
+        
+        return concurrency, jobs_per_chunk
+    
     def _split_pdf(self, input_pdf: str, output_dir: Path, chunk_size: int) -> List[str]:
         """Split PDF into chunks of specified size"""
         
@@ -209,14 +383,25 @@ class OCRProcessor:
         
         logger.info(f"Merged {len(pdf_files)} files into {output_pdf}")
     
-    def _build_ocrmypdf_command(self, input_pdf: str, output_pdf: str, language: str) -> List[str]:
-        """Build ocrmypdf command with configured options"""
+    def _build_ocrmypdf_command(self, input_pdf: str, output_pdf: str, language: str,
+                                jobs: int = None, force_ocr: bool = False) -> List[str]:
+        """
+        Build ocrmypdf command with configured options
+        
+        force_ocr rasterizes and OCRs every page, including ones with some
+        text; otherwise pages that already have text are skipped.
+        """
         
         cmd = ['ocrmypdf']
         
         # Language
         cmd.extend(['--language', language])
         
+        # Thread budget
+        jobs = jobs or self.jobs
+        if jobs:
+            cmd.extend(['--jobs', str(jobs)])
+        
         # Optional features
         if self.deskew:
             cmd.append('--deskew')
@@ -231,11 +416,12 @@ class OCRProcessor:
         if self.output_type:
             cmd.extend(['--output-type', self.output_type])
         
-        # Skip pages that already have text (faster)
-        cmd.append('--skip-text')
-        
-        # Force OCR on all pages (use one or the other, not both)
-        # cmd.append('--force-ocr')
+        if force_ocr:
+            # OCR every page, even ones with a partial text layer
+            cmd.append('--force-ocr')
+        else:
+            # Skip pages that already have text (faster)
+            cmd.append('--skip-text')
         
         # Optimization
         cmd.extend(['--optimize', '1'])
@@ -0,0 +1,175 @@
+"""
+PDF Session - Shared per-document page cache
+Opens a PDF once and shares parsed pages between services through a small LRU window
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, List
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+
+class PDFSession:
+    """
+    Read-only view of a PDF shared by all services during one run
+
+    Page text, blocks, dict and image lists are built lazily from a single
+    text page per page and kept in a bounded LRU cache. Services that write
+    output (removal, cleaning) must open their own document for editing and
+    only use the session for lookups.
+
+    A cached page costs about 1 MB (page, text page, dict, blocks), so the
+    cache is a small window rather than the whole document. Sweeps that
+    visit each page once should release() it when done.
+    """
+
+    def __init__(self, pdf_path: str, cache_size: int = 32):
+        self.pdf_path = str(pdf_path)
+        self.cache_size = max(1, cache_size)
+        self.doc = fitz.open(self.pdf_path)
+        self._pages = OrderedDict()  # {page_num: {'page': Page, 'textpage': TextPage, ...}}
+        self.stats = {
+            'page_loads': 0,
+            'textpage_builds': 0,
+            'cache_hits': 0,
+            'evictions': 0,
+            'releases': 0
+        }
+
+    @classmethod
+    def from_config(cls, pdf_path: str, config: dict) -> 'PDFSession':
+        """Create a session using the configured cache size"""
+        cache_size = config.get('performance', {}).get('page_cache_size', 32)
+        return cls(pdf_path, cache_size)
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    def _entry(self, page_num: int) -> Dict:
+        """Get (or create) the cache entry for a page, updating LRU order"""
+
+        entry = self._pages.get(page_num)
+        if entry is not None:
+            self._pages.move_to_end(page_num)
+            return entry
+
+        entry = {'page': self.doc.load_page(page_num)}
+        self.stats['page_loads'] += 1
+        self._pages[page_num] = entry
+
+        while len(self._pages) > self.cache_size:
+            self._pages.popitem(last=False)
+            self.stats['evictions'] += 1
+
+        return entry
+
+    def _cached(self, page_num: int, key: str, builder):
+        """Return a cached per-page product, building it on first access"""
+
+        entry = self._entry(page_num)
+        if key in entry:
+            self.stats['cache_hits'] += 1
+            return entry[key]
+
+        value = builder(entry)
+        entry[key] = value
+        return value
+
+    def _textpage(self, entry: Dict):
+        """Parse the page content once; text, blocks and dict all derive from it"""
+
+        if 'textpage' not in entry:
+            entry['textpage'] = entry['page'].get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+            self.stats['textpage_builds'] += 1
+        return entry['textpage']
+
+    def get_page(self, page_num: int):
+        """Get the loaded page object"""
+        return self._entry(page_num)['page']
+
+    def get_page_rect(self, page_num: int):
+        """Get the page rectangle"""
+        return self._entry(page_num)['page'].rect
+
+    def get_text(self, page_num: int, clip=None) -> str:
+        """
+        Get plain page text (same as page.get_text("text"))
+
+        With clip, only blocks whose center lies inside the rectangle are kept.
+        A shared text page ignores clip, so the cached blocks (whose texts
+        concatenate to the plain page text) are filtered instead of parsing
+        the page again.
+        """
+        if clip is None:
+            return self._cached(
+                page_num, 'text',
+                lambda e: e['page'].get_text("text", textpage=self._textpage(e))
+            )
+
+        clip = fitz.Rect(clip)
+        return ''.join(
+            block[4] for block in self.get_blocks(page_num)
+            if block[6] == 0
+            and clip.x0 <= (block[0] + block[2]) / 2 <= clip.x1
+            and clip.y0 <= (block[1] + block[3]) / 2 <= clip.y1
+        )
+
+    def get_blocks(self, page_num: int) -> List[tuple]:
+        """Get text blocks (same as page.get_text("blocks"))"""
+        return self._cached(
+            page_num, 'blocks',
+            lambda e: e['page'].get_text("blocks", textpage=self._textpage(e))
+        )
+
+    def get_dict(self, page_num: int) -> Dict:
+        """
+        Get page dict (same as page.get_text("dict") without image blocks)
+
+        Image blocks carry no "lines" and are skipped by every consumer,
+        so the shared text page is built without TEXT_PRESERVE_IMAGES.
+        """
+        return self._cached(
+            page_num, 'dict',
+            lambda e: e['page'].get_text("dict", textpage=self._textpage(e))
+        )
+
+    def get_images(self, page_num: int) -> List[tuple]:
+        """Get image list (same as page.get_images(full=True))"""
+        return self._cached(
+            page_num, 'images',
+            lambda e: e['page'].get_images(full=True)
+        )
+
+    def release(self, page_num: int):
+        """Drop a page and everything parsed from it from the cache"""
+
+        if self._pages.pop(page_num, None) is not None:
+            self.stats['releases'] += 1
+
+    def extract_image(self, xref: int) -> Dict:
+        """Extract raw image data by xref"""
+        return self.doc.extract_image(xref)
+
+    def close(self):
+        """Release cached pages and close the document"""
+
+        if self.doc is None:
+            return
+
+        logger.debug(f"Closing session for {self.pdf_path}: {self.stats}")
+        self._pages.clear()
+        self.doc.close()
+        self.doc = None
@@ -10,6 +10,8 @@ from PIL import Image
 import io
 import json
 
+from services.pdf_session import PDFSession
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +27,8 @@ class PreviewGenerator:
                                 original_pdf: str,
                                 processed_pdf: str,
                                 detection_results: Dict,
-                                output_dir: str) -> Dict:
+                                output_dir: str,
+                                session: PDFSession = None) -> Dict:
         """
         Generate comprehensive preview report
         
@@ -34,6 +37,7 @@ class PreviewGenerator:
             processed_pdf: Path to processed PDF (if exists)
             detection_results: Results from header/footer and image detection
             output_dir: Directory to save preview files
+            session: Optional shared PDFSession for processed_pdf
         
         Returns:
             dict: Preview report with samples and statistics
@@ -52,7 +56,8 @@ class PreviewGenerator:
             preview_report['sample_pages'] = self._generate_page_comparisons(
                 original_pdf,
                 processed_pdf if processed_pdf else original_pdf,
-                output_dir
+                output_dir,
+                session
             )
         
         # Generate recommendations
@@ -112,12 +117,19 @@ class PreviewGenerator:
             ]
         }
     
-    def _generate_page_comparisons(self, original_pdf: str, processed_pdf: str, output_dir: str) -> List[Dict]:
+    def _generate_page_comparisons(self, original_pdf: str, processed_pdf: str, output_dir: str,
+                                   session: PDFSession = None) -> List[Dict]:
         """Generate before/after page comparisons"""
         
         try:
             doc_original = fitz.open(original_pdf)
-            doc_processed = fitz.open(processed_pdf) if processed_pdf != original_pdf else doc_original
+            
+            # Reuse the shared session for the processed side when it matches
+            owns_processed = session is None or session.pdf_path != str(processed_pdf)
+            if owns_processed:
+                processed = PDFSession(processed_pdf, self.sample_pages or 1)
+            else:
+                processed = session
             
             total_pages = len(doc_original)
             
@@ -142,8 +154,8 @@ class PreviewGenerator:
                     original_text = doc_original[page_num].get_text("text")
                     comparison['original_text_sample'] = original_text[:500]
                 
-                if page_num < len(doc_processed):
-                    processed_text = doc_processed[page_num].get_text("text")
+                if page_num < len(processed):
+                    processed_text = processed.get_text(page_num)
                     comparison['processed_text_sample'] = processed_text[:500]
                 
                 # Calculate text change
@@ -157,8 +169,8 @@ class PreviewGenerator:
                 comparisons.append(comparison)
             
             doc_original.close()
-            if doc_processed != doc_original:
-                doc_processed.close()
+            if owns_processed:
+                processed.close()
             
             return comparisons
             
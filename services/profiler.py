@@ -0,0 +1,265 @@
+"""
+Profiler - Stage and page level timing and memory instrumentation
+Records wall time, CPU time and RSS change per step, per-page timings for
+page loops, and can export a Chrome trace-event JSON (chrome://tracing)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+# Memory fields of a stage record; they describe the recording process only
+MEMORY_FIELDS = ('rss_mb', 'rss_delta_mb', 'new_peak_rss_mb')
+
+
+def _peak_rss_mb(who) -> float:
+    """Peak resident set size over the process lifetime in MB (ru_maxrss is KB on Linux)"""
+    if resource is None:
+        return 0.0
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Current resident set size in MB (None where /proc is not available)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _cpu_seconds(who) -> float:
+    """User + system CPU seconds"""
+    if resource is None:
+        return time.process_time() if who == 'self' else 0.0
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Profiler:
+    """Collects stage and page timings for one PDF"""
+    
+    def __init__(self, enabled: bool = True, slowest_pages: int = 10):
+        self.enabled = enabled
+        self.slowest_pages = slowest_pages
+        self.origin = time.perf_counter()
+        self.stages = []  # [{'name', 'start', 'wall_seconds', ...}]
+        self.pages = {}  # {stage: [(page_num, start, seconds)]}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def disabled(cls) -> 'Profiler':
+        """Profiler whose methods record nothing (default for services)"""
+        return cls(enabled=False)
+    
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a pipeline step: wall, CPU (own and child processes) and RSS
+        
+        Memory is sampled around the step: 'rss_mb' is the current RSS at
+        its end and 'rss_delta_mb' the change over it. ru_maxrss is a
+        lifetime peak, so 'new_peak_rss_mb' is only set when the step raised
+        the process peak (it is then the step's own peak), otherwise None.
+        """
+        
+        if not self.enabled:
+            yield
+            return
+        
+        self_who = resource.RUSAGE_SELF if resource else 'self'
+        child_who = resource.RUSAGE_CHILDREN if resource else 'children'
+        
+        start = time.perf_counter()
+        cpu_start = _cpu_seconds(self_who)
+        child_cpu_start = _cpu_seconds(child_who)
+        rss_start = _current_rss_mb()
+        peak_start = _peak_rss_mb(self_who)
+        
+        try:
+            yield
+        finally:
+            rss_end = _current_rss_mb()
+            peak_end = _peak_rss_mb(self_who)
+            record = {
+                'name': name,
+                'start': start - self.origin,
+                'wall_seconds': round(time.perf_counter() - start, 4),
+                'cpu_seconds': round(_cpu_seconds(self_who) - cpu_start, 4),
+                'child_cpu_seconds': round(_cpu_seconds(child_who) - child_cpu_start, 4),
+                'rss_mb': rss_end,
+                'rss_delta_mb': round(rss_end - rss_start, 1) if rss_end is not None and rss_start is not None else None,
+                'new_peak_rss_mb': peak_end if peak_end > peak_start else None
+            }
+            with self._lock:
+                self.stages.append(record)
+            logger.debug(f"Stage {name}: {record['wall_seconds']:.2f}s wall, "
+                         f"{record['cpu_seconds']:.2f}s CPU, RSS change {record['rss_delta_mb']} MB")
+    
+    def export_stages(self) -> List[Dict]:
+        """
+        Stage records for merge_stages() in another process
+        
+        Start times become epoch seconds, and memory fields are dropped
+        (they describe this process, not the one merging them).
+        """
+        offset = time.time() - time.perf_counter()
+        pid = os.getpid()
+        with self._lock:
+            return [
+                dict({k: v for k, v in record.items() if k not in MEMORY_FIELDS},
+                     start=record['start'] + self.origin + offset, pid=pid)
+                for record in self.stages
+            ]
+    
+    def merge_stages(self, records: List[Dict]):
+        """Add stage records exported by a worker process (e.g. per-image timings)"""
+        
+        if not self.enabled or not records:
+            return
+        
+        offset = time.time() - time.perf_counter()
+        with self._lock:
+            for record in records:
+                self.stages.append(dict(record, start=record['start'] - offset - self.origin))
+    
+    @contextmanager
+    def page(self, stage: str, page_num: int):
+        """Time one iteration of a page loop"""
+        
+        if not self.enabled:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_page(stage, page_num, start, time.perf_counter() - start)
+    
+    def record_page(self, stage: str, page_num: int, start: float, seconds: float):
+        """Record a page timing (start is a time.perf_counter() value)"""
+        
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            self.pages.setdefault(stage, []).append((page_num, start - self.origin, seconds))
+    
+    def record_worker_page(self, stage: str, page_num: int, epoch_start: float, seconds: float):
+        """Record work a worker process did for a page (start is a time.time() value)"""
+        
+        self.record_page(stage, page_num, epoch_start - (time.time() - time.perf_counter()), seconds)
+    
+    def summary(self) -> Dict:
+        """
+        Summarize recorded timings for the report
+        
+        Returns:
+            dict: {
+                'stages': {name: wall/CPU/RSS stats},
+                'pages': {stage: count, totals and slowest pages},
+                'process_peak_rss_mb': peak RSS over the whole process lifetime
+            }
+        """
+        stages = {}
+        for record in self.stages:
+            stats = {k: v for k, v in record.items() if k not in ('name', 'start', 'pid')}
+            # Repeated stage names (e.g. per chunk or image, also from worker
+            # processes) are summed; memory fields come from this process only
+            if record['name'] in stages:
+                existing = stages[record['name']]
+                for key in ('wall_seconds', 'cpu_seconds', 'child_cpu_seconds'):
+                    existing[key] = round(existing[key] + stats[key], 4)
+                for key in MEMORY_FIELDS:
+                    values = [v for v in (existing.get(key), stats.get(key)) if v is not None]
+                    if not values:
+                        existing[key] = None
+                    elif key == 'rss_delta_mb':
+                        existing[key] = round(sum(values), 1)
+                    else:
+                        existing[key] = max(values)
+            else:
+                stages[record['name']] = stats
+        
+        pages = {}
+        for stage, timings in self.pages.items():
+            # A page can be recorded more than once (its loop iteration plus
+            # work finished later in a worker); those timings are summed
+            per_page = {}
+            for page_num, _, seconds in timings:
+                per_page[page_num] = per_page.get(page_num, 0.0) + seconds
+            total = sum(per_page.values())
+            slowest = sorted(per_page.items(), key=lambda t: t[1], reverse=True)[:self.slowest_pages]
+            pages[stage] = {
+                'count': len(per_page),
+                'total_seconds': round(total, 4),
+                'mean_seconds': round(total / len(per_page), 4) if per_page else 0,
+                'slowest': [{'page': page_num, 'seconds': round(seconds, 4)} for page_num, seconds in slowest]
+            }
+        
+        self_who = resource.RUSAGE_SELF if resource else 'self'
+        return {
+            'stages': stages,
+            'pages': pages,
+            'process_peak_rss_mb': _peak_rss_mb(self_who)
+        }
+    
+    def trace_events(self) -> List[Dict]:
+        """Build Chrome trace-event records (complete 'X' events, microseconds)"""
+        
+        pid = os.getpid()
+        events = []
+        
+        for record in self.stages:
+            events.append({
+                'name': record['name'],
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': int(record['start'] * 1e6),
+                'dur': int(record['wall_seconds'] * 1e6),
+                # Records merged from worker processes get their own track
+                'pid': record.get('pid', pid),
+                'tid': 0,
+                'args': {k: v for k, v in record.items() if k not in ('name', 'start', 'pid')}
+            })
+        
+        # One track per page loop so pages nest visually under their stage
+        for tid, (stage, timings) in enumerate(self.pages.items(), start=1):
+            events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                'args': {'name': stage}
+            })
+            for page_num, start, seconds in timings:
+                events.append({
+                    'name': f"page {page_num + 1}",
+                    'cat': stage,
+                    'ph': 'X',
+                    'ts': int(start * 1e6),
+                    'dur': int(seconds * 1e6),
+                    'pid': pid,
+                    'tid': tid
+                })
+        
+        return events
+    
+    def save_trace(self, output_path: str):
+        """Write a Chrome trace-event JSON file"""
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        
+        logger.info(f"Trace saved to {output_path}")
@@ -0,0 +1,173 @@
+"""
+Stage Cache - Content-hash keyed results for resumable runs
+Reuses OCR output, header/footer detection and image classification
+when neither the input file nor the relevant config section changed
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StageCache:
+    """Stores per-stage results under the output dir, keyed by input hash + config"""
+    
+    # Bump when a stage's code or result format changes so older entries
+    # (e.g. header/footer results without 'bands') are no longer served
+    CACHE_VERSION = 2
+    
+    # Config sections that affect each stage (upstream sections included).
+    # Final cleaning and text extraction are not cached: they rewrite and
+    # read the cleaned PDF on every run, so there is nothing to force
+    STAGE_SECTIONS = {
+        'ocr': ['ocr'],
+        'header_footer': ['ocr', 'header_footer'],
+        'images': ['ocr', 'images'],
+    }
+    
+    # Settings that only affect speed, not results
+    IGNORED_KEYS = {
+        'ocr': ['jobs', 'chunk_concurrency'],
+    }
+    
+    # Forcing a stage also forces the stages that read its output
+    DOWNSTREAM = {
+        'ocr': ['header_footer', 'images'],
+    }
+    
+    def __init__(self, cache_dir: str, input_pdf: str, config: dict,
+                 force_stages: List[str] = None, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.input_pdf = str(input_pdf)
+        self.config = config
+        self.enabled = enabled
+        self._input_hash = None
+        
+        self.force_stages = set()
+        for stage in force_stages or []:
+            if stage == 'all':
+                self.force_stages.update(self.STAGE_SECTIONS)
+            else:
+                self.force_stages.add(stage)
+                self.force_stages.update(self.DOWNSTREAM.get(stage, []))
+    
+    @classmethod
+    def from_config(cls, input_pdf: str, config: dict,
+                    force_stages: List[str] = None) -> 'StageCache':
+        """Create a cache under <output_dir>/.stage_cache"""
+        output_dir = Path(config.get('output_dir', 'output'))
+        enabled = config.get('performance', {}).get('stage_cache', True)
+        return cls(output_dir / '.stage_cache', input_pdf, config, force_stages, enabled)
+    
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """SHA-256 of file content, read in 1 MB blocks"""
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @property
+    def input_hash(self) -> str:
+        if self._input_hash is None:
+            self._input_hash = self.file_hash(self.input_pdf)
+        return self._input_hash
+    
+    def key(self, stage: str, extra: Dict = None) -> str:
+        """Cache key: cache version + input content hash + relevant config sections + extra inputs"""
+        
+        sections = {}
+        for name in self.STAGE_SECTIONS[stage]:
+            section = self.config.get(name)
+            if isinstance(section, dict):
+                ignored = self.IGNORED_KEYS.get(name, [])
+                section = {k: v for k, v in section.items() if k not in ignored}
+            sections[name] = section
+        material = json.dumps(
+            {'version': self.CACHE_VERSION, 'input': self.input_hash,
+             'sections': sections, 'extra': extra or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+    
+    def _entry_dir(self, stage: str, extra: Dict = None) -> Path:
+        return self.cache_dir / stage / self.key(stage, extra)
+    
+    def load(self, stage: str, extra: Dict = None) -> Optional[Dict]:
+        """
+        Load cached stage result
+        
+        Returns:
+            dict: Stored result, or None on miss, when disabled or when forced
+        """
+        if not self.enabled:
+            return None
+        
+        if stage in self.force_stages:
+            logger.info(f"Stage cache: forcing '{stage}'")
+            return None
+        
+        result_path = self._entry_dir(stage, extra) / 'result.json'
+        if not result_path.exists():
+            return None
+        
+        try:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except Exception as e:
+            logger.warning(f"Stage cache: unreadable entry for '{stage}': {e}")
+            return None
+        
+        logger.info(f"Stage cache: reusing '{stage}' result")
+        return result
+    
+    def save(self, stage: str, result: Dict, files: Dict[str, str] = None, extra: Dict = None):
+        """
+        Store stage result and optional output files
+        
+        Args:
+            stage: Stage name
+            result: JSON-serializable result
+            files: {name: source_path} files to keep alongside the result
+            extra: Additional key inputs (e.g. OCR language)
+        """
+        if not self.enabled:
+            return
+        
+        entry_dir = self._entry_dir(stage, extra)
+        temp_dir = entry_dir.with_name(entry_dir.name + '.tmp')
+        
+        try:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            temp_dir.mkdir(parents=True)
+            
+            for name, source in (files or {}).items():
+                shutil.copy2(source, temp_dir / name)
+            
+            # Rects and other sequences are stored as plain lists
+            with open(temp_dir / 'result.json', 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, default=list)
+            
+            # Swap in the complete entry so readers never see a partial one
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            temp_dir.rename(entry_dir)
+        except Exception as e:
+            logger.warning(f"Stage cache: could not store '{stage}': {e}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def restore_file(self, stage: str, name: str, dest: str, extra: Dict = None) -> bool:
+        """Copy a cached output file to dest; returns False if it is missing"""
+        
+        source = self._entry_dir(stage, extra) / name
+        if not source.exists():
+            return False
+        
+        shutil.copy2(source, dest)
+        return True
@@ -0,0 +1,174 @@
+"""
+Template Store - Header/footer templates per document family
+Persists detected header/footer patterns and bands so later files from the
+same family (same producer metadata, similar first page) can reuse them
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_PATH = 'output/.header_footer_templates.json'
+
+
+class TemplateStore:
+    """JSON store of header/footer templates keyed by document family"""
+    
+    HASH_SIZE = 16  # First-page fingerprint is a 16x16 average hash
+    
+    def __init__(self, store_path: str = DEFAULT_TEMPLATE_PATH, min_similarity: float = 0.85):
+        self.store_path = Path(store_path)
+        self.min_similarity = min_similarity
+        self.templates = self._load()
+    
+    @classmethod
+    def from_config(cls, config: dict) -> 'TemplateStore':
+        """Store at header_footer.template_path (default <output_dir>/.header_footer_templates.json)"""
+        hf_config = config.get('header_footer', {})
+        store_path = hf_config.get('template_path') or \
+            Path(config.get('output_dir', 'output')) / '.header_footer_templates.json'
+        return cls(store_path, hf_config.get('template_min_similarity', 0.85))
+    
+    def _load(self) -> List[Dict]:
+        if not self.store_path.exists():
+            return []
+        
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('templates', [])
+        except Exception as e:
+            logger.warning(f"Could not read template store {self.store_path}: {e}")
+            return []
+    
+    @staticmethod
+    def family_key(doc) -> str:
+        """Producer/creator metadata and first page size"""
+        
+        metadata = doc.metadata or {}
+        # Version numbers change between exports of the same family
+        producer = re.sub(r'\d+(\.\d+)*', '#', metadata.get('producer') or '')
+        creator = re.sub(r'\d+(\.\d+)*', '#', metadata.get('creator') or '')
+        
+        size = ''
+        if len(doc):
+            rect = doc[0].rect
+            size = f"{round(rect.width)}x{round(rect.height)}"
+        
+        return f"{producer}|{creator}|{size}"
+    
+    @classmethod
+    def fingerprint(cls, doc) -> str:
+        """Average hash of the first page rendered in grayscale (hex)"""
+        
+        if not len(doc):
+            return ''
+        
+        page = doc[0]
+        matrix = fitz.Matrix(cls.HASH_SIZE / page.rect.width, cls.HASH_SIZE / page.rect.height)
+        pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+        
+        # Rounding can give a pixel more or less; sample a fixed grid
+        pixels = []
+        for row in range(cls.HASH_SIZE):
+            y = min(pix.height - 1, row * pix.height // cls.HASH_SIZE)
+            for col in range(cls.HASH_SIZE):
+                x = min(pix.width - 1, col * pix.width // cls.HASH_SIZE)
+                pixels.append(pix.samples[y * pix.stride + x])
+        
+        mean = sum(pixels) / len(pixels)
+        bits = ''.join('1' if p > mean else '0' for p in pixels)
+        return f"{int(bits, 2):0{len(bits) // 4}x}"
+    
+    @staticmethod
+    def similarity(fingerprint_a: str, fingerprint_b: str) -> float:
+        """Share of equal bits between two fingerprints"""
+        
+        if not fingerprint_a or not fingerprint_b or len(fingerprint_a) != len(fingerprint_b):
+            return 0.0
+        
+        bits = len(fingerprint_a) * 4
+        differing = bin(int(fingerprint_a, 16) ^ int(fingerprint_b, 16)).count('1')
+        return 1 - differing / bits
+    
+    def describe(self, doc) -> Tuple[str, str]:
+        """(family key, first-page fingerprint) of an open document"""
+        return self.family_key(doc), self.fingerprint(doc)
+    
+    def _find(self, family: str, fingerprint: str) -> Tuple[Optional[int], float]:
+        """Index of the most similar template in the family, with its similarity"""
+        
+        best_index = None
+        best_similarity = 0.0
+        
+        for index, template in enumerate(self.templates):
+            if template['family'] != family:
+                continue
+            
+            similarity = self.similarity(template['fingerprint'], fingerprint)
+            if similarity >= self.min_similarity and similarity > best_similarity:
+                best_index = index
+                best_similarity = similarity
+        
+        return best_index, best_similarity
+    
+    def lookup(self, family: str, fingerprint: str) -> Optional[Dict]:
+        """
+        Find the template for a document family
+        
+        Returns:
+            dict: {'family', 'fingerprint', 'headers', 'footers', 'bands',
+                   'source', 'updated', 'similarity'}, or None
+        """
+        index, similarity = self._find(family, fingerprint)
+        if index is None:
+            return None
+        
+        return dict(self.templates[index], similarity=round(similarity, 3))
+    
+    def save(self, family: str, fingerprint: str, result: Dict, source: str):
+        """Store (or replace) the template for a family from a detection result"""
+        
+        # Pick up templates written by other processes since we loaded
+        self.templates = self._load()
+        
+        template = {
+            'family': family,
+            'fingerprint': fingerprint,
+            'headers': list(result.get('headers', [])),
+            'footers': list(result.get('footers', [])),
+            'bands': result.get('bands'),
+            'source': source,
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        index, _ = self._find(family, fingerprint)
+        if index is None:
+            self.templates.append(template)
+        else:
+            self.templates[index] = template
+        
+        try:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.store_path.with_name(f"{self.store_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'templates': self.templates}, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.store_path)
+            logger.info(f"Saved header/footer template for family '{family}' from {source}")
+        except Exception as e:
+            logger.warning(f"Could not write template store {self.store_path}: {e}")
+    
+    def patterns_for(self, doc) -> List[str]:
+        """Header and footer patterns of the template matching an open document's family"""
+        
+        template = self.lookup(*self.describe(doc))
+        if template is None:
+            return []
+        
+        return list(dict.fromkeys(list(template.get('headers', [])) + list(template.get('footers', []))))
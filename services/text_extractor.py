@@ -4,26 +4,66 @@ CRITICAL: No text modification, reshaping, or spell correction
 """
 
 import logging
+import sys
+import time
 import unicodedata
-from typing import Dict, List
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 import fitz  # PyMuPDF
-import re
+import numpy as np
+
+from services.pdf_session import PDFSession
+from services.header_footer_matcher import HeaderFooterMatcher
+from services.text_normalization import normalize
+from services.profiler import Profiler
 
 logger = logging.getLogger(__name__)
 
+# Bidi strength per bidi class (0 other, 1 RTL, 2 LTR)
+_DIRECTION_STRENGTH = defaultdict(int, {'R': 1, 'AL': 1, 'L': 2})
+
+# Strength of every code point, so a page is classified by indexing this
+# table with its code points instead of one Python call per character.
+# Built at import (about 0.1 s, once per interpreter; every caller of this
+# module extracts text) so forked workers share the parent's copy
+_DIRECTION_TABLE = np.frombuffer(
+    bytes(map(_DIRECTION_STRENGTH.__getitem__,
+              map(unicodedata.bidirectional, map(chr, range(sys.maxunicode + 1))))),
+    dtype=np.uint8
+)
+
+
+def _count_directions(text: str) -> Tuple[int, int]:
+    """(RTL, LTR) strong character counts of a string"""
+    
+    # UTF-32 gives one code point per 4 bytes (lone surrogates included)
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    counts = np.bincount(_DIRECTION_TABLE[codes], minlength=3)
+    return int(counts[1]), int(counts[2])
+
 
 class TextExtractor:
     """Extracts text from PDF with proper RTL/LTR handling"""
     
+    DIRECTION_CHUNK = 4096
+    DIRECTION_SAMPLE_SHARE = 0.95  # Strong characters of one direction in the sample
+    
     def __init__(self, config: dict):
         self.config = config
         self.preserve_unicode = config.get('text', {}).get('preserve_unicode', True)
         self.auto_detect_direction = config.get('text', {}).get('auto_detect_direction', True)
         self.normalization = config.get('text', {}).get('normalization', 'NFC')
         self.preserve_formatting = config.get('text', {}).get('preserve_formatting', True)
+        # Use detected header/footer bands to extract only the page body
+        self.clip_to_body = config.get('text', {}).get('clip_to_body', True)
+        # Decide direction from a sample of this many characters when the
+        # sample is clearly one script (null: always count the whole page)
+        self.direction_sample_chars = config.get('text', {}).get('direction_sample_chars')
     
     def extract_text(self, pdf_path: str, headers: List[str] = None, 
-                     footers: List[str] = None) -> Dict:
+                     footers: List[str] = None, session: PDFSession = None,
+                     profiler: Profiler = None, bands: Dict = None) -> Dict:
         """
         Extract text from PDF with proper handling
         
@@ -31,6 +71,12 @@ class TextExtractor:
             pdf_path: Path to PDF file
             headers: List of header patterns to remove
             footers: List of footer patterns to remove
+            session: Optional shared PDFSession whose text layer matches pdf_path
+            profiler: Optional Profiler for per-page timings
+            bands: Header/footer bands from HeaderFooterDetector.detect(); a band
+                   is clipped off a page only where a block inside it matches a
+                   header/footer pattern (line matching runs on pages where
+                   not every band was clipped)
         
         Returns:
             dict: {
@@ -43,40 +89,18 @@ class TextExtractor:
         """
         logger.info(f"Extracting text from {pdf_path}")
         
-        doc = fitz.open(pdf_path)
-        
         page_texts = []
         rtl_pages = []
         ltr_pages = []
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            # Extract text with layout preservation
-            if self.preserve_formatting:
-                text = page.get_text("text")
-            else:
-                text = page.get_text("text")
-            
-            # Remove headers and footers
-            if headers or footers:
-                text = self._remove_headers_footers_from_text(text, headers, footers)
-            
-            # Detect text direction
-            direction = self._detect_text_direction(text)
+        for page_num, text, direction in self.iter_page_texts(pdf_path, headers, footers,
+                                                              session, profiler, bands):
             if direction == 'RTL':
                 rtl_pages.append(page_num)
             else:
                 ltr_pages.append(page_num)
-            
-            # Normalize Unicode (NO reshaping or modification)
-            if self.preserve_unicode:
-                text = self._normalize_unicode(text)
-            
             page_texts.append(text)
         
-        doc.close()
-        
         # Combine all pages
         full_text = '\n\n'.join(page_texts)
         
@@ -91,6 +115,214 @@ class TextExtractor:
             'ltr_pages': ltr_pages
         }
     
+    def iter_page_texts(self, pdf_path: str, headers: List[str] = None,
+                        footers: List[str] = None, session: PDFSession = None,
+                        profiler: Profiler = None,
+                        bands: Dict = None) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield cleaned, normalized text one page at a time
+        
+        Without a session the PDF is read through its own one-page window;
+        either way each page is released once its text has been yielded, so
+        memory does not grow with the page count.
+        
+        Yields:
+            tuple: (page_num, text, 'RTL' or 'LTR')
+        """
+        owns_session = session is None
+        if owns_session:
+            session = PDFSession(pdf_path, cache_size=1)
+        
+        profiler = profiler or Profiler.disabled()
+        
+        # Compiled once for the whole document
+        matcher = HeaderFooterMatcher(list(headers or []) + list(footers or []))
+        if not self.clip_to_body or not matcher:
+            bands = None
+        
+        try:
+            for page_num in range(len(session)):
+                page_start = time.perf_counter()
+                
+                body_rect, all_bands_clipped = None, False
+                if bands:
+                    body_rect, all_bands_clipped = self._body_rect(
+                        session.get_page_rect(page_num), page_num, bands,
+                        session.get_blocks(page_num), matcher)
+                
+                # Extract text with layout preservation; bands confirmed on this
+                # page also drop their unmatched lines (e.g. page numbers)
+                text = session.get_text(page_num, clip=body_rect)
+                
+                # Remove headers and footers, unless the clip already cut off
+                # every band they were learned in
+                if matcher and not all_bands_clipped:
+                    text = self._remove_headers_footers_from_text(text, matcher)
+                
+                # Detect text direction
+                direction = self._detect_text_direction(text)
+                
+                # Normalize Unicode (NO reshaping or modification)
+                if self.preserve_unicode:
+                    text = self._normalize_unicode(text)
+                
+                session.release(page_num)
+                
+                profiler.record_page('text_extraction', page_num, page_start,
+                                     time.perf_counter() - page_start)
+                yield page_num, text, direction
+        finally:
+            if owns_session:
+                session.close()
+    
+    def extract_text_to_file(self, pdf_path: str, output_path: str,
+                             headers: List[str] = None, footers: List[str] = None,
+                             session: PDFSession = None, profiler: Profiler = None,
+                             chunk_path: str = None, chunk_size: int = 2000,
+                             bands: Dict = None) -> Dict:
+        """
+        Streaming variant of extract_text + save_text (+ chunk simulation)
+        
+        Pages are written to output_path as they are extracted, so memory
+        stays flat regardless of document size. The file content is identical
+        to save_text(extract_text(...)['text']) and the chunk file to the one
+        built from generate_chunk_simulation().
+        
+        Returns:
+            dict: {
+                'text_file': str,
+                'total_characters': int,
+                'total_pages': int,
+                'rtl_pages': List of page numbers with RTL text,
+                'ltr_pages': List of page numbers with LTR text,
+                'chunk_simulation': chunk_path or None,
+                'total_chunks': int
+            }
+        """
+        logger.info(f"Extracting text from {pdf_path} to {output_path}")
+        
+        rtl_pages = []
+        ltr_pages = []
+        total_characters = 0
+        total_pages = 0
+        
+        # Chunks have no newlines (words are joined by spaces), so they are
+        # spooled one per line until the total count for the headers is known
+        spool = open(chunk_path + '.tmp', 'w', encoding='utf-8') if chunk_path else None
+        chunker = _ChunkBuilder(chunk_size)
+        total_chunks = 0
+        
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for page_num, text, direction in self.iter_page_texts(pdf_path, headers, footers,
+                                                                      session, profiler, bands):
+                    if direction == 'RTL':
+                        rtl_pages.append(page_num)
+                    else:
+                        ltr_pages.append(page_num)
+                    
+                    if total_pages:
+                        f.write('\n\n')
+                        total_characters += 2
+                    f.write(text)
+                    total_characters += len(text)
+                    total_pages += 1
+                    
+                    if spool:
+                        for chunk in chunker.feed(text.split()):
+                            spool.write(chunk + '\n')
+                            total_chunks += 1
+            
+            if spool:
+                for chunk in chunker.finish():
+                    spool.write(chunk + '\n')
+                    total_chunks += 1
+                spool.close()
+                self._write_chunk_file(chunk_path + '.tmp', chunk_path, total_chunks)
+        finally:
+            if spool:
+                spool.close()
+                Path(chunk_path + '.tmp').unlink(missing_ok=True)
+        
+        logger.info(f"Extracted {total_characters} characters from {total_pages} pages")
+        logger.info(f"RTL pages: {len(rtl_pages)}, LTR pages: {len(ltr_pages)}")
+        logger.info(f"Saved text to {output_path}")
+        
+        return {
+            'text_file': str(output_path),
+            'total_characters': total_characters,
+            'total_pages': total_pages,
+            'rtl_pages': rtl_pages,
+            'ltr_pages': ltr_pages,
+            'chunk_simulation': chunk_path,
+            'total_chunks': total_chunks
+        }
+    
+    @staticmethod
+    def _write_chunk_file(spool_path: str, chunk_path: str, total_chunks: int):
+        """Copy spooled chunks (one per line) into the chunk simulation format"""
+        
+        with open(spool_path, 'r', encoding='utf-8') as spool, \
+                open(chunk_path, 'w', encoding='utf-8') as f:
+            for i, line in enumerate(spool):
+                f.write(f"=== CHUNK {i+1}/{total_chunks} ===\n")
+                f.write(line[:-1])
+                f.write("\n\n")
+        
+        logger.info(f"Generated {total_chunks} chunks")
+    
+    @staticmethod
+    def _body_rect(page_rect, page_num: int, bands: Dict, blocks: List[tuple],
+                   matcher: HeaderFooterMatcher):
+        """
+        Page area between the header and footer bands for this page's parity
+        
+        Bands are learned from sampled pages, so a band is only applied when
+        this page has a block inside it matching a header/footer pattern.
+        Pages without a running header/footer (covers, chapter openings)
+        keep their text in the band area.
+        
+        Returns:
+            tuple: (fitz.Rect or None if no band applies, True if every band
+                    of this parity was clipped so line matching can be skipped)
+        """
+        if not bands:
+            return None, False
+        
+        band = bands.get('odd' if page_num % 2 == 0 else 'even') or {}
+        header = band.get('header')
+        footer = band.get('footer')
+        if header is None and footer is None:
+            return None, False
+        
+        header_y = page_rect.y0 + header * page_rect.height if header is not None else None
+        footer_y = page_rect.y0 + footer * page_rect.height if footer is not None else None
+        
+        header_found = False
+        footer_found = False
+        for block in blocks:
+            # Same rule as the clip: a block belongs where its center lies
+            center_y = (block[1] + block[3]) / 2
+            in_header = header_y is not None and center_y < header_y
+            in_footer = footer_y is not None and center_y > footer_y
+            if not (in_header or in_footer):
+                continue
+            
+            text = block[4].strip()
+            if matcher.matches(text) or any(matcher.matches(line.strip()) for line in text.split('\n')):
+                header_found = header_found or in_header
+                footer_found = footer_found or in_footer
+        
+        if not header_found and not footer_found:
+            return None, False
+        
+        body = fitz.Rect(page_rect)
+        if header_found:
+            body.y0 = header_y
+        if footer_found:
+            body.y1 = footer_y
+        return body, header_found == (header_y is not None) and footer_found == (footer_y is not None)
+    
     def _detect_text_direction(self, text: str) -> str:
         """
         Auto-detect if text is RTL or LTR
@@ -101,18 +333,25 @@ class TextExtractor:
         if not self.auto_detect_direction:
             return 'LTR'
         
-        # Count RTL and LTR characters
+        if self.direction_sample_chars and len(text) > 2 * self.direction_sample_chars:
+            direction = self._sample_text_direction(text)
+            if direction:
+                return direction
+        
+        # Count RTL (bidi R, AL) and LTR (bidi L) characters chunk by chunk
         rtl_count = 0
         ltr_count = 0
         
-        for char in text:
-            # Check Unicode bidirectional class
-            bidi_class = unicodedata.bidirectional(char)
+        for start in range(0, len(text), self.DIRECTION_CHUNK):
+            chunk = text[start:start + self.DIRECTION_CHUNK]
+            chunk_rtl, chunk_ltr = _count_directions(chunk)
+            rtl_count += chunk_rtl
+            ltr_count += chunk_ltr
             
-            if bidi_class in ('R', 'AL'):  # Right-to-Left, Arabic Letter
-                rtl_count += 1
-            elif bidi_class in ('L',):  # Left-to-Right
-                ltr_count += 1
+            # Stop once the rest of the page cannot change the outcome
+            remaining = len(text) - start - len(chunk)
+            if rtl_count > ltr_count + remaining or ltr_count >= rtl_count + remaining:
+                break
         
         # Determine dominant direction
         if rtl_count > ltr_count:
@@ -120,6 +359,26 @@ class TextExtractor:
         else:
             return 'LTR'
     
+    def _sample_text_direction(self, text: str) -> str:
+        """
+        Direction from four evenly spaced slices of the page
+        
+        Returns:
+            'RTL' or 'LTR' if the sample is clearly one script, else None
+        """
+        size = self.direction_sample_chars // 4
+        step = (len(text) - size) // 3
+        sample = ''.join(text[i * step:i * step + size] for i in range(4))
+        
+        rtl_count, ltr_count = _count_directions(sample)
+        strong = rtl_count + ltr_count
+        
+        if strong and rtl_count >= self.DIRECTION_SAMPLE_SHARE * strong:
+            return 'RTL'
+        if strong and ltr_count >= self.DIRECTION_SAMPLE_SHARE * strong:
+            return 'LTR'
+        return None
+    
     def _normalize_unicode(self, text: str) -> str:
         """
         Normalize Unicode text (NO modification of content)
@@ -132,14 +391,14 @@ class TextExtractor:
         # Apply Unicode normalization
         # NFC = Canonical Decomposition, followed by Canonical Composition
         # This ensures consistent representation without changing content
+        # (skipped for pages that are already normalized)
         if self.normalization in ('NFC', 'NFD', 'NFKC', 'NFKD'):
-            text = unicodedata.normalize(self.normalization, text)
+            text = normalize(self.normalization, text)
         
         return text
     
-    def _remove_headers_footers_from_text(self, text: str, 
-                                          headers: List[str], 
-                                          footers: List[str]) -> str:
+    def _remove_headers_footers_from_text(self, text: str,
+                                          matcher: HeaderFooterMatcher) -> str:
         """
         Remove header/footer lines from extracted text
         """
@@ -147,51 +406,10 @@ class TextExtractor:
             return text
         
         lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            # Check if line matches any header
-            is_header_footer = False
-            
-            if headers:
-                for header in headers:
-                    if self._line_matches_pattern(line_stripped, header):
-                        is_header_footer = True
-                        break
-            
-            if not is_header_footer and footers:
-                for footer in footers:
-                    if self._line_matches_pattern(line_stripped, footer):
-                        is_header_footer = True
-                        break
-            
-            if not is_header_footer:
-                cleaned_lines.append(line)
+        cleaned_lines = [line for line in lines if not matcher.matches(line.strip())]
         
         return '\n'.join(cleaned_lines)
     
-    def _line_matches_pattern(self, line: str, pattern: str) -> bool:
-        """Check if line matches header/footer pattern"""
-        
-        # Exact match
-        if line == pattern:
-            return True
-        
-        # Pattern with wildcards
-        pattern_regex = pattern.replace('#', r'\d+')
-        if re.fullmatch(pattern_regex, line):
-            return True
-        
-        # Fuzzy match
-        from difflib import SequenceMatcher
-        similarity = SequenceMatcher(None, line, pattern).ratio()
-        if similarity >= 0.90:
-            return True
-        
-        return False
-    
     def save_text(self, text: str, output_path: str):
         """Save text to file with proper UTF-8 encoding"""
         
@@ -206,29 +424,45 @@ class TextExtractor:
         
         This helps verify that cleaning didn't break context
         """
-        chunks = []
-        
         # Split into chunks while trying to preserve sentence boundaries
-        words = text.split()
-        current_chunk = []
-        current_size = 0
+        chunker = _ChunkBuilder(chunk_size)
+        chunks = chunker.feed(text.split()) + chunker.finish()
+        
+        logger.info(f"Generated {len(chunks)} chunks (avg size: {sum(len(c) for c in chunks) // len(chunks)} chars)")
+        
+        return chunks
+
+
+class _ChunkBuilder:
+    """Word-stream chunker shared by the in-memory and streaming chunk simulations"""
+    
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.current_chunk = []
+        self.current_size = 0
+    
+    def feed(self, words: List[str]) -> List[str]:
+        """Add words; returns the chunks completed by them"""
         
+        chunks = []
         for word in words:
             word_size = len(word) + 1  # +1 for space
             
-            if current_size + word_size > chunk_size and current_chunk:
+            if self.current_size + word_size > self.chunk_size and self.current_chunk:
                 # Save current chunk
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_size = word_size
+                chunks.append(' '.join(self.current_chunk))
+                self.current_chunk = [word]
+                self.current_size = word_size
             else:
-                current_chunk.append(word)
-                current_size += word_size
-        
-        # Add last chunk
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+                self.current_chunk.append(word)
+                self.current_size += word_size
         
-        logger.info(f"Generated {len(chunks)} chunks (avg size: {sum(len(c) for c in chunks) // len(chunks)} chars)")
+        return chunks
+    
+    def finish(self) -> List[str]:
+        """Flush the last partial chunk"""
         
+        chunks = [' '.join(self.current_chunk)] if self.current_chunk else []
+        self.current_chunk = []
+        self.current_size = 0
         return chunks
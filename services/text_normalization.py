@@ -0,0 +1,34 @@
+"""
+Text Normalization - Unicode normalization with fast paths
+Skips normalize() for text already in the target form and finds Arabic
+presentation forms with compiled regexes instead of per-character loops
+"""
+
+import re
+import unicodedata
+
+# Arabic presentation forms (shaped glyphs, visual order): U+FB50-U+FDFF, U+FE70-U+FEFF
+PRESENTATION_FORMS_RE = re.compile('[ﭐ-﷿ﹰ-﻿]')
+
+# Basic Arabic block
+ARABIC_RE = re.compile('[؀-ۿ]')
+
+
+def normalize(form: str, text: str) -> str:
+    """
+    unicodedata.normalize(form, text), skipped when text is already in that form
+    
+    is_normalized() answers most text with a quick check in C, which is far
+    cheaper than building a normalized copy.
+    """
+    if not text or unicodedata.is_normalized(form, text):
+        return text
+    return unicodedata.normalize(form, text)
+
+
+def has_presentation_forms(text: str) -> bool:
+    return PRESENTATION_FORMS_RE.search(text) is not None
+
+
+def has_arabic(text: str) -> bool:
+    return ARABIC_RE.search(text) is not None
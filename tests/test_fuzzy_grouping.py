@@ -0,0 +1,105 @@
+"""
+_FuzzyGroupIndex against the original compare-with-every-group loop
+"""
+
+import random
+import re
+import sys
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.header_footer_detector import _FuzzyGroupIndex
+
+BASES = [
+    'Annual Report 2023', 'Chapter 4 - Financial Statements', 'Page 12', 'www.example.com',
+    'Confidential', 'Section 3.2 Risk Management', 'التقرير السنوي لعام 2023', 'Notes',
+    'Internal use only - do not distribute'
+]
+
+
+def reference_groups(stream: list, threshold: float) -> list:
+    """The original: each text joins the first group with ratio >= threshold"""
+    
+    groups = []
+    for pattern, example in stream:
+        for group in groups:
+            if SequenceMatcher(None, group['pattern'], pattern).ratio() >= threshold:
+                group['examples'].append(example)
+                break
+        else:
+            groups.append({'pattern': pattern, 'examples': [example]})
+    return groups
+
+
+def _stream(seed: int, length: int = 600) -> list:
+    """Page-ordered (digit-normalized text, text) pairs with typo-like variations"""
+    
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyz -'
+    variants = []
+    for base in BASES:
+        variants.append(base)
+        for _ in range(6):
+            text = list(base)
+            for _ in range(rng.randint(1, 5)):
+                pos = rng.randrange(len(text))
+                op = rng.random()
+                if op < 0.35:
+                    text.insert(pos, rng.choice(alphabet))
+                elif op < 0.7 and len(text) > 3:
+                    del text[pos]
+                else:
+                    text[pos] = rng.choice(alphabet)
+            variants.append(''.join(text))
+    
+    stream = []
+    for _ in range(length):
+        text = rng.choice(variants)
+        text = re.sub(r'\d+', lambda m: str(rng.randint(1, 400)), text)
+        stream.append((re.sub(r'\d+', '#', text), text))
+    return stream
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+@pytest.mark.parametrize('threshold', [0.85, 0.9])
+def test_same_groups_in_stream_order(seed, threshold):
+    stream = _stream(seed)
+    index = _FuzzyGroupIndex(threshold)
+    for pattern, example in stream:
+        index.add(pattern, example)
+    
+    assert index.groups == reference_groups(stream, threshold)
+
+
+@pytest.mark.parametrize('seed', [4, 5])
+def test_same_groups_in_first_seen_order(seed):
+    # The detector tallies texts per pattern first, then adds them pattern by pattern
+    stream = _stream(seed)
+    counts = {}
+    for pattern, example in stream:
+        counts.setdefault(pattern, []).append(example)
+    
+    index = _FuzzyGroupIndex(0.85)
+    for pattern, examples in counts.items():
+        for example in examples:
+            index.add(pattern, example)
+    
+    expected = reference_groups(stream, 0.85)
+    assert [g['pattern'] for g in index.groups] == [g['pattern'] for g in expected]
+    assert [Counter(g['examples']) for g in index.groups] == [Counter(g['examples']) for g in expected]
+
+
+def test_length_band_edges():
+    # 2 * 17 / (17 + 23) = 0.85 exactly; one character longer cannot match
+    stream = [('a' * 17, 'x'), ('a' * 23, 'y'), ('a' * 24, 'z'), ('a' * 14, 'w'), ('a' * 15, 'v')]
+    index = _FuzzyGroupIndex(0.85)
+    for pattern, example in stream:
+        index.add(pattern, example)
+    
+    assert index.groups == reference_groups(stream, 0.85)
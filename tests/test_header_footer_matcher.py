@@ -0,0 +1,114 @@
+"""
+HeaderFooterMatcher against the original per-pattern matching loop
+"""
+
+import random
+import re
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.header_footer_matcher import HeaderFooterMatcher
+
+
+def reference_matches(text: str, patterns: list) -> bool:
+    """
+    The original loop: each pattern is tried exactly, as a '#' regex, then fuzzily
+    
+    The original raised re.error on a pattern that is not a valid regex;
+    here that pattern only skips its regex step, as the matcher does.
+    """
+    for pattern in patterns:
+        if text == pattern:
+            return True
+        
+        try:
+            if re.fullmatch(pattern.replace('#', r'\d+'), text):
+                return True
+        except re.error:
+            pass
+        
+        if SequenceMatcher(None, text, pattern).ratio() >= 0.90:
+            return True
+    
+    return False
+
+
+def _check(patterns: list, texts: list):
+    matcher = HeaderFooterMatcher(patterns)
+    for text in texts:
+        expected = reference_matches(text, patterns)
+        assert matcher.matches(text) == expected, text
+        # Memoized answer
+        assert matcher.matches(text) == expected, text
+
+
+def test_exact_patterns():
+    patterns = ['Company Annual Report', 'Page (1)', 'a+b=c']
+    _check(patterns, ['Company Annual Report', 'Page (1)', 'a+b=c', 'Page 1', 'aab=c', ''])
+
+
+def test_digit_wildcard_patterns():
+    patterns = ['Page # of #', 'Chapter #', '- # -']
+    _check(patterns, ['Page 12 of 300', 'Page 1 of 2', 'Page x of 2', 'Chapter 7', 'Chapter 7a',
+                      '- 14 -', '-  -', 'Page 12 of 300 extra text beyond the pattern'])
+
+
+def test_fuzzy_boundary():
+    patterns = ['abcdefghij']
+    texts = [
+        'abcdefghiX',    # 2 * 9 / 20 = 0.90, matches
+        'abcdefghXX',    # 0.80
+        'abcdefghi',     # 2 * 9 / 19
+        'abcdefghijkl',  # 2 * 10 / 22, longest length that can reach 0.90
+        'abcdefghijklm', # 2 * 10 / 23, pruned by length
+        'Xbcdefghij',
+        'jihgfedcba',
+    ]
+    assert SequenceMatcher(None, texts[0], patterns[0]).ratio() == 0.90
+    _check(patterns, texts)
+
+
+def test_invalid_regex_pattern():
+    # Breaks the combined alternation, so patterns are compiled one by one
+    patterns = ['Report [draft', 'Page #', 'Confidential (internal']
+    _check(patterns, ['Report [draft', 'Report [drafts', 'Report draft', 'Page 4', 'Page four',
+                      'Confidential (internal', 'Confidential internal'])
+
+
+def test_matches_reference_on_random_texts():
+    rng = random.Random(7)
+    patterns = ['Annual Report 2023', 'Page # of #', 'www.example.com', 'Section #.#',
+                'Draft [v2', 'التقرير السنوي', 'Confidential']
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789 .#[('
+    
+    texts = []
+    for _ in range(2000):
+        text = list(rng.choice(patterns).replace('#', str(rng.randint(0, 999))))
+        for _ in range(rng.randint(0, 4)):
+            op = rng.random()
+            pos = rng.randrange(len(text) + 1)
+            if op < 0.4:
+                text.insert(pos, rng.choice(alphabet))
+            elif text and op < 0.7:
+                del text[min(pos, len(text) - 1)]
+            elif text:
+                text[min(pos, len(text) - 1)] = rng.choice(alphabet)
+        texts.append(''.join(text))
+    
+    _check(patterns, texts)
+
+
+@pytest.mark.parametrize('threshold', [0.8, 0.95])
+def test_other_thresholds(threshold):
+    patterns = ['Quarterly Statement', 'Page #']
+    matcher = HeaderFooterMatcher(patterns, fuzzy_threshold=threshold)
+    for text in ['Quarterly Statemnt', 'Quartrly Statemen', 'Quarterly', 'Page 9', 'Pag 9']:
+        expected = any(text == p or re.fullmatch(p.replace('#', r'\d+'), text)
+                       or SequenceMatcher(None, text, p).ratio() >= threshold for p in patterns)
+        assert matcher.matches(text) == bool(expected), text
@@ -0,0 +1,74 @@
+"""
+Header/footer template reuse across documents of the same family
+"""
+
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.header_footer_detector import HeaderFooterDetector
+
+FOOTER = 'Internal use only - www.example.com'
+
+
+def _make_pdf(path: Path, header: str, pages: int = 30):
+    """Same producer metadata and footer, document-specific header"""
+    
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 40), header, fontsize=11)
+        for line in range(20):
+            page.insert_text((72, 120 + line * 28),
+                             f"Body text line {line} of page {page_num + 1} in {path.stem}", fontsize=11)
+        page.insert_text((72, 820), FOOTER, fontsize=9)
+    doc.set_metadata({'producer': 'Report Writer 4.2', 'creator': 'Report Writer'})
+    doc.save(str(path))
+    doc.close()
+
+
+def _config(tmp_path: Path) -> dict:
+    return {
+        'output_dir': str(tmp_path / 'output'),
+        'header_footer': {'detection_threshold': 0.85, 'sample_pages': 50, 'use_templates': True,
+                          'template_min_similarity': 0.0}
+    }
+
+
+def test_template_not_reused_for_different_header(tmp_path):
+    a_pdf = tmp_path / 'a.pdf'
+    b_pdf = tmp_path / 'b.pdf'
+    _make_pdf(a_pdf, 'Annual Report of Company Alpha 2023')
+    _make_pdf(b_pdf, 'Handbook of Beta Procedures Volume Two')
+    detector = HeaderFooterDetector(_config(tmp_path))
+    
+    a_result = detector.detect(str(a_pdf))
+    assert a_result['algorithm_used'] != 'template'
+    assert 'Annual Report of Company Alpha 2023' in a_result['headers']
+    
+    b_result = detector.detect(str(b_pdf))
+    assert b_result['algorithm_used'] != 'template'
+    assert b_result['headers'] == ['Handbook of Beta Procedures Volume Two']
+    assert FOOTER in b_result['footers']
+
+
+def test_template_reused_for_same_layout(tmp_path):
+    a_pdf = tmp_path / 'a.pdf'
+    a2_pdf = tmp_path / 'a2.pdf'
+    _make_pdf(a_pdf, 'Annual Report of Company Alpha 2023')
+    _make_pdf(a2_pdf, 'Annual Report of Company Alpha 2023', pages=25)
+    detector = HeaderFooterDetector(_config(tmp_path))
+    
+    a_result = detector.detect(str(a_pdf))
+    a2_result = detector.detect(str(a2_pdf))
+    assert a2_result['algorithm_used'] == 'template'
+    assert a2_result['headers'] == a_result['headers']
+    assert a2_result['footers'] == a_result['footers']
+
+
+def test_templates_off_by_default(tmp_path):
+    assert HeaderFooterDetector({'output_dir': str(tmp_path)}).use_templates is False
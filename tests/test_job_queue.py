@@ -0,0 +1,171 @@
+"""
+Daemon job queue: schema migration, re-queuing on content change, concurrent claims
+"""
+
+import multiprocessing
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.job_queue import JobQueue
+
+# Schema 1: one job per (path, content hash), no user_version
+V1_SCHEMA = """
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker_pid INTEGER,
+        enqueued_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        error TEXT,
+        report_path TEXT,
+        UNIQUE (path, content_hash)
+    );
+    CREATE INDEX jobs_status ON jobs (status, id);
+    CREATE TABLE seen_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        content_hash TEXT NOT NULL
+    );
+"""
+
+
+def _job(queue: JobQueue, path: str) -> dict:
+    return dict(queue.conn.execute("SELECT * FROM jobs WHERE path = ?", (path,)).fetchone())
+
+
+def test_migrates_v1_database(tmp_path):
+    db_path = tmp_path / 'queue.db'
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(V1_SCHEMA)
+    conn.executemany(
+        "INSERT INTO jobs (path, content_hash, status, attempts, enqueued_at, report_path) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [('a.pdf', 'a1', 'done', 1, 1.0, 'a1.json'),
+         ('a.pdf', 'a2', 'queued', 0, 2.0, None),
+         ('b.pdf', 'b1', 'failed', 3, 3.0, None),
+         ('c.pdf', 'c1', 'done', 1, 4.0, 'c1.json')]
+    )
+    conn.execute("INSERT INTO seen_files VALUES ('c.pdf', 10, 5.0, 'c1')")
+    conn.commit()
+    conn.close()
+    
+    queue = JobQueue(str(db_path))
+    assert queue.conn.execute("PRAGMA user_version").fetchone()[0] == JobQueue.SCHEMA_VERSION
+    
+    # Latest version per path; only a finished one counts as processed
+    rows = queue.conn.execute("SELECT path, content_hash, done_hash, status, attempts FROM jobs "
+                              "ORDER BY path").fetchall()
+    assert [tuple(row) for row in rows] == [
+        ('a.pdf', 'a2', None, 'queued', 0),
+        ('b.pdf', 'b1', None, 'failed', 3),
+        ('c.pdf', 'c1', 'c1', 'done', 1)
+    ]
+    assert queue.seen_file('c.pdf') == {'size': 10, 'mtime': 5.0, 'content_hash': 'c1'}
+    
+    # The migrated table enforces one job per path
+    assert queue.enqueue('c.pdf', 'c2', 11, 6.0)
+    assert queue.conn.execute("SELECT COUNT(*) FROM jobs WHERE path = 'c.pdf'").fetchone()[0] == 1
+    queue.close()
+    
+    # Reopening does not migrate again
+    queue = JobQueue(str(db_path))
+    assert _job(queue, 'c.pdf')['content_hash'] == 'c2'
+    queue.close()
+
+
+def test_requeues_on_content_change(tmp_path):
+    queue = JobQueue(str(tmp_path / 'queue.db'))
+    
+    assert queue.enqueue('a.pdf', 'h1', 10, 1.0)
+    assert not queue.enqueue('a.pdf', 'h1', 10, 2.0)  # touched, unchanged
+    
+    job = queue.claim(worker_pid=1)
+    queue.finish(job['id'], job['content_hash'], 'report.json')
+    assert _job(queue, 'a.pdf')['status'] == 'done'
+    
+    # New content queues the same job again
+    assert queue.enqueue('a.pdf', 'h2', 11, 3.0)
+    job = _job(queue, 'a.pdf')
+    assert (job['status'], job['content_hash'], job['done_hash']) == ('queued', 'h2', 'h1')
+    
+    # A pending job for an older version is replaced, and going back to the
+    # processed version cancels it
+    assert queue.enqueue('a.pdf', 'h3', 12, 4.0)
+    assert _job(queue, 'a.pdf')['content_hash'] == 'h3'
+    assert not queue.enqueue('a.pdf', 'h1', 10, 5.0)
+    assert _job(queue, 'a.pdf')['status'] == 'done'
+    assert queue.claim(worker_pid=1) is None
+    
+    # Going back to an older version than the last processed one is a change too
+    assert queue.enqueue('a.pdf', 'h2', 11, 6.0)
+    job = queue.claim(worker_pid=1)
+    queue.finish(job['id'], job['content_hash'])
+    assert queue.enqueue('a.pdf', 'h1', 10, 7.0)
+    queue.close()
+
+
+def test_change_while_running_or_failing(tmp_path):
+    queue = JobQueue(str(tmp_path / 'queue.db'))
+    
+    queue.enqueue('a.pdf', 'h1', 10, 1.0)
+    job = queue.claim(worker_pid=1)
+    assert queue.enqueue('a.pdf', 'h2', 11, 2.0)
+    assert _job(queue, 'a.pdf')['status'] == 'running'
+    
+    # Finishing the old version queues the new one
+    queue.finish(job['id'], job['content_hash'])
+    row = _job(queue, 'a.pdf')
+    assert (row['status'], row['content_hash'], row['done_hash']) == ('queued', 'h2', 'h1')
+    
+    # A failure of the final attempt still retries if the file changed meanwhile
+    job = queue.claim(worker_pid=1)
+    queue.enqueue('a.pdf', 'h3', 12, 3.0)
+    queue.fail(job['id'], 'boom', max_attempts=1, content_hash=job['content_hash'])
+    row = _job(queue, 'a.pdf')
+    assert (row['status'], row['content_hash'], row['attempts']) == ('queued', 'h3', 0)
+    
+    job = queue.claim(worker_pid=1)
+    queue.fail(job['id'], 'boom', max_attempts=1, content_hash=job['content_hash'])
+    assert _job(queue, 'a.pdf')['status'] == 'failed'
+    queue.close()
+
+
+def _claim_all(db_path: str, results):
+    queue = JobQueue(db_path)
+    pid = multiprocessing.current_process().pid
+    while True:
+        job = queue.claim(pid)
+        if job is None:
+            break
+        queue.finish(job['id'], job['content_hash'])
+        results.put(job['id'])
+    queue.close()
+
+
+def test_concurrent_workers_claim_each_job_once(tmp_path):
+    db_path = str(tmp_path / 'queue.db')
+    queue = JobQueue(db_path)
+    for i in range(200):
+        queue.enqueue(f'{i}.pdf', f'h{i}', i, float(i))
+    
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_claim_all, args=(db_path, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    claimed = [results.get(timeout=60) for _ in range(200)]
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+    
+    assert sorted(claimed) == sorted(row[0] for row in queue.conn.execute("SELECT id FROM jobs"))
+    assert queue.counts() == {'done': 200}
+    queue.close()
@@ -0,0 +1,106 @@
+"""
+Stage cache hits, misses and invalidation
+"""
+
+import copy
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stage_cache import StageCache
+
+CONFIG = {
+    'ocr': {'chunk_size': 200, 'jobs': 4, 'deskew': True},
+    'header_footer': {'detection_threshold': 0.85},
+    'images': {'area_threshold': 0.05},
+    'text': {'normalization': 'NFC'}
+}
+
+
+def _cache(tmp_path: Path, config: dict = None, force_stages: list = None, enabled: bool = True,
+           content: bytes = b'%PDF-1.4 input') -> StageCache:
+    input_pdf = tmp_path / 'input.pdf'
+    input_pdf.write_bytes(content)
+    return StageCache(str(tmp_path / 'cache'), str(input_pdf), config or CONFIG,
+                      force_stages, enabled)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.load('header_footer', {'language': 'ara'}) is None
+    
+    cache.save('header_footer', {'headers': ['Report']}, extra={'language': 'ara'})
+    assert cache.load('header_footer', {'language': 'ara'}) == {'headers': ['Report']}
+    
+    # Other extra inputs, other stages and a new cache object on the same input
+    assert cache.load('header_footer', {'language': 'eng'}) is None
+    assert cache.load('images', {'language': 'ara'}) is None
+    assert _cache(tmp_path).load('header_footer', {'language': 'ara'}) == {'headers': ['Report']}
+
+
+def test_files_are_restored(tmp_path):
+    cache = _cache(tmp_path)
+    ocr_pdf = tmp_path / 'ocr.pdf'
+    ocr_pdf.write_bytes(b'ocr output')
+    cache.save('ocr', {'stats': {'total_pages': 3}}, files={'ocr.pdf': str(ocr_pdf)})
+    
+    restored = tmp_path / 'restored.pdf'
+    assert cache.restore_file('ocr', 'ocr.pdf', str(restored))
+    assert restored.read_bytes() == b'ocr output'
+    assert not cache.restore_file('ocr', 'missing.pdf', str(restored))
+
+
+def test_input_change_invalidates(tmp_path):
+    _cache(tmp_path).save('ocr', {'stats': {}})
+    assert _cache(tmp_path, content=b'%PDF-1.4 edited').load('ocr') is None
+
+
+def test_cache_version_invalidates(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    cache.save('images', {'total_images': 1})
+    
+    monkeypatch.setattr(StageCache, 'CACHE_VERSION', StageCache.CACHE_VERSION + 1)
+    assert cache.load('images') is None
+
+
+def test_config_changes(tmp_path):
+    _cache(tmp_path).save('header_footer', {'headers': []})
+    
+    # A section the stage uses, including an upstream one
+    config = copy.deepcopy(CONFIG)
+    config['header_footer']['detection_threshold'] = 0.9
+    assert _cache(tmp_path, config).load('header_footer') is None
+    config = copy.deepcopy(CONFIG)
+    config['ocr']['deskew'] = False
+    assert _cache(tmp_path, config).load('header_footer') is None
+    
+    # Speed-only settings and sections the stage does not use
+    config = copy.deepcopy(CONFIG)
+    config['ocr']['jobs'] = 16
+    config['images']['area_threshold'] = 0.5
+    config['text']['normalization'] = 'NFKC'
+    assert _cache(tmp_path, config).load('header_footer') == {'headers': []}
+
+
+def test_force_stage(tmp_path):
+    for stage in StageCache.STAGE_SECTIONS:
+        _cache(tmp_path).save(stage, {'stage': stage})
+    
+    def reused(force_stages):
+        cache = _cache(tmp_path, force_stages=force_stages)
+        return {stage for stage in StageCache.STAGE_SECTIONS if cache.load(stage) is not None}
+    
+    assert reused(None) == {'ocr', 'header_footer', 'images'}
+    assert reused(['header_footer']) == {'ocr', 'images'}
+    # Forcing OCR also forces the stages that read its output
+    assert reused(['ocr']) == set()
+    assert reused(['all']) == set()
+
+
+def test_disabled(tmp_path):
+    cache = _cache(tmp_path, enabled=False)
+    cache.save('ocr', {'stats': {}})
+    assert cache.load('ocr') is None
+    assert not (tmp_path / 'cache').exists()